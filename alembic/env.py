@@ -11,6 +11,7 @@ from alembic import context
 sys.path.append(dirname(dirname(abspath(__file__))))
 
 from app.core.config import settings  # noqa
+from app.core.search import FTS_TABLE  # noqa
 # 导入所有模型
 from app.models import *  # noqa
 
@@ -33,6 +34,13 @@ if config.config_file_name is not None:
 target_metadata = SQLModel.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """自动生成迁移时忽略 FTS5 虚拟表及其影子表（由迁移脚本手工维护）"""
+    if type_ == "table" and name and name.startswith(FTS_TABLE):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -58,6 +66,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         render_as_batch=True,  # 支持SQLite ALTER
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -82,6 +91,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             render_as_batch=True,  # 支持SQLite ALTER
+            include_object=include_object,
         )
 
         with context.begin_transaction():
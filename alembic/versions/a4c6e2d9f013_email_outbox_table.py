@@ -0,0 +1,49 @@
+"""email_outbox_table
+
+Revision ID: a4c6e2d9f013
+Revises: f1a9c4d3b872
+Create Date: 2025-07-06 09:31:15.604127
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c6e2d9f013"
+down_revision: Union[str, None] = "f1a9c4d3b872"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("to_email", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("subject", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("body", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("html", sa.Boolean(), nullable=False),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("email_outbox", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_email_outbox_status_next_attempt", ["status", "next_attempt_at"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("email_outbox", schema=None) as batch_op:
+        batch_op.drop_index("ix_email_outbox_status_next_attempt")
+
+    op.drop_table("email_outbox")
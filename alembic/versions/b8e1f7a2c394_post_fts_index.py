@@ -0,0 +1,94 @@
+"""post_fts_index
+
+Revision ID: b8e1f7a2c394
+Revises: a4c6e2d9f013
+Create Date: 2025-07-08 14:05:52.771930
+
+"""
+
+import re
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e1f7a2c394"
+down_revision: Union[str, None] = "a4c6e2d9f013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 迁移不导入应用代码，分字规则复制自编写迁移时的 app.core.search
+ZERO_WIDTH_SPACE = "\u200b"
+CJK = re.compile(
+    "[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af\uff66-\uff9f]+"
+)
+BATCH_SIZE = 2000
+
+post_table = sa.table(
+    "post",
+    sa.column("id", sa.Integer()),
+    sa.column("title", sa.String()),
+    sa.column("summary", sa.String()),
+    sa.column("content_markdown", sa.Text()),
+)
+fts_table = sa.table(
+    "post_fts",
+    sa.column("rowid", sa.Integer()),
+    sa.column("title", sa.Text()),
+    sa.column("summary", sa.Text()),
+    sa.column("content", sa.Text()),
+)
+
+
+def segment_cjk(text):
+    """在 CJK 字符两侧插入零宽空格，使 unicode61 分词器把每个汉字当成一个词"""
+    if not text:
+        return ""
+    return CJK.sub(
+        lambda m: ZERO_WIDTH_SPACE + (ZERO_WIDTH_SPACE * 2).join(m.group()) + ZERO_WIDTH_SPACE, text
+    )
+
+
+def upgrade() -> None:
+    # FTS5 虚拟表只在 SQLite 上创建；写入索引前需要对中日韩文字分字，因此在 Python 中建立索引
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    op.execute("DROP TABLE IF EXISTS post_fts")
+    op.execute(
+        "CREATE VIRTUAL TABLE post_fts USING fts5("
+        "title, summary, content, tokenize='unicode61 remove_diacritics 2')"
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(post_table)
+            .where(post_table.c.id > last_id)
+            .order_by(post_table.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        op.bulk_insert(
+            fts_table,
+            [
+                {
+                    "rowid": row.id,
+                    "title": segment_cjk(row.title),
+                    "summary": segment_cjk(row.summary),
+                    "content": segment_cjk(row.content_markdown),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+    # 合并索引段，提高查询速度
+    op.execute("INSERT INTO post_fts(post_fts) VALUES ('optimize')")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS post_fts")
@@ -0,0 +1,98 @@
+"""password_reset_token_table
+
+把 user 表上的 reset_token / reset_token_expires 移到独立的重置令牌表，
+只保存令牌的 SHA-256 摘要，并为摘要（唯一）和过期时间建立索引。
+
+Revision ID: c7d2e91a4f60
+Revises: b32c360812f0
+Create Date: 2025-07-02 10:12:40.118204
+
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e91a4f60"
+down_revision: Union[str, None] = "b32c360812f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    reset_table = op.create_table(
+        "password_reset_token",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("token_hash", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("password_reset_token", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_password_reset_token_token_hash"), ["token_hash"], unique=True
+        )
+        batch_op.create_index(
+            batch_op.f("ix_password_reset_token_expires_at"), ["expires_at"], unique=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_password_reset_token_user_id"), ["user_id"], unique=False
+        )
+
+    # 迁移仍然有效的旧令牌（只保存摘要）
+    user_table = sa.table(
+        "user",
+        sa.column("id", sa.Integer()),
+        sa.column("reset_token", sa.String()),
+        sa.column("reset_token_expires", sa.DateTime()),
+    )
+    now = datetime.utcnow()
+    rows = op.get_bind().execute(
+        sa.select(user_table).where(
+            user_table.c.reset_token.is_not(None),
+            user_table.c.reset_token_expires > now,
+        )
+    ).fetchall()
+    if rows:
+        op.bulk_insert(
+            reset_table,
+            [
+                {
+                    "user_id": row.id,
+                    "token_hash": hashlib.sha256(row.reset_token.encode("utf-8")).hexdigest(),
+                    "expires_at": row.reset_token_expires,
+                    "created_at": now,
+                }
+                for row in rows
+            ],
+        )
+
+    with op.batch_alter_table("user", schema=None) as batch_op:
+        batch_op.drop_column("reset_token_expires")
+        batch_op.drop_column("reset_token")
+
+
+def downgrade() -> None:
+    # 令牌只保存了摘要，无法还原，降级后未使用的重置链接全部失效
+    with op.batch_alter_table("user", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("reset_token", sqlmodel.sql.sqltypes.AutoString(), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("reset_token_expires", sa.DateTime(), nullable=True)
+        )
+
+    with op.batch_alter_table("password_reset_token", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_password_reset_token_user_id"))
+        batch_op.drop_index(batch_op.f("ix_password_reset_token_expires_at"))
+        batch_op.drop_index(batch_op.f("ix_password_reset_token_token_hash"))
+
+    op.drop_table("password_reset_token")
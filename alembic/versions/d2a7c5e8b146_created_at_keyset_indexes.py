@@ -0,0 +1,31 @@
+"""created_at_keyset_indexes
+
+Revision ID: d2a7c5e8b146
+Revises: b8e1f7a2c394
+Create Date: 2025-07-09 11:20:36.184552
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a7c5e8b146"
+down_revision: Union[str, None] = "b8e1f7a2c394"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.create_index("ix_post_created_at_id", ["created_at", "id"], unique=False)
+    with op.batch_alter_table("comment", schema=None) as batch_op:
+        batch_op.create_index("ix_comment_created_at_id", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("comment", schema=None) as batch_op:
+        batch_op.drop_index("ix_comment_created_at_id")
+    with op.batch_alter_table("post", schema=None) as batch_op:
+        batch_op.drop_index("ix_post_created_at_id")
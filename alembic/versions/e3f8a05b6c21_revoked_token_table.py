@@ -0,0 +1,47 @@
+"""revoked_token_table
+
+Revision ID: e3f8a05b6c21
+Revises: c7d2e91a4f60
+Create Date: 2025-07-04 15:40:02.537716
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e3f8a05b6c21"
+down_revision: Union[str, None] = "c7d2e91a4f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_token",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("jti", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("revoked_token", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_revoked_token_jti"), ["jti"], unique=True)
+        batch_op.create_index(batch_op.f("ix_revoked_token_user_id"), ["user_id"], unique=False)
+        batch_op.create_index(
+            batch_op.f("ix_revoked_token_expires_at"), ["expires_at"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("revoked_token", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_revoked_token_expires_at"))
+        batch_op.drop_index(batch_op.f("ix_revoked_token_user_id"))
+        batch_op.drop_index(batch_op.f("ix_revoked_token_jti"))
+
+    op.drop_table("revoked_token")
@@ -0,0 +1,42 @@
+"""list_filter_composite_indexes
+
+Revision ID: e5b9d3a1f7c4
+Revises: d2a7c5e8b146
+Create Date: 2025-07-10 09:42:18.506231
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b9d3a1f7c4"
+down_revision: Union[str, None] = "d2a7c5e8b146"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (表名, 索引名, 列)
+INDEXES = (
+    ("post", "ix_post_published_created_at", ["published", "created_at", "id"]),
+    ("post", "ix_post_category_id_created_at", ["category_id", "created_at", "id"]),
+    ("post", "ix_post_author_id_created_at", ["author_id", "created_at", "id"]),
+    ("comment", "ix_comment_post_id_created_at", ["post_id", "created_at", "id"]),
+    ("comment", "ix_comment_author_id", ["author_id"]),
+    ("post_tag_link", "ix_post_tag_link_tag_id_post_id", ["tag_id", "post_id"]),
+    ("tag", "ix_tag_created_at_id", ["created_at", "id"]),
+    ("category", "ix_category_created_at_id", ["created_at", "id"]),
+    ("user", "ix_user_created_at_id", ["created_at", "id"]),
+)
+
+
+def upgrade() -> None:
+    for table, name, columns in INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade() -> None:
+    for table, name, _ in reversed(INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
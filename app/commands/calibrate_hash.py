@@ -0,0 +1,69 @@
+"""测算本机 bcrypt 各成本的耗时，给出满足目标延迟的 PASSWORD_HASH_ROUNDS
+
+用法：
+    poetry run python -m app.commands.calibrate_hash --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+from passlib.hash import bcrypt
+
+from app.core.config import settings
+
+# bcrypt 允许的成本范围
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+def measure(rounds: int, samples: int) -> float:
+    """返回指定成本下单次哈希耗时的中位数（毫秒）"""
+    hasher = bcrypt.using(rounds=rounds, ident="2b")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(
+    target_ms: float, samples: int = 3, start_rounds: int = 8
+) -> Tuple[Optional[int], List[Tuple[int, float]]]:
+    """从 start_rounds 开始逐级测算，返回不超过目标耗时的最大成本和测量结果
+
+    成本每加 1 耗时约翻倍，超过目标后即停止，不会测算过于昂贵的成本。
+    """
+    results = []
+    suggested = None
+    for rounds in range(max(start_rounds, MIN_ROUNDS), MAX_ROUNDS + 1):
+        elapsed = measure(rounds, samples)
+        results.append((rounds, elapsed))
+        if elapsed > target_ms:
+            break
+        suggested = rounds
+    return suggested, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250, help="单次哈希的目标耗时")
+    parser.add_argument("--samples", type=int, default=3, help="每个成本的测量次数")
+    parser.add_argument("--start-rounds", type=int, default=8)
+    args = parser.parse_args()
+
+    suggested, results = calibrate(args.target_ms, args.samples, args.start_rounds)
+    for rounds, elapsed in results:
+        marker = " <- 建议" if rounds == suggested else ""
+        print(f"rounds={rounds:2d}  {elapsed:9.1f} ms{marker}")
+    print(f"当前配置 PASSWORD_HASH_ROUNDS={settings.PASSWORD_HASH_ROUNDS}")
+    if suggested is None:
+        print(f"最低测算成本已超过 {args.target_ms:.0f} ms，请降低 --start-rounds 或放宽目标")
+    else:
+        print(f"建议设置 PASSWORD_HASH_ROUNDS={suggested}（目标 {args.target_ms:.0f} ms）")
+
+
+if __name__ == "__main__":
+    main()
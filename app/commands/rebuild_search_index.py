@@ -0,0 +1,28 @@
+"""重建文章全文索引（FTS5）
+
+索引随文章的增删改同步维护；在绕过服务层直接修改数据库、或调整分词规则之后运行：
+    poetry run python -m app.commands.rebuild_search_index
+"""
+
+import argparse
+
+from app.core.database import engine
+from app.core.search import fts_supported
+from app.services.search_service import rebuild_search_index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=2000, help="每次读取的文章数")
+    args = parser.parse_args()
+
+    if not fts_supported():
+        print("当前数据库不支持 FTS5 或已关闭 SEARCH_FTS_ENABLED，搜索使用 LIKE 查询")
+        return
+    with engine.begin() as conn:
+        indexed, elapsed = rebuild_search_index(conn, args.batch_size)
+    print(f"已索引 {indexed} 篇文章，耗时 {elapsed:.1f} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""修改 MARKDOWN_EXTENSIONS 等渲染配置后，重新生成全部文章的 content_html
+
+用法：
+    poetry run python -m app.commands.rerender_posts --workers 4
+    poetry run python -m app.commands.rerender_posts --resume  # 从上次中断处继续
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Engine
+
+from app.core.database import engine as default_engine
+from app.core.renderer import MARKDOWN_EXTENSIONS, render_markdown
+from app.models.post import Post
+
+DEFAULT_CHECKPOINT = ".rerender_posts.checkpoint"
+
+posts = Post.__table__
+
+# 内容未变化的行不写入，避免无谓的写锁和 WAL 增长；
+# 读取后正文又被修改的行也不写入，否则会用旧正文的渲染结果覆盖新的 HTML
+UPDATE_HTML = (
+    update(posts)
+    .where(posts.c.id == bindparam("post_id"))
+    .where(posts.c.content_markdown == bindparam("markdown"))
+    .where(posts.c.content_html.is_distinct_from(bindparam("html")))
+    .values(content_html=bindparam("html"))
+)
+
+
+def iter_batches(engine: Engine, start_id: int, batch_size: int) -> Iterator[List[Tuple[int, str]]]:
+    """按主键分批读取 (id, content_markdown)
+
+    每批是一次独立的短查询，不会长时间持有读事务（长读事务会阻止 WAL 检查点）。
+    """
+    last_id = start_id
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(posts.c.id, posts.c.content_markdown)
+                .where(posts.c.id > last_id)
+                .order_by(posts.c.id)
+                .limit(batch_size)
+            ).all()
+        if not rows:
+            return
+        yield [(row.id, row.content_markdown) for row in rows]
+        last_id = rows[-1].id
+
+
+def write_batch(
+    engine: Engine, batch: List[Tuple[int, str]], htmls: Iterable[str], chunk_size: int
+) -> int:
+    """分块 executemany 写回，每块单独提交以缩短写锁时间，返回实际修改的行数
+
+    batch 为读取时的 (id, content_markdown)，只改写正文仍与读取时相同的行。
+    """
+    params = [
+        {"post_id": post_id, "markdown": markdown, "html": html}
+        for (post_id, markdown), html in zip(batch, htmls)
+    ]
+    changed = 0
+    for start in range(0, len(params), chunk_size):
+        with engine.begin() as conn:
+            changed += conn.execute(UPDATE_HTML, params[start:start + chunk_size]).rowcount
+    return changed
+
+
+def load_checkpoint(path: Path) -> int:
+    """返回上次处理到的文章ID；渲染配置已变化时从头开始"""
+    try:
+        data = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+    if data.get("extensions") != list(MARKDOWN_EXTENSIONS):
+        print("检查点的渲染配置与当前不同，从头开始")
+        return 0
+    return int(data.get("last_id", 0))
+
+
+def save_checkpoint(path: Path, last_id: int) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"last_id": last_id, "extensions": list(MARKDOWN_EXTENSIONS)}))
+    os.replace(tmp, path)
+
+
+def rerender_posts(
+    engine: Engine,
+    executor: Optional[Executor] = None,
+    batch_size: int = 1000,
+    chunk_size: int = 500,
+    start_id: int = 0,
+    checkpoint: Optional[Path] = None,
+    report_every: float = 5.0,
+) -> Tuple[int, int]:
+    """重新渲染 start_id 之后的全部文章，返回 (处理数, 修改数)
+
+    读取下一批、渲染当前批与写回上一批流水线进行：executor.map 提交后立即返回，
+    写回上一批时渲染进程已在处理当前批。executor 为 None 时在当前进程渲染。
+    """
+    processed = changed = 0
+    started = last_report = time.perf_counter()
+    previous = None
+
+    def flush(batch: List[Tuple[int, str]], htmls: Iterable[str]) -> None:
+        nonlocal processed, changed, last_report
+        changed += write_batch(engine, batch, htmls, chunk_size)
+        processed += len(batch)
+        last_id = batch[-1][0]
+        if checkpoint:
+            save_checkpoint(checkpoint, last_id)
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            print(f"已处理 {processed} 篇（修改 {changed}），{processed / (now - started):.0f} 篇/秒，"
+                  f"当前ID {last_id}")
+
+    for batch in iter_batches(engine, start_id, batch_size):
+        texts = [text for _, text in batch]
+        if executor is None:
+            htmls = [render_markdown(text) for text in texts]
+        else:
+            # 按块分发，减少进程间往返
+            htmls = executor.map(render_markdown, texts, chunksize=max(1, len(texts) // 16))
+        if previous:
+            flush(*previous)
+        previous = (batch, htmls)
+    if previous:
+        flush(*previous)
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"完成：处理 {processed} 篇，修改 {changed} 篇，耗时 {elapsed:.1f} 秒（{rate:.0f} 篇/秒）")
+    if checkpoint and checkpoint.exists():
+        checkpoint.unlink()
+    return processed, changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="渲染进程数，0 表示在当前进程渲染")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每次读取的文章数")
+    parser.add_argument("--chunk-size", type=int, default=500, help="每个写事务更新的文章数")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="检查点文件")
+    parser.add_argument("--resume", action="store_true", help="从检查点记录的位置继续")
+    parser.add_argument("--report-every", type=float, default=5.0, help="进度输出间隔（秒）")
+    args = parser.parse_args()
+
+    checkpoint = Path(args.checkpoint)
+    start_id = load_checkpoint(checkpoint) if args.resume else 0
+    if start_id:
+        print(f"从文章ID {start_id} 之后继续")
+    executor = None
+    if args.workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    try:
+        rerender_posts(
+            default_engine,
+            executor,
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size,
+            start_id=start_id,
+            checkpoint=checkpoint,
+            report_every=args.report_every,
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
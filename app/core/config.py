@@ -15,12 +15,87 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
+    # 刷新令牌有效期（天），用于换取新的访问令牌而无需重新输入密码
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # bcrypt 成本（2^N 轮），可用 python -m app.commands.calibrate_hash 按部署机器测算
+    # 已有哈希低于该成本时，用户下次登录会在后台重新哈希；测试环境使用 4 以加快速度
+    PASSWORD_HASH_ROUNDS: int = 12
+    # 令牌吊销：布隆过滤器容量与误判率，以及从数据库增量刷新的间隔（秒）
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_REFRESH_INTERVAL: float = 2.0
+    # 密码哈希执行器：进程数（0 表示使用单个线程）和最多排队的任务数
+    HASH_WORKERS: int = 2
+    HASH_QUEUE_SIZE: int = 64
+    # 密码重置令牌有效期，以及定期清理过期重置令牌、刷新令牌的间隔（秒，0 表示不清理）和每批删除数
+    PASSWORD_RESET_EXPIRE_HOURS: int = 24
+    RESET_TOKEN_SWEEP_INTERVAL: float = 3600.0
+    RESET_TOKEN_SWEEP_BATCH: int = 500
+    # 令牌到用户快照的缓存，命中时认证不访问数据库
+    PRINCIPAL_CACHE_SIZE: int = 10000  # 0 表示关闭缓存
+    PRINCIPAL_CACHE_TTL: float = 60.0  # 秒
 
     # 数据库配置
     DATABASE_URL: str
+    # 异步驱动地址，留空时由 DATABASE_URL 推导（sqlite -> sqlite+aiosqlite）
+    ASYNC_DATABASE_URL: str = ""
+    # 是否使用异步数据库会话；关闭后回退到同步引擎，便于压测对比
+    DB_ASYNC: bool = True
+
+    # 连接池配置（内存 SQLite 使用单连接池，不适用）
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # 等待空闲连接的最长秒数
+    DB_POOL_RECYCLE: int = 1800  # 连接最长存活秒数，-1 表示不回收
+    DB_POOL_PRE_PING: bool = False  # 取出连接前先检测是否可用
+
+    # SQLite 调优（在每个新连接上执行 PRAGMA）
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+    SQLITE_CACHE_SIZE: int = -64000  # 负数表示KB，约64MB
+    SQLITE_BUSY_TIMEOUT: int = 5000  # 毫秒
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_FOREIGN_KEYS: bool = True
+    # 单写通道：写事务在进程内排队使用同一个连接，避免 "database is locked"
+    DB_WRITER_LANE: bool = False
+    DB_WRITER_LANE_TIMEOUT: float = 30.0  # 排队等待写连接的最长秒数
+
+    # 读写分离：逗号分隔的只读副本地址（仅异步模式生效）
+    DATABASE_REPLICA_URLS: str = ""
+    # 用户写入后在该秒数内的读取固定走主库（写后读一致）
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    # 本地复制替身：定期把 SQLite 主库复制到副本文件，仅用于开发和测试
+    DB_LOCAL_REPLICATION: bool = False
+    DB_LOCAL_REPLICATION_INTERVAL: float = 1.0
+
+    # SQL 分析：统计每个请求的语句数和数据库耗时，写入响应头和日志
+    DB_PROFILER_ENABLED: bool = True
+    DB_PROFILER_SAMPLE_RATE: float = 1.0  # 采样比例，生产环境可调低
+    DB_N_PLUS_ONE_THRESHOLD: int = 5  # 同形 SELECT 执行次数达到该值时告警
+
+    # 全文搜索：SQLite 上使用 FTS5 索引，关闭后退回 LIKE 查询
+    SEARCH_FTS_ENABLED: bool = True
+
+    # 列表总数缓存：按筛选条件缓存 COUNT 结果，本进程内写入提交后失效
+    COUNT_CACHE_SIZE: int = 1024  # 0 表示不缓存
+    COUNT_CACHE_TTL: float = 5.0  # 秒，其他进程的写入最多延迟该时间可见
 
     # Markdown配置
     MARKDOWN_EXTENSIONS: str = "fenced_code,tables,nl2br"
+    RENDER_WORKERS: int = 1  # 渲染大文档的进程数，0 表示使用单个线程
+    RENDER_INLINE_LIMIT: int = 64 * 1024  # 不超过该字节数的文档直接在请求内渲染
+    RENDER_MAX_SIZE: int = 2 * 1024 * 1024  # 超过该字节数的文档拒绝渲染
+    RENDER_TIMEOUT: float = 10.0  # 大文档渲染的超时秒数
+    RENDER_CACHE_SIZE: int = 1000  # 内存中缓存的渲染结果条数，0 表示不缓存
+    RENDER_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 内存中渲染结果的总字节数上限
+    RENDER_CACHE_DIR: str = ""  # 渲染结果的磁盘缓存目录，为空时只缓存在内存中
+
+    # 文章批量导入：每个事务写入的行数，以及结果中最多返回的错误行数
+    POST_IMPORT_CHUNK_SIZE: int = 200
+    POST_IMPORT_MAX_ERRORS: int = 1000
+    # 导出时服务端游标每次取回的行数，内存占用与之成正比，与表的大小无关
+    EXPORT_BATCH_SIZE: int = 500
 
     # 前端地址配置
     FRONTEND_URL: str = "http://localhost:3000"
@@ -33,6 +108,14 @@ class Settings(BaseSettings):
     SMTP_TLS: bool = True
     EMAIL_FROM: str = ""
     EMAIL_FROM_NAME: str = "FastAdmin"
+    SMTP_TIMEOUT: float = 10.0
+    # 发件箱：邮件先写入 email_outbox 表，由后台任务批量发送
+    EMAIL_OUTBOX_POLL_INTERVAL: float = 1.0  # 轮询间隔（秒），0 表示不启动发送任务
+    EMAIL_OUTBOX_BATCH: int = 50  # 每轮最多发送的邮件数
+    EMAIL_MAX_ATTEMPTS: int = 5  # 超过该次数仍失败的邮件标记为 failed
+    EMAIL_RETRY_BASE_DELAY: float = 30.0  # 重试间隔基数（秒），按 2 的幂退避
+    SMTP_POOL_SIZE: int = 2  # 保持的已登录 SMTP 连接数
+    SMTP_IDLE_TIMEOUT: float = 60.0  # 连接空闲超过该秒数后重新建立
 
     model_config = {
         "env_file": ".env",
@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.dml import UpdateBase
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+
+
+class CountCache:
+    """列表总数缓存
+
+    键是 (表名, 规范化后的筛选条件)，每个条目记录它依赖的表；任何一张表被写入并提交后，
+    相关条目立即失效。失效只在当前进程内进行，其他进程依靠较短的 TTL 收敛。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, int, FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(table: str, filters: dict) -> Hashable:
+        """忽略值为 None 的条件，与参数顺序无关"""
+        return table, tuple(sorted((k, v) for k, v in filters.items() if v is not None))
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, total: int, tables: Iterable[str]) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                # 先清理过期条目，仍然已满时丢弃最早写入的条目
+                now = time.monotonic()
+                for stale in [k for k, (expires, _, _) in self._entries.items() if expires <= now]:
+                    del self._entries[stale]
+                if len(self._entries) >= self.maxsize:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self.ttl, total, frozenset(tables))
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        with self._lock:
+            for key in [k for k, (_, _, deps) in self._entries.items() if deps & tables]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+count_cache = CountCache(settings.COUNT_CACHE_SIZE, settings.COUNT_CACHE_TTL)
+
+
+def install_count_invalidation(engine: Engine) -> None:
+    """记录每个连接上执行过 INSERT/UPDATE/DELETE 的表，提交后使相关的总数缓存失效（异步引擎请传入 sync_engine）"""
+
+    @event.listens_for(engine, "after_execute")
+    def _track_writes(conn, clauseelement, multiparams, params, execution_options, result):
+        if isinstance(clauseelement, UpdateBase):
+            conn.info.setdefault("written_tables", set()).add(clauseelement.table.name)
+
+    @event.listens_for(engine, "commit")
+    def _invalidate_on_commit(conn):
+        tables = conn.info.pop("written_tables", None)
+        if tables:
+            count_cache.invalidate(tables)
+
+    @event.listens_for(engine, "rollback")
+    def _forget_on_rollback(conn):
+        conn.info.pop("written_tables", None)
+
+
+async def estimate_rows(session: AsyncSession, model) -> int:
+    """不扫描全表的近似行数
+
+    PostgreSQL 读取统计信息中的 reltuples；其他数据库（SQLite）用最大主键值近似，
+    删除过的行越多偏差越大。
+    """
+    table = model.__table__
+    if settings.DATABASE_URL.startswith("postgresql"):
+        result = await session.exec(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name").bindparams(
+                name=table.name
+            )
+        )
+        estimate = result.scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return int((await session.exec(select(func.max(table.c.id)))).first()[0] or 0)
+
+
+async def count_rows(
+    session: AsyncSession,
+    count_query,
+    model,
+    filters: dict,
+    tables: Iterable[str] = (),
+    with_total: bool = True,
+    estimated: bool = False,
+) -> Tuple[Optional[int], bool]:
+    """返回列表总数和它是否为估算值
+
+    with_total=False 时不计数；没有筛选条件且 estimated=True 时返回近似值；
+    其余情况返回精确总数，并按筛选条件缓存 COUNT_CACHE_TTL 秒。
+    tables 为筛选条件额外依赖的表（如关联表），它们的写入同样使缓存失效。
+    """
+    if not with_total:
+        return None, False
+    table = model.__tablename__
+    active_filters = {k: v for k, v in filters.items() if v is not None}
+    if estimated and not active_filters:
+        return await estimate_rows(session, model), True
+    key = count_cache.key(table, active_filters)
+    total = count_cache.get(key)
+    if total is None:
+        result = (await session.exec(count_query)).first()
+        total = int(result) if result is not None else 0
+        count_cache.put(key, total, {table, *tables})
+    return total, False
@@ -1,17 +1,426 @@
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.sql.dml import UpdateBase
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
+from app.core.count_cache import install_count_invalidation
+from app.core.pool_stats import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.core.profiler import install_query_profiler
+
+logger = logging.getLogger(__name__)
+
+# 各驱动对应的异步方言
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """由同步数据库地址推导异步驱动地址"""
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme or scheme not in ASYNC_DRIVERS:
+        return url
+    return f"{ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+def _connect_args(url: str) -> dict:
+    """SQLite 需要允许跨线程使用连接"""
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
+
+
+def _is_memory_database(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.drivername.startswith("sqlite") and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def pool_options(url: str, is_async: bool) -> dict:
+    """按配置生成连接池参数；内存 SQLite 沿用 SQLAlchemy 默认的单连接池"""
+    if _is_memory_database(url):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 
-# 创建SQLAlchemy引擎
+def sqlite_pragmas_from_settings() -> dict:
+    """从配置生成 SQLite PRAGMA 列表，值为 None 的项不设置"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+        "foreign_keys": "ON" if settings.SQLITE_FOREIGN_KEYS else "OFF",
+    }
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+    """在引擎每次建立新连接时执行 PRAGMA（异步引擎请传入 sync_engine）"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if value is not None:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+# 创建SQLAlchemy引擎（同步：迁移、脚本以及 DB_ASYNC=False 时使用）
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    connect_args={"check_same_thread": False},  # SQLite 特有配置
+    connect_args=_connect_args(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL, is_async=False),
+)
+install_sqlite_pragmas(engine, sqlite_pragmas_from_settings())
+install_query_profiler(engine)
+install_count_invalidation(engine)
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(
+    settings.DATABASE_URL
+)
+
+
+def create_app_async_engine(url: str, **kwargs: Any) -> AsyncEngine:
+    """创建应用使用的异步引擎，并安装连接池、SQLite PRAGMA 配置、SQL 分析和总数缓存失效"""
+    options = {**pool_options(url, is_async=True), **kwargs}
+    new_engine = create_async_engine(
+        url, echo=settings.DEBUG, connect_args=_connect_args(url), **options
+    )
+    install_sqlite_pragmas(new_engine.sync_engine, sqlite_pragmas_from_settings())
+    install_query_profiler(new_engine.sync_engine)
+    install_count_invalidation(new_engine.sync_engine)
+    return new_engine
+
+
+def create_writer_lane_engine(url: str, timeout: float) -> AsyncEngine:
+    """创建单写通道引擎：连接池只有一个连接，并发写事务在池上排队等待"""
+    return create_app_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=timeout,
+    )
+
+
+# 创建异步引擎（主库）
+async_engine = create_app_async_engine(ASYNC_DATABASE_URL)
+
+# 写引擎：开启单写通道时使用独立的单连接引擎，否则与读共用。
+# 单写通道只作用于异步的 RoutingSession；DB_ASYNC=False 时 new_session 创建的同步会话
+# 直接使用 engine，没有写通道，并发写仍可能遇到 SQLITE_BUSY（database is locked）
+writer_engine = async_engine
+if settings.DB_WRITER_LANE:
+    if _is_memory_database(ASYNC_DATABASE_URL):
+        logger.warning("内存数据库无法共享写连接，已忽略 DB_WRITER_LANE")
+    else:
+        writer_engine = create_writer_lane_engine(
+            ASYNC_DATABASE_URL, settings.DB_WRITER_LANE_TIMEOUT
+        )
+
+# 只读副本引擎（仅异步模式使用）
+replica_engines = [
+    create_app_async_engine(get_async_database_url(url.strip()))
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+]
+
+# 当前请求的用户ID，由认证依赖设置，用于写后读一致性
+current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+
+
+class ReadYourWritesPins:
+    """记录最近写过数据的用户，固定期内该用户的读取走主库"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._pins: Dict[int, float] = {}
+
+    def pin(self, user_id: int) -> None:
+        now = time.monotonic()
+        self._pins[user_id] = now + self.seconds
+        if len(self._pins) > 1024:
+            self._pins = {k: v for k, v in self._pins.items() if v > now}
+
+    def is_pinned(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        expires = self._pins.get(user_id)
+        return expires is not None and expires > time.monotonic()
+
+
+read_your_writes_pins = ReadYourWritesPins(settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+class RoutingSession(Session):
+    """按语句类型选择连接的会话
+
+    flush 以及 INSERT/UPDATE/DELETE 语句走写引擎；一旦当前事务写过数据，
+    后续读取也留在写连接上，保证能读到本事务尚未提交的修改。
+    配置了只读副本时，其余读取固定使用随机选中的一个副本，
+    当前用户处于写后读固定期内时则读主库。
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        writer_bind: Optional[Engine] = None,
+        reader_binds: Sequence[Engine] = (),
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.writer_bind = writer_bind
+        self.reader_binds = list(reader_binds)
+        self._reader: Optional[Engine] = None
+        self._wrote = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._wrote = True
+        if self._wrote:
+            if self.writer_bind is not None:
+                return self.writer_bind
+        elif self.reader_binds and not read_your_writes_pins.is_pinned(
+            current_user_id.get()
+        ):
+            if self._reader is None:
+                self._reader = random.choice(self.reader_binds)
+            return self._reader
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def commit(self) -> None:
+        try:
+            super().commit()
+            # 提交过程中会先 flush，因此在提交之后再读取写标记
+            wrote = self._wrote
+        finally:
+            self._wrote = False
+        user_id = current_user_id.get()
+        if wrote and user_id is not None:
+            read_your_writes_pins.pin(user_id)
+
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            self._wrote = False
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._wrote = False
+            self._reader = None
+
+
+def named_engines() -> Dict[str, Engine]:
+    """应用使用的全部引擎（异步引擎取其 sync_engine），用于连接池监控"""
+    engines: Dict[str, Engine] = {
+        "sync": engine,
+        "primary": async_engine.sync_engine,
+    }
+    if writer_engine is not async_engine:
+        engines["writer"] = writer_engine.sync_engine
+    for index, replica in enumerate(replica_engines):
+        engines[f"replica_{index}"] = replica.sync_engine
+    return engines
+
+
+_writer_bind = writer_engine.sync_engine if writer_engine is not async_engine else None
+
+# 异步会话工厂；提交后不使对象过期，避免序列化响应时触发隐式IO
+async_session_maker = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    writer_bind=_writer_bind,
+    expire_on_commit=False,
+)
+
+# 只读会话工厂：读取走副本，flush 仍然写主库
+read_session_maker = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    writer_bind=_writer_bind,
+    reader_binds=[e.sync_engine for e in replica_engines],
+    expire_on_commit=False,
 )
 
 
+class SyncSession:
+    """以 AsyncSession 相同的 await 接口包装同步 Session
+
+    DB_ASYNC=False 时使用：调用会直接在事件循环中阻塞执行，
+    与改造前的行为一致，用于和异步路径做压测对比。
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Any) -> None:
+        self.sync_session.add_all(instances)
+
+    def in_transaction(self) -> bool:
+        return self.sync_session.in_transaction()
+
+    async def exec(self, statement: Any, **kwargs: Any) -> Any:
+        return self.sync_session.exec(statement, **kwargs)
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.scalar(statement, *args, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any) -> Any:
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    async def refresh(self, instance: Any, *args: Any, **kwargs: Any) -> None:
+        self.sync_session.refresh(instance, *args, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        self.sync_session.delete(instance)
+
+    async def flush(self, *args: Any, **kwargs: Any) -> None:
+        self.sync_session.flush(*args, **kwargs)
+
+    async def commit(self) -> None:
+        self.sync_session.commit()
+
+    async def rollback(self) -> None:
+        self.sync_session.rollback()
+
+    async def close(self) -> None:
+        self.sync_session.close()
+
+
+def new_session(read_only: bool = False) -> AsyncSession:
+    """按 DB_ASYNC 配置创建会话，两种模式对调用方都是 await 接口
+
+    同步会话不经过单写通道（见 writer_engine）。
+    """
+    if settings.DB_ASYNC:
+        return read_session_maker() if read_only else async_session_maker()
+    return SyncSession(Session(engine))
+
+
+class LazySession:
+    """按需创建会话的代理
+
+    首次使用时才创建会话，认证或参数校验失败的请求不会占用连接。
+    异步模式下，只读调用（exec/get 等）结束后若会话中没有待写入的修改，
+    立即提交空事务把连接还给连接池，而不是等到响应序列化完成后才释放；
+    写事务仍然持有连接直到 commit/rollback。
+    """
+
+    # 结束后可以立即释放连接的只读方法
+    _READ_METHODS = frozenset({"exec", "execute", "scalar", "scalars", "get", "refresh"})
+
+    def __init__(self, read_only: bool = False):
+        self._read_only = read_only
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = new_session(read_only=self._read_only)
+        return self._session
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.session, name)
+        if name not in self._READ_METHODS or not isinstance(self._session, AsyncSession):
+            return attr
+
+        async def _call_then_release(*args: Any, **kwargs: Any) -> Any:
+            result = await attr(*args, **kwargs)
+            await self._release_if_idle()
+            return result
+
+        return _call_then_release
+
+    async def _release_if_idle(self) -> None:
+        # 异步会话的结果已全部缓冲，提交空事务不会影响已取回的数据
+        sync_session = self._session.sync_session
+        if not sync_session.in_transaction():
+            return
+        if sync_session.new or sync_session.dirty or sync_session.deleted:
+            return
+        if getattr(sync_session, "_wrote", False):
+            return
+        await self._session.commit()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
 # 获取数据库会话
-def get_session():
-    """提供数据库会话依赖"""
-    with Session(engine) as session:
+async def get_session():
+    """提供数据库会话依赖（首次使用时才创建会话）"""
+    session = LazySession()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+# 获取只读数据库会话
+async def get_read_session():
+    """提供只读数据库会话依赖（配置副本时读取走副本）"""
+    session = LazySession(read_only=True)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def session_scope(read_only: bool = False):
+    """在请求之外（后台任务、命令行）使用的会话，退出时关闭"""
+    session = new_session(read_only=read_only)
+    try:
         yield session
+    finally:
+        await session.close()
@@ -1,57 +1,113 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_session
+from app.core.database import current_user_id, get_read_session, get_session
+from app.core.principal import Principal, principal_cache
+from app.core.revocation import revocation_list
 from app.models.user import User
 
 # OAuth2密码流认证
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+# 公开接口的可选认证：没有令牌时不报错
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
 
 # 数据库会话依赖
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+
+def _token_user_id(token: Optional[str]) -> Optional[int]:
+    """取出令牌中的用户ID，无效或过期的令牌返回 None（只用于选择读库，不做认证）"""
+    if not token:
+        return None
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal.id
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    return int(user_id) if user_id is not None and str(user_id).isdigit() else None
+
+
+async def get_user_read_session(
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    token: Annotated[Optional[str], Depends(optional_oauth2_scheme)],
+) -> AsyncSession:
+    """只读会话依赖；公开接口带上令牌时同样记录当前用户，使其写后固定期内的读取走主库
+
+    会话在第一次查询时才选择连接，此时当前用户已经设置。
+    """
+    user_id = _token_user_id(token)
+    if user_id is not None:
+        current_user_id.set(user_id)
+    return session
+
+
+# 只读数据库会话依赖（GET 接口使用，配置副本时读取走副本）
+ReadSessionDep = Annotated[AsyncSession, Depends(get_user_read_session)]
 
 
 async def get_current_user(
     session: SessionDep, token: Annotated[str, Depends(oauth2_scheme)]
-) -> User:
-    """获取当前认证用户"""
+) -> Principal:
+    """获取当前认证用户（优先使用令牌缓存，未命中时查询数据库）"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无效的认证凭据",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        # 解码JWT令牌
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    principal = principal_cache.get(token)
+    if principal is None:
+        try:
+            # 解码JWT令牌
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+            user_id: str = payload.get("sub")
+            if user_id is None or not str(user_id).isdigit():
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
 
-    # 查询用户
-    user = session.exec(select(User).where(User.id == user_id)).first()
-    if user is None:
-        raise credentials_exception
+        # 查询用户
+        user = (await session.exec(select(User).where(User.id == int(user_id)))).first()
+        if user is None:
+            raise credentials_exception
+
+        principal = Principal.from_user(user, payload)
+        principal_cache.put(token, principal, payload.get("exp"))
+
+    # 吊销检查：布隆过滤器未命中时不访问数据库
+    if await revocation_list.is_revoked(
+        session, principal.id, principal.token_jti, principal.token_iat
+    ):
+        principal_cache.discard(token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="令牌已失效，请重新登录",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    return user
+    # 记录当前用户，写入后其读取在固定期内走主库
+    current_user_id.set(principal.id)
+    return principal
 
 
 # 当前用户依赖
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
 async def get_current_active_user(
     current_user: CurrentUser,
-) -> User:
+) -> Principal:
     """获取当前激活用户"""
     if not current_user.is_active:
         raise HTTPException(
@@ -62,12 +118,12 @@ async def get_current_active_user(
 
 
 # 当前激活用户依赖
-CurrentActiveUser = Annotated[User, Depends(get_current_active_user)]
+CurrentActiveUser = Annotated[Principal, Depends(get_current_active_user)]
 
 
 async def get_current_admin_user(
     current_user: CurrentActiveUser,
-) -> User:
+) -> Principal:
     """获取当前管理员用户"""
     if not current_user.is_admin:
         raise HTTPException(
@@ -78,4 +134,4 @@ async def get_current_admin_user(
 
 
 # 当前管理员用户依赖
-CurrentAdminUser = Annotated[User, Depends(get_current_admin_user)]
+CurrentAdminUser = Annotated[Principal, Depends(get_current_admin_user)]
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class HashingQueueFull(Exception):
+    """等待哈希的任务已达上限"""
+
+
+class PasswordHasher:
+    """密码哈希执行器
+
+    bcrypt 计算耗时数百毫秒，直接在 async 路由中调用会阻塞事件循环。
+    这里把计算交给独立的进程池（workers=0 时使用单个线程），
+    并限制排队中的任务数，超出时立即拒绝而不是无限堆积。
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    # spawn 启动的子进程不继承父进程中的数据库连接和线程
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="password-hash"
+                    )
+            return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingQueueFull("密码哈希任务过多，请稍后重试")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(settings.HASH_WORKERS, settings.HASH_QUEUE_SIZE)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在哈希执行器中生成密码哈希"""
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在哈希执行器中验证密码"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
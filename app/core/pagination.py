@@ -0,0 +1,70 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+class Page(NamedTuple):
+    """一页列表数据"""
+
+    total: Optional[int]  # 未要求总数时为 None
+    items: List[Any]
+    next_cursor: Optional[str] = None  # 没有下一页时为 None
+    snippets: Optional[Dict[int, str]] = None  # 搜索时的高亮片段（文章ID → 片段）
+    total_estimated: bool = False  # total 是否为近似值
+
+
+def brief_columns(model, schema) -> tuple:
+    """列表响应模型中与数据表同名的字段对应的列
+
+    列表查询只选这些列，返回轻量的 Row 对象（可按属性访问），不加载大字段，
+    也不进入会话的身份映射和变更跟踪。模型需包含 id 和 created_at 以便分页。
+    """
+    columns = model.__table__.columns
+    return tuple(getattr(model, name) for name in schema.model_fields if name in columns)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """把最后一行的 (created_at, id) 编码为不透明的游标"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标，格式不正确时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("无效的分页游标")
+
+
+async def fetch_page(
+    session: AsyncSession,
+    query,
+    model,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """按 (created_at, id) 倒序分页，返回 (本页数据, 下一页游标)
+
+    传入游标时从游标之后继续（键集分页，深度翻页不变慢，新数据插入也不会让行在页间移动）；
+    否则按 skip 偏移，保持旧接口可用。两种方式都会返回下一页的游标。
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    elif skip:
+        query = query.offset(skip)
+    # 多取一行判断是否还有下一页
+    rows = (await session.exec(query.limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return list(rows), None
+    last = rows[limit - 1]
+    return list(rows[:limit]), encode_cursor(last.created_at, last.id)
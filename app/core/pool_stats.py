@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 获取连接耗时直方图的桶上限（毫秒），最后一个桶收集超出部分
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolStats:
+    """连接池获取连接的统计：次数、超时、耗时与直方图"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        index = len(HISTOGRAM_BUCKETS_MS)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.buckets[index] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            labels = [f"le_{bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + ["inf"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.total_ms, 3),
+                "wait_ms_avg": round(self.total_ms / observed, 3) if observed else 0.0,
+                "wait_ms_max": round(self.max_ms, 3),
+                "histogram": dict(zip(labels, self.buckets)),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """记录每次获取连接的耗时（含排队等待和 pre-ping）"""
+
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.observe((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.stats.observe((time.perf_counter() - start) * 1000)
+        return connection
+
+    def recreate(self):
+        # dispose() 会重建连接池，统计数据沿用到新池
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """带统计的同步连接池"""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """带统计的异步连接池"""
+
+
+def pool_status(pool) -> Dict[str, Optional[object]]:
+    """汇总连接池当前状态和累计统计"""
+    status: Dict[str, Optional[object]] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            timeout=pool.timeout(),
+        )
+    stats = getattr(pool, "stats", None)
+    if isinstance(stats, PoolStats):
+        status.update(stats.snapshot())
+    return status
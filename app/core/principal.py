@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+class Principal(BaseModel):
+    """已认证用户的精简快照，认证依赖返回它而不是完整的 User 行"""
+
+    model_config = {"frozen": True}
+
+    id: int
+    username: str
+    is_active: bool
+    is_admin: bool
+    # 令牌ID与签发时间，用于吊销检查；旧令牌没有这两个声明
+    token_jti: Optional[str] = None
+    token_iat: Optional[float] = None
+
+    @classmethod
+    def from_user(cls, user, claims: Optional[dict] = None) -> "Principal":
+        claims = claims or {}
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+            token_jti=claims.get("jti"),
+            token_iat=claims.get("iat"),
+        )
+
+
+class PrincipalCache:
+    """已验证令牌到用户快照的缓存（容量有限的 LRU，条目带过期时间）
+
+    条目在 TTL 与令牌自身过期时间中较早者到期；用户资料变更时按用户ID清除。
+    缓存只在当前进程内有效，多进程部署时其他进程依靠 TTL 收敛。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires, principal = entry
+            if expires <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = time.time() + self.ttl
+        if token_exp is not None:
+            expires = min(expires, token_exp)
+        with self._lock:
+            self._entries[token] = (expires, principal)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """清除某个用户的全部缓存令牌"""
+        with self._lock:
+            stale = [t for t, (_, p) in self._entries.items() if p.id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL)
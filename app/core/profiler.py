@@ -0,0 +1,90 @@
+import json
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 压缩 IN (?, ?, ...) 等可变长度参数列表，使同形语句归为一类
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """把 SQL 归一化为语句形状（参数已是占位符，只需压缩空白和参数列表）"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PARAM_LIST.sub("(?)", shape)
+
+
+class RequestProfile:
+    """单个请求内的 SQL 统计：语句数、数据库耗时和重复的语句形状"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.queries += 1
+        self.db_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def n_plus_one(self, threshold: int) -> List[Dict[str, object]]:
+        """同一形状的 SELECT 执行次数达到阈值时，视为疑似 N+1 查询"""
+        return [
+            {"statement": shape, "count": count}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold and shape.upper().startswith("SELECT")
+        ]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries", '
+            f"total;dur={self.total_ms:.1f}"
+        )
+
+    def log_line(self, method: str, path: str, status_code: int, threshold: int) -> str:
+        """生成结构化日志（JSON）"""
+        return json.dumps(
+            {
+                "event": "db_profile",
+                "method": method,
+                "path": path,
+                "status": status_code,
+                "queries": self.queries,
+                "db_ms": round(self.db_ms, 3),
+                "total_ms": round(self.total_ms, 3),
+                "n_plus_one": self.n_plus_one(threshold),
+            },
+            ensure_ascii=False,
+        )
+
+
+# 当前请求的统计对象；未采样的请求为 None，事件监听直接跳过
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def install_query_profiler(engine: Engine) -> None:
+    """在引擎上注册语句计时事件（异步引擎请传入 sync_engine）"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_profile.get() is not None:
+            context._profile_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        start = getattr(context, "_profile_start", None)
+        if profile is not None and start is not None:
+            profile.record(statement, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import markdown
+
+logger = logging.getLogger(__name__)
+
+# 渲染逻辑（扩展配置之外）发生变化时递增，使旧缓存全部失效
+RENDERER_VERSION = f"1/markdown-{markdown.__version__}"
+
+
+class RenderCache:
+    """Markdown → HTML 渲染结果缓存
+
+    键是 (渲染器版本, 扩展列表, Markdown 原文) 的 SHA-256 摘要，内容相同即命中，
+    与文章无关，模板和重复段落也能共用。内存中按 LRU 保留最多 maxsize 条、
+    合计不超过 max_bytes 字节（UTF-8）的结果，单条超过 max_bytes 的结果不进入内存；
+    配置了 directory 时同时写入磁盘，进程重启或内存淘汰后仍可命中。
+    在事件循环中使用 get_async/put_async，磁盘读写放到线程中执行。
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        directory: Optional[str] = None,
+        extensions=(),
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self._prefix = f"{RENDERER_VERSION}\0{','.join(extensions)}\0".encode("utf-8")
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(self._prefix + text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.html"
+
+    def get(self, key: str) -> Optional[str]:
+        html = self._memory_get(key)
+        if html is not None:
+            return html
+        return self._loaded(key, self._read(key))
+
+    def put(self, key: str, html: str) -> None:
+        self._remember(key, html)
+        self._write(key, html)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        html = self._memory_get(key)
+        if html is not None:
+            return html
+        if self.directory is None:
+            return self._loaded(key, None)
+        return self._loaded(key, await asyncio.to_thread(self._read, key))
+
+    async def put_async(self, key: str, html: str) -> None:
+        self._remember(key, html)
+        if self.directory is not None:
+            await asyncio.to_thread(self._write, key, html)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _loaded(self, key: str, html: Optional[str]) -> Optional[str]:
+        """记录磁盘查找的结果，命中时放入内存"""
+        with self._lock:
+            if html is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, html)
+        return html
+
+    def _remember(self, key: str, html: str) -> None:
+        if self.maxsize <= 0:
+            return
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (html, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def _read(self, key: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"读取渲染缓存失败: {e}")
+            return None
+
+    def _write(self, key: str, html: str) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再改名，其他进程不会读到写了一半的文件
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"写入渲染缓存失败: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "persistent": self.directory is not None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """清空内存缓存和计数（磁盘文件保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
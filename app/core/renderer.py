@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence, Tuple, Union
+
+import markdown
+
+from app.core.config import settings
+from app.core.render_cache import RenderCache
+
+logger = logging.getLogger(__name__)
+
+# 扩展列表只在启动时解析一次
+MARKDOWN_EXTENSIONS = tuple(
+    name.strip() for name in settings.MARKDOWN_EXTENSIONS.split(",") if name.strip()
+)
+
+_local = threading.local()
+
+
+class RenderError(Exception):
+    """Markdown 渲染失败"""
+
+
+class RenderTooLarge(RenderError):
+    """内容超过渲染大小上限"""
+
+
+class RenderTimeout(RenderError):
+    """渲染超时"""
+
+
+def _get_markdown() -> markdown.Markdown:
+    """返回当前线程（或进程）复用的 Markdown 实例，扩展只加载一次"""
+    md = getattr(_local, "markdown", None)
+    if md is None:
+        md = _local.markdown = markdown.Markdown(extensions=list(MARKDOWN_EXTENSIONS))
+    return md
+
+
+def render_markdown(text: str) -> str:
+    """同步渲染 Markdown；Markdown 实例不是线程安全的，每个线程各用一个并在使用后重置"""
+    md = _get_markdown()
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+
+def render_markdown_batch(texts: Sequence[str]) -> List[Tuple[bool, str]]:
+    """依次渲染一组文档，返回 (是否成功, HTML 或错误信息)，单篇失败不影响其他"""
+    outcomes = []
+    for text in texts:
+        try:
+            outcomes.append((True, render_markdown(text)))
+        except Exception as e:
+            outcomes.append((False, str(e) or type(e).__name__))
+    return outcomes
+
+
+class MarkdownRenderer:
+    """Markdown 渲染执行器
+
+    小文档直接在当前线程渲染；超过 inline_limit 字节的文档交给独立的进程池，
+    并限制渲染时间，避免一篇超大文章长时间占住事件循环。超过 max_size 的内容直接拒绝。
+    workers=0 时使用单个线程代替进程池（超时后线程无法中止，只能放弃等待）。
+    """
+
+    def __init__(self, workers: int, inline_limit: int, max_size: int, timeout: float):
+        self.workers = workers
+        self.inline_limit = inline_limit
+        self.max_size = max_size
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="markdown-render"
+                    )
+            return self._executor
+
+    async def render(self, text: str) -> str:
+        size = len(text.encode("utf-8"))
+        if size > self.max_size:
+            raise RenderTooLarge(f"内容超过 {self.max_size // 1024} KB，无法渲染")
+        if size <= self.inline_limit:
+            return render_markdown(text)
+        try:
+            return await asyncio.wait_for(self._submit(render_markdown, text), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Markdown 渲染超时（{size} 字节），重建渲染进程池")
+            self.terminate()
+            raise RenderTimeout(f"内容渲染超过 {self.timeout:g} 秒，请拆分后重试")
+
+    async def _submit(self, func, *args):
+        """在执行器中运行 func
+
+        其他任务超时会结束整个进程池，同时在执行的任务因此失败（BrokenProcessPool），
+        这种情况在重建的进程池上重试一次；进程池不是被重建而是自行崩溃时报告渲染失败。
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                if attempt or executor is self._executor:
+                    logger.error("渲染进程异常退出", exc_info=True)
+                    raise RenderError("渲染进程异常退出，请稍后重试")
+                logger.info("渲染进程池已被重建，重新提交渲染任务")
+
+    async def render_many(self, texts: Sequence[str]) -> List[Union[str, RenderError]]:
+        """批量渲染（导入等场景）：分组交给执行器并行渲染，不占用事件循环
+
+        每组在工作进程中依次渲染，减少逐篇提交的进程间通信开销。返回与输入一一对应的
+        HTML 或 RenderError，单篇失败不影响其他；整批的等待时间按每个工作者需要渲染的篇数放宽。
+        """
+        results: List[Union[str, RenderError, None]] = [None] * len(texts)
+        indexes = []
+        for index, text in enumerate(texts):
+            if len(text.encode("utf-8")) > self.max_size:
+                results[index] = RenderTooLarge(f"内容超过 {self.max_size // 1024} KB，无法渲染")
+            else:
+                indexes.append(index)
+        if not indexes:
+            return results
+        workers = max(self.workers, 1)
+        size = -(-len(indexes) // (workers * 4))
+        groups = [indexes[i:i + size] for i in range(0, len(indexes), size)]
+        futures = {
+            asyncio.ensure_future(
+                self._submit(render_markdown_batch, [texts[index] for index in group])
+            ): group
+            for group in groups
+        }
+        per_worker = -(-len(indexes) // workers)
+        _, not_done = await asyncio.wait(futures, timeout=self.timeout * per_worker)
+        if not_done:
+            logger.warning(f"批量渲染超时，{len(not_done)} 组未完成，重建渲染进程池")
+            self.terminate()
+        for future, group in futures.items():
+            if future in not_done:
+                future.cancel()
+                outcomes = [(False, None)] * len(group)
+            elif future.exception() is not None:
+                outcomes = [(False, str(future.exception()))] * len(group)
+            else:
+                outcomes = future.result()
+            for index, (ok, value) in zip(group, outcomes):
+                if ok:
+                    results[index] = value
+                elif value is None:
+                    results[index] = RenderTimeout(f"内容渲染超过 {self.timeout:g} 秒")
+                else:
+                    results[index] = RenderError(f"渲染失败: {value}")
+        return results
+
+    def terminate(self) -> None:
+        """结束卡住的渲染进程；下次使用时重新创建进程池
+
+        同一进程池中其他在执行或排队的任务会得到 BrokenProcessPool，由 _submit 在新进程池上重试。
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if isinstance(executor, ProcessPoolExecutor):
+            # 标准库没有公开终止单个任务的接口，只能结束工作进程
+            for process in list(getattr(executor, "_processes", {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+renderer = MarkdownRenderer(
+    settings.RENDER_WORKERS,
+    settings.RENDER_INLINE_LIMIT,
+    settings.RENDER_MAX_SIZE,
+    settings.RENDER_TIMEOUT,
+)
+
+
+render_cache = RenderCache(
+    settings.RENDER_CACHE_SIZE,
+    settings.RENDER_CACHE_DIR or None,
+    MARKDOWN_EXTENSIONS,
+    max_bytes=settings.RENDER_CACHE_MAX_BYTES,
+)
+
+
+async def render_markdown_async(text: str) -> str:
+    """渲染 Markdown；缓存命中时不再渲染，大文档在渲染进程池中执行"""
+    key = render_cache.key(text)
+    html = await render_cache.get_async(key)
+    if html is None:
+        html = await renderer.render(text)
+        await render_cache.put_async(key, html)
+    return html
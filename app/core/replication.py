@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import sqlite3
+from typing import List, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+
+def sqlite_path(url: str) -> Optional[str]:
+    """从 SQLite 数据库地址中取出文件路径，内存库返回 None"""
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("sqlite"):
+        return None
+    if parsed.database in (None, "", ":memory:"):
+        return None
+    return parsed.database
+
+
+class LocalReplicator:
+    """本地复制替身
+
+    用 SQLite 在线备份 API 把主库整体复制到各副本文件，
+    模拟带延迟的主从复制，便于在本地验证读写分离。
+    主库未发生变化时（PRAGMA data_version 不变）跳过复制。
+    """
+
+    def __init__(self, primary_path: str, replica_paths: List[str], interval: float = 1.0):
+        self.primary_path = primary_path
+        self.replica_paths = replica_paths
+        self.interval = interval
+        self._source: Optional[sqlite3.Connection] = None
+        self._last_version: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._source is None:
+            self._source = sqlite3.connect(self.primary_path, check_same_thread=False)
+        return self._source
+
+    def sync(self, force: bool = False) -> bool:
+        """把主库复制到副本，返回是否实际执行了复制"""
+        source = self._connection()
+        version = source.execute("PRAGMA data_version").fetchone()[0]
+        if not force and version == self._last_version:
+            return False
+        for path in self.replica_paths:
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        self._last_version = version
+        logger.debug(f"已复制主库到 {len(self.replica_paths)} 个副本")
+        return True
+
+    async def run(self) -> None:
+        """后台循环复制，直到任务被取消"""
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                logger.error(f"本地复制失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    def close(self) -> None:
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+
+def local_replicator_from_settings() -> Optional[LocalReplicator]:
+    """按配置创建本地复制替身，未开启或不是 SQLite 文件库时返回 None"""
+    if not settings.DB_LOCAL_REPLICATION:
+        return None
+    primary = sqlite_path(settings.DATABASE_URL)
+    replicas = [
+        sqlite_path(url.strip())
+        for url in settings.DATABASE_REPLICA_URLS.split(",")
+        if url.strip()
+    ]
+    if primary is None or not replicas or None in replicas:
+        logger.warning("本地复制只支持 SQLite 文件数据库，已忽略 DB_LOCAL_REPLICATION")
+        return None
+    return LocalReplicator(primary, replicas, settings.DB_LOCAL_REPLICATION_INTERVAL)
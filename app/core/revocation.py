@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+from datetime import UTC, datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlmodel import delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import session_scope
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def user_revocation_key(user_id: int) -> str:
+    """用户级吊销记录的键：吊销该用户在某时刻之前签发的全部令牌"""
+    return f"user:{user_id}"
+
+
+class BloomFilter:
+    """布隆过滤器：不存在的键一定返回 False，存在的键可能误判为 True"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # 双重哈希：由一个 128 位摘要派生出 k 个位置
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationList:
+    """令牌吊销列表
+
+    数据库中的 revoked_token 表是权威数据，进程内的布隆过滤器挡在前面：
+    绝大多数未吊销的令牌只需几次哈希探测即可放行，只有过滤器命中时才查询数据库。
+    过滤器按自增ID增量刷新；本进程写入的吊销记录立即加入过滤器，
+    其他进程在下一次刷新（REVOCATION_REFRESH_INTERVAL）后生效。
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = BloomFilter(self.capacity, self.error_rate)
+            self._last_id = 0
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            self._filter.add(key)
+
+    def might_be_revoked(self, key: str) -> bool:
+        return key in self._filter
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """加载上次刷新之后新增的吊销记录，返回新增条数"""
+        rows = (await session.exec(
+            select(RevokedToken.id, RevokedToken.jti)
+            .where(RevokedToken.id > self._last_id)
+            .order_by(RevokedToken.id)
+        )).all()
+        with self._lock:
+            for row_id, jti in rows:
+                self._filter.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            oversized = self._filter.count > self.capacity
+        if oversized:
+            await self.rebuild(session)
+        return len(rows)
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """按当前未过期的记录重建过滤器，去掉已过期记录占用的位"""
+        rows = (await session.exec(
+            select(RevokedToken.id, RevokedToken.jti).where(
+                RevokedToken.expires_at >= _utcnow()
+            )
+        )).all()
+        new_filter = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        last_id = 0
+        for row_id, jti in rows:
+            new_filter.add(jti)
+            last_id = max(last_id, row_id)
+        with self._lock:
+            self._filter = new_filter
+            self._last_id = max(self._last_id, last_id)
+
+    async def is_revoked(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        jti: Optional[str],
+        issued_at: Optional[float],
+    ) -> bool:
+        """判断令牌是否已被吊销；过滤器未命中时不访问数据库"""
+        user_key = user_revocation_key(user_id)
+        keys = [key for key in (jti, user_key) if key and self.might_be_revoked(key)]
+        if not keys:
+            return False
+        rows = (await session.exec(
+            select(RevokedToken).where(RevokedToken.jti.in_(keys))
+        )).all()
+        for row in rows:
+            if row.jti != user_key:
+                return True
+            # 用户级吊销：早于吊销时间签发（或没有签发时间）的令牌失效
+            if issued_at is None:
+                return True
+            issued = datetime.fromtimestamp(issued_at, UTC).replace(tzinfo=None)
+            if issued <= row.revoked_at:
+                return True
+        return False
+
+
+revocation_list = RevocationList(
+    settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE
+)
+
+
+async def revoke_token(session: AsyncSession, user_id: int, jti: str, expires_at: datetime) -> None:
+    """吊销单个令牌（调用方负责提交），提交后应调用 revocation_list.add"""
+    if (await session.exec(select(RevokedToken).where(RevokedToken.jti == jti))).first():
+        return
+    session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+
+
+async def revoke_user_tokens(session: AsyncSession, user_id: int) -> str:
+    """吊销用户此前签发的全部访问令牌和刷新令牌（调用方负责提交），返回需要加入过滤器的键
+
+    已有的用户级记录会被替换，使新记录获得新的自增ID，其他进程增量刷新时能看到。
+    """
+    await session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_utcnow())
+    )
+    key = user_revocation_key(user_id)
+    await session.exec(delete(RevokedToken).where(RevokedToken.jti == key))
+    session.add(
+        RevokedToken(
+            jti=key,
+            user_id=user_id,
+            revoked_at=_utcnow(),
+            # 此后签发的令牌不受影响，早于吊销时间的令牌在有效期结束后自然失效
+            expires_at=_utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+    )
+    return key
+
+
+async def purge_expired_revocations(session: AsyncSession) -> int:
+    """删除已过期的吊销记录（对应的令牌已经过期）"""
+    result = await session.exec(
+        delete(RevokedToken).where(RevokedToken.expires_at < _utcnow())
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def load_revocation_list() -> None:
+    """启动时加载吊销列表，加载完成前不接收请求，避免已吊销的令牌在启动瞬间通过认证"""
+    try:
+        async with session_scope() as session:
+            await revocation_list.rebuild(session)
+    except Exception as e:
+        logger.error(f"加载令牌吊销列表失败: {e}")
+
+
+async def run_revocation_refresher(interval: float, rebuild_every: int = 1800) -> None:
+    """后台循环增量刷新吊销列表；每 rebuild_every 次清理过期记录并重建过滤器
+
+    首次加载由 load_revocation_list 在启动时完成，这里从一个刷新间隔之后开始。
+    """
+    iteration = 1
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_scope() as session:
+                if iteration % rebuild_every == 0:
+                    await purge_expired_revocations(session)
+                    await revocation_list.rebuild(session)
+                else:
+                    await revocation_list.refresh(session)
+        except Exception as e:
+            logger.error(f"刷新令牌吊销列表失败: {e}")
+        iteration += 1
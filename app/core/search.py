@@ -0,0 +1,89 @@
+import re
+from typing import Optional
+
+from sqlalchemy import DDL, Column, Integer, MetaData, Table, Text, event, func, literal_column
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+
+# FTS5 的 unicode61 分词器把连续的汉字当成一个词。写入和查询前在每个 CJK 字符两侧插入零宽空格
+# （unicode61 视其为分隔符），使每个汉字成为一个词，多字查询按短语匹配相邻的字。
+ZERO_WIDTH_SPACE = "\u200b"
+# 假名、CJK 统一汉字（含扩展A）、兼容汉字、谚文音节、半角片假名；按连续片段匹配，
+# 每段只调用一次替换函数（逐字替换在长正文上很慢）
+_CJK = re.compile(
+    "[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af\uff66-\uff9f]+"
+)
+# 查询中可以成为词的字符（字母、数字、CJK）
+_WORD = re.compile(r"\w", re.UNICODE)
+
+FTS_TABLE = "post_fts"
+
+# 仅用于构造查询语句，不注册到 SQLModel.metadata（虚拟表由下面的 DDL 创建）
+post_fts = Table(
+    FTS_TABLE,
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("title", Text),
+    Column("summary", Text),
+    Column("content", Text),
+)
+post_fts_match = literal_column(FTS_TABLE)
+
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, summary, content, tokenize='unicode61 remove_diacritics 2')"
+)
+DROP_FTS_TABLE = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+# create_all / drop_all 时一并创建和删除虚拟表（仅 SQLite）
+event.listen(SQLModel.metadata, "after_create", DDL(CREATE_FTS_TABLE).execute_if(dialect="sqlite"))
+event.listen(SQLModel.metadata, "before_drop", DDL(DROP_FTS_TABLE).execute_if(dialect="sqlite"))
+
+# bm25 列权重：标题 > 摘要 > 正文
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def _segment_run(match: re.Match) -> str:
+    run = match.group()
+    return ZERO_WIDTH_SPACE + (ZERO_WIDTH_SPACE * 2).join(run) + ZERO_WIDTH_SPACE
+
+
+def segment_cjk(text: Optional[str]) -> str:
+    """在 CJK 字符两侧插入零宽空格，供写入索引和构造查询使用"""
+    if not text:
+        return ""
+    return _CJK.sub(_segment_run, text)
+
+
+def strip_segmentation(text: Optional[str]) -> Optional[str]:
+    """去掉片段中的零宽空格，还原原文"""
+    return text.replace(ZERO_WIDTH_SPACE, "") if text else text
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """把用户输入转换为 FTS5 查询：按空白拆分，每段作为一个短语，各段同时出现才匹配
+
+    输入中没有可检索的字符时返回 None，调用方应退回 LIKE 查询。
+    """
+    phrases = []
+    for term in search.split():
+        if not _WORD.search(term):
+            continue
+        # 短语内的双引号需要转义，其余 FTS5 语法字符在短语中没有特殊含义
+        phrases.append('"' + segment_cjk(term).replace('"', '""') + '"')
+    return " ".join(phrases) or None
+
+
+def fts_supported() -> bool:
+    """FTS5 全文索引只在 SQLite 上可用，可通过 SEARCH_FTS_ENABLED 关闭（退回 LIKE 查询）"""
+    return settings.SEARCH_FTS_ENABLED and settings.DATABASE_URL.startswith("sqlite")
+
+
+def bm25_rank():
+    return func.bm25(post_fts_match, *BM25_WEIGHTS)
+
+
+def snippet(column: int = -1, tokens: int = 24):
+    """命中内容的高亮片段；column 为 -1 时自动选择最匹配的列"""
+    return func.snippet(post_fts_match, column, "<mark>", "</mark>", "…", tokens)
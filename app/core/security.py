@@ -1,21 +1,27 @@
+import hashlib
 import logging
 import secrets
 import string
+import time
+import uuid
 from datetime import datetime, timedelta, UTC
 from typing import Any, Optional, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 # 创建日志记录器
 logger = logging.getLogger(__name__)
 
-# 配置passlib
+# 配置passlib；低于配置成本的已有哈希会被 needs_update 标记为需要重新哈希
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
     bcrypt__ident="2b",
-    bcrypt__min_rounds=12,
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
 )
 
 
@@ -33,12 +39,18 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """哈希算法或成本低于当前配置时返回 True"""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except ValueError:
+        return False
+
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
     """创建JWT访问令牌"""
-    from app.core.config import settings
-
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
@@ -46,7 +58,13 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expire, "sub": str(subject)}
+    # jti 用于单独吊销令牌；iat 保留小数，便于与吊销时间精确比较
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+        "iat": time.time(),
+    }
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -57,3 +75,13 @@ def generate_reset_token(length: int = 32) -> str:
     """生成用于密码重置的随机令牌"""
     alphabet = string.ascii_letters + string.digits
     return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
+def generate_refresh_token() -> str:
+    """生成不透明的刷新令牌"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_token(token: str) -> str:
+    """计算重置令牌、刷新令牌的 SHA-256 摘要，数据库中只保存摘要"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
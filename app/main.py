@@ -1,3 +1,5 @@
+import asyncio
+import random
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
@@ -7,11 +9,20 @@ from fastapi.responses import JSONResponse
 from sqlmodel import SQLModel
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import (async_engine, engine, replica_engines,
+                               writer_engine)
+from app.core.hashing import HashingQueueFull, password_hasher
 from app.core.logging_config import setup_logging
-from app.routers import (auth_router, category_router, comment_router,
-                         dashboard_router, post_router, tag_router,
-                         user_router)
+from app.core.profiler import RequestProfile, current_profile
+from app.core.renderer import RenderError, RenderTooLarge, renderer
+from app.core.replication import local_replicator_from_settings
+from app.core.revocation import (load_revocation_list,
+                                 run_revocation_refresher)
+from app.routers import (admin_router, auth_router, category_router,
+                         comment_router, dashboard_router, post_router,
+                         tag_router, user_router)
+from app.services.auth_service import run_token_sweeper
+from app.services.email_service import run_email_worker, smtp_pool
 
 # 设置日志
 logger = setup_logging()
@@ -23,8 +34,45 @@ async def lifespan(app: FastAPI):
     logger.info(f"正在启动 {settings.APP_NAME} 应用程序...")
     if settings.DEBUG:
         SQLModel.metadata.create_all(engine)
+    replicator = local_replicator_from_settings()
+    replication_task = None
+    if replicator:
+        replicator.sync(force=True)
+        replication_task = asyncio.create_task(replicator.run())
+    await load_revocation_list()
+    revocation_task = asyncio.create_task(
+        run_revocation_refresher(settings.REVOCATION_REFRESH_INTERVAL)
+    )
+    sweeper_task = None
+    if settings.RESET_TOKEN_SWEEP_INTERVAL > 0:
+        sweeper_task = asyncio.create_task(
+            run_token_sweeper(
+                settings.RESET_TOKEN_SWEEP_INTERVAL, settings.RESET_TOKEN_SWEEP_BATCH
+            )
+        )
+    email_task = None
+    if settings.EMAIL_OUTBOX_POLL_INTERVAL > 0:
+        email_task = asyncio.create_task(
+            run_email_worker(settings.EMAIL_OUTBOX_POLL_INTERVAL, settings.EMAIL_OUTBOX_BATCH)
+        )
     yield
     logger.info(f"{settings.APP_NAME} 应用程序正在关闭...")
+    if replication_task:
+        replication_task.cancel()
+        replicator.close()
+    revocation_task.cancel()
+    if sweeper_task:
+        sweeper_task.cancel()
+    if email_task:
+        email_task.cancel()
+    await async_engine.dispose()
+    if writer_engine is not async_engine:
+        await writer_engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+    password_hasher.shutdown()
+    renderer.shutdown()
+    smtp_pool.close()
 
 
 # 创建FastAPI实例
@@ -65,6 +113,29 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    """密码哈希排队已满时返回 503，提示客户端稍后重试"""
+    logger.warning(f"密码哈希队列已满: {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(RenderError)
+async def render_error_handler(request: Request, exc: RenderError):
+    """内容过大返回 413，渲染超时返回 422"""
+    logger.warning(f"Markdown 渲染失败: {request.method} {request.url.path}: {exc}")
+    status_code = (
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        if isinstance(exc, RenderTooLarge)
+        else status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """记录所有请求"""
@@ -80,6 +151,28 @@ async def log_requests(request: Request, call_next):
         )
 
 
+@app.middleware("http")
+async def profile_queries(request: Request, call_next):
+    """按采样比例统计请求内的 SQL，写入响应头和结构化日志"""
+    if not settings.DB_PROFILER_ENABLED or random.random() >= settings.DB_PROFILER_SAMPLE_RATE:
+        return await call_next(request)
+    profile = RequestProfile()
+    token = current_profile.set(profile)
+    try:
+        response = await call_next(request)
+    finally:
+        current_profile.reset(token)
+    response.headers["Server-Timing"] = profile.server_timing()
+    response.headers["X-DB-Queries"] = str(profile.queries)
+    threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+    line = profile.log_line(request.method, request.url.path, response.status_code, threshold)
+    if profile.n_plus_one(threshold):
+        logger.warning(f"疑似 N+1 查询: {line}")
+    else:
+        logger.info(line)
+    return response
+
+
 # 注册路由器
 app.include_router(auth_router)
 app.include_router(user_router)
@@ -88,6 +181,7 @@ app.include_router(tag_router)
 app.include_router(post_router)
 app.include_router(comment_router)
 app.include_router(dashboard_router)
+app.include_router(admin_router)
 
 
 # 健康检查接口
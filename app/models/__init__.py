@@ -1,8 +1,25 @@
+# 注册全文索引虚拟表的建表/删表 DDL，create_all 时一并创建
+import app.core.search  # noqa: F401
 from app.models.association import PostTagLink
 from app.models.category import Category
 from app.models.comment import Comment
+from app.models.email_outbox import EmailOutbox
+from app.models.password_reset import PasswordResetToken
 from app.models.post import Post
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
 from app.models.tag import Tag
 from app.models.user import User
 
-__all__ = ["User", "Post", "Category", "Tag", "Comment", "PostTagLink"]
+__all__ = [
+    "User",
+    "Post",
+    "Category",
+    "Tag",
+    "Comment",
+    "PostTagLink",
+    "PasswordResetToken",
+    "RevokedToken",
+    "RefreshToken",
+    "EmailOutbox",
+]
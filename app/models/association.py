@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -5,6 +6,8 @@ class PostTagLink(SQLModel, table=True):
     """文章与标签多对多关联表"""
 
     __tablename__ = "post_tag_link"
+    # 主键 (post_id, tag_id) 只能按文章查标签，按标签筛选文章需要反向索引
+    __table_args__ = (Index("ix_post_tag_link_tag_id_post_id", "tag_id", "post_id"),)
 
     post_id: int = Field(foreign_key="post.id", primary_key=True)
     tag_id: int = Field(foreign_key="tag.id", primary_key=True)
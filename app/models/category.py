@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -11,6 +12,8 @@ class Category(SQLModel, table=True):
     """分类模型"""
 
     __tablename__ = "category"
+    # 列表按 (created_at, id) 倒序键集分页
+    __table_args__ = (Index("ix_category_created_at_id", "created_at", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, unique=True)
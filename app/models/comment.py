@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -12,6 +13,11 @@ class Comment(SQLModel, table=True):
     """评论模型"""
 
     __tablename__ = "comment"
+    # 列表按 (created_at, id) 倒序键集分页，按文章筛选时使用 (post_id, created_at, id)
+    __table_args__ = (
+        Index("ix_comment_created_at_id", "created_at", "id"),
+        Index("ix_comment_post_id_created_at", "post_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     content: str
@@ -19,7 +25,7 @@ class Comment(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     # 外键
-    author_id: int = Field(foreign_key="user.id")
+    author_id: int = Field(foreign_key="user.id", index=True)
     post_id: int = Field(foreign_key="post.id")
 
     # 关联关系
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class EmailOutbox(SQLModel, table=True):
+    """待发送的邮件
+
+    请求内只写入一行记录，由后台任务批量发送；
+    发送失败时按指数退避推迟 next_attempt_at，超过最大次数后标记为 failed。
+    """
+
+    __tablename__ = "email_outbox"
+    # 发送任务按状态和下次发送时间取件，已发送的记录不会被扫描到
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    to_email: str = Field(max_length=255)
+    subject: str = Field(max_length=255)
+    body: str
+    html: bool = Field(default=False)
+    status: str = Field(default="pending", max_length=16)  # pending / sent / failed
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: Optional[datetime] = Field(default=None)
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.association import PostTagLink
@@ -16,6 +17,14 @@ class Post(SQLModel, table=True):
     """文章模型"""
 
     __tablename__ = "post"
+    # 列表按 (created_at, id) 倒序键集分页；带筛选条件的列表使用以筛选列开头的组合索引，
+    # 末尾的 (created_at, id) 与排序一致，不需要额外排序
+    __table_args__ = (
+        Index("ix_post_created_at_id", "created_at", "id"),
+        Index("ix_post_published_created_at", "published", "created_at", "id"),
+        Index("ix_post_category_id_created_at", "category_id", "created_at", "id"),
+        Index("ix_post_author_id_created_at", "author_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(index=True)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class RevokedToken(SQLModel, table=True):
+    """已吊销的访问令牌
+
+    jti 为单个令牌的 ID（注销时写入），或 "user:<用户ID>" 表示
+    吊销该用户在 revoked_at 之前签发的全部令牌（修改密码、禁用用户时写入）。
+    expires_at 之后这些令牌本身已过期，记录可以删除。
+    """
+
+    __tablename__ = "revoked_token"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jti: str = Field(index=True, unique=True, max_length=64)
+    user_id: int = Field(index=True)
+    revoked_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.association import PostTagLink
@@ -13,6 +14,8 @@ class Tag(SQLModel, table=True):
     """标签模型"""
 
     __tablename__ = "tag"
+    # 列表按 (created_at, id) 倒序键集分页
+    __table_args__ = (Index("ix_tag_created_at_id", "created_at", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, unique=True)
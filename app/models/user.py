@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -12,6 +13,8 @@ class User(SQLModel, table=True):
     """用户模型"""
 
     __tablename__ = "user"
+    # 列表按 (created_at, id) 倒序键集分页
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(index=True, unique=True)
@@ -22,10 +25,6 @@ class User(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-    # 密码重置字段
-    reset_token: Optional[str] = Field(default=None)
-    reset_token_expires: Optional[datetime] = Field(default=None)
-
     # 关联关系
     posts: List["Post"] = Relationship(back_populates="author")
     comments: List["Comment"] = Relationship(back_populates="author")
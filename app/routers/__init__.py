@@ -1,3 +1,4 @@
+from app.routers.admin import router as admin_router
 from app.routers.auth import router as auth_router
 from app.routers.category import router as category_router
 from app.routers.comment import router as comment_router
@@ -14,4 +15,5 @@ __all__ = [
     "post_router",
     "comment_router",
     "dashboard_router",
+    "admin_router",
 ]
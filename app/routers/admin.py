@@ -0,0 +1,82 @@
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.dependencies import CurrentAdminUser
+from app.schemas.admin import PoolStatusResponse, RenderCacheStatus
+from app.schemas.post import PostImportResult
+from app.services.admin_service import (get_pool_status_service,
+                                        get_render_cache_status_service)
+from app.services.export_service import (EXPORT_MEDIA_TYPES,
+                                         export_comments_service,
+                                         export_posts_service)
+from app.services.import_service import import_posts_service
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+# 导出格式参数
+ExportFormat = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson 或 csv")
+
+
+def _export_response(chunks: AsyncIterator[bytes], name: str, fmt: str) -> StreamingResponse:
+    """把导出的字节流包装为附件下载响应"""
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+# 获取数据库连接池状态
+@router.get("/db/pool", response_model=PoolStatusResponse)
+async def get_pool_status(current_user: CurrentAdminUser):
+    """获取数据库连接池状态（仅管理员）"""
+    return get_pool_status_service()
+
+
+# 获取 Markdown 渲染缓存状态
+@router.get("/render-cache", response_model=RenderCacheStatus)
+async def get_render_cache_status(current_user: CurrentAdminUser):
+    """获取 Markdown 渲染缓存的命中统计（仅管理员）"""
+    return get_render_cache_status_service()
+
+
+# 批量导入文章
+@router.post("/posts/import", response_model=PostImportResult)
+async def import_posts(request: Request, current_user: CurrentAdminUser):
+    """从 NDJSON 请求体流式导入文章（仅管理员）
+
+    每行一个 JSON 对象，字段同创建文章，另可用 tags 按名称指定标签、用 created_at 保留原创建时间。
+    作者为当前管理员；出错的行在结果中列出，不影响其他行。
+    """
+    return await import_posts_service(request.stream(), current_user.id)
+
+
+# 导出文章
+@router.get("/posts/export")
+async def export_posts(
+    current_user: CurrentAdminUser,
+    format: str = ExportFormat,
+    search: Optional[str] = None,
+    categoryId: Optional[int] = None,
+    tagId: Optional[int] = None,
+    published: Optional[bool] = None,
+):
+    """按文章列表的筛选条件流式导出文章（仅管理员）
+
+    NDJSON 的每一行可以直接用于批量导入；CSV 中的 tag_ids 以空格分隔。
+    """
+    chunks = export_posts_service(format, search, categoryId, tagId, published)
+    return _export_response(chunks, "posts", format)
+
+
+# 导出评论
+@router.get("/comments/export")
+async def export_comments(
+    current_user: CurrentAdminUser,
+    format: str = ExportFormat,
+    postId: Optional[int] = None,
+):
+    """按评论列表的筛选条件流式导出评论（仅管理员）"""
+    return _export_response(export_comments_service(format, postId), "comments", format)
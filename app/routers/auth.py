@@ -1,16 +1,18 @@
 import logging
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlmodel import Session, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.database import get_session
+from app.core.dependencies import CurrentUser, oauth2_scheme
 from app.core.security import get_password_hash
 from app.core.validators import validate_password
 from app.models.user import User
 from app.schemas.auth import (PasswordChange, PasswordReset,
-                              PasswordResetRequest, RegisterResponse, Token)
+                              LogoutRequest, PasswordResetRequest,
+                              RefreshRequest, RegisterResponse, Token)
 from app.schemas.user import UserCreate, UserResponse
 from app.services.auth_service import (
     login_service,
@@ -19,15 +21,14 @@ from app.services.auth_service import (
     password_reset_request_service,
     reset_password_service,
     change_password_service,
-    get_user_by_token_service,
+    create_refresh_token_service,
+    logout_service,
+    refresh_access_token_service,
 )
 
 # 创建日志记录器
 logger = logging.getLogger(__name__)
 
-# OAuth2密码Bearer
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
-
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
@@ -35,7 +36,8 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    background_tasks: BackgroundTasks,
 ):
     if not form_data.username or not form_data.password:
         raise HTTPException(
@@ -43,7 +45,9 @@ async def login_for_access_token(
             detail="用户名和密码不能为空",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = login_service(session, form_data.username, form_data.password)
+    user = await login_service(
+        session, form_data.username, form_data.password, background_tasks
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,9 +60,35 @@ async def login_for_access_token(
             detail="用户已被禁用",
         )
     access_token = create_token_for_user(user)
+    refresh_token = await create_refresh_token_service(session, user.id)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "user_id": user.id,
+        "username": user.username,
+        "is_admin": user.is_admin,
+    }
+
+
+# 使用刷新令牌换取新的访问令牌（不校验密码）
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    refresh_data: RefreshRequest,
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    result = await refresh_access_token_service(session, refresh_data.refresh_token)
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="刷新令牌无效或已过期，请重新登录",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, access_token, refresh_token = result
     return {
         "access_token": access_token,
         "token_type": "bearer",
+        "refresh_token": refresh_token,
         "user_id": user.id,
         "username": user.username,
         "is_admin": user.is_admin,
@@ -69,10 +99,10 @@ async def login_for_access_token(
 # 注册用户
 @router.post("/register", response_model=UserResponse)
 async def register_user(
-    user_data: UserCreate, session: Annotated[Session, Depends(get_session)]
+    user_data: UserCreate, session: Annotated[AsyncSession, Depends(get_session)]
 ):
     try:
-        new_user = register_user_service(user_data, session)
+        new_user = await register_user_service(user_data, session)
         user_response = UserResponse(
             id=new_user.id,
             username=new_user.username,
@@ -87,7 +117,7 @@ async def register_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"用户注册失败: {e}")
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="用户注册失败，请重试",
@@ -97,10 +127,10 @@ async def register_user(
 # 注册并直接登录
 @router.post("/register-and-login", response_model=RegisterResponse)
 async def register_and_login(
-    user_data: UserCreate, session: Annotated[Session, Depends(get_session)]
+    user_data: UserCreate, session: Annotated[AsyncSession, Depends(get_session)]
 ):
     try:
-        new_user = register_user_service(user_data, session)
+        new_user = await register_user_service(user_data, session)
         access_token = create_token_for_user(new_user)
         return {
             "user_id": new_user.id,
@@ -114,7 +144,7 @@ async def register_and_login(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"用户注册并登录失败: {e}")
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="用户注册并登录失败，请重试",
@@ -125,45 +155,45 @@ async def register_and_login(
 @router.post("/password-reset-request")
 async def request_password_reset(
     reset_request: PasswordResetRequest,
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ):
-    return password_reset_request_service(reset_request, session)
+    return await password_reset_request_service(reset_request, session)
 
 
 # 重置密码
 @router.post("/password-reset")
 async def reset_password(
-    reset_data: PasswordReset, session: Annotated[Session, Depends(get_session)]
+    reset_data: PasswordReset, session: Annotated[AsyncSession, Depends(get_session)]
 ):
     try:
-        return reset_password_service(reset_data, session)
+        return await reset_password_service(reset_data, session)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-# 通过 token 获取当前用户
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[Session, Depends(get_session)],
-):
-    user = get_user_by_token_service(token, session)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="无效的认证凭据",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user
-
-
 # 修改密码
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChange,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Annotated[Session, Depends(get_session)],
+    current_user: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_session)],
 ):
+    user = await session.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
     try:
-        return change_password_service(password_data, current_user, session)
+        return await change_password_service(password_data, user, session)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# 注销（吊销当前令牌及其刷新令牌）
+@router.post("/logout")
+async def logout(
+    current_user: CurrentUser,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    logout_data: Optional[LogoutRequest] = None,
+):
+    refresh_token = logout_data.refresh_token if logout_data else None
+    return await logout_service(token, current_user, session, refresh_token)
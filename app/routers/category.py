@@ -1,7 +1,8 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query, status
 import logging
 
-from app.core.dependencies import (CurrentAdminUser,
+from app.core.dependencies import (CurrentAdminUser, ReadSessionDep,
                                    SessionDep)
 from app.schemas.category import (CategoryCreate, CategoryListResponse,
                                   CategoryResponse, CategoryUpdate)
@@ -23,23 +24,38 @@ router = APIRouter(prefix="/api/categories", tags=["categories"])
 # 获取分类列表
 @router.get("/", response_model=CategoryListResponse)
 async def get_categories(
-    session: SessionDep,
+    session: ReadSessionDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
 ):
-    """获取分类列表"""
+    """获取分类列表；传入上一页返回的 next_cursor 获取下一页
+
+    with_total=false 时不计算总数；estimated=true 时返回近似总数。
+    """
     try:
         # 获取分类列表和总数
-        total, categories = get_categories_service(session, skip, limit)
-        logger.info(f"获取分类列表: 总数={total}, 返回={len(categories)}")
+        page = await get_categories_service(
+            session, skip, limit, cursor, with_total=with_total, estimated=estimated
+        )
+        logger.info(f"获取分类列表: 总数={page.total}, 返回={len(page.items)}")
         
         # 将SQLModel对象转换为Pydantic响应模型
-        formatted_categories = [CategoryResponse.model_validate(category, from_attributes=True) for category in categories]
+        formatted_categories = [CategoryResponse.model_validate(category, from_attributes=True) for category in page.items]
         logger.info(f"格式化后的分类列表长度: {len(formatted_categories)}")
         
         # 构建并返回响应
-        response = CategoryListResponse(total=total, categories=formatted_categories)
+        response = CategoryListResponse(
+            total=page.total,
+            categories=formatted_categories,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
+        )
         return response
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取分类列表出错: {str(e)}", exc_info=True)
         raise
@@ -47,9 +63,9 @@ async def get_categories(
 
 # 获取分类详情
 @router.get("/{categoryId}", response_model=CategoryResponse)
-async def get_category(categoryId: int, session: SessionDep):
+async def get_category(categoryId: int, session: ReadSessionDep):
     """获取分类详情"""
-    category = get_category_service(categoryId, session)
+    category = await get_category_service(categoryId, session)
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="分类不存在")
     return category
@@ -61,11 +77,11 @@ async def create_category(
     category_data: CategoryCreate, session: SessionDep, current_user: CurrentAdminUser
 ):
     """创建分类"""
-    if check_category_exists(session, category_data.name):
+    if await check_category_exists(session, category_data.name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="分类名已存在"
         )
-    new_category = create_category_service(category_data, session)
+    new_category = await create_category_service(category_data, session)
     return new_category
 
 
@@ -78,14 +94,14 @@ async def update_category(
     current_user: CurrentAdminUser,
 ):
     """更新分类"""
-    category = get_category_service(categoryId, session)
+    category = await get_category_service(categoryId, session)
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="分类不存在")
-    if category_data.name and category_data.name != category.name and check_category_exists(session, category_data.name):
+    if category_data.name and category_data.name != category.name and await check_category_exists(session, category_data.name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="分类名已存在"
         )
-    updated_category = update_category_service(category, category_data, session)
+    updated_category = await update_category_service(category, category_data, session)
     return updated_category
 
 
@@ -95,7 +111,7 @@ async def delete_category(
     categoryId: int, session: SessionDep, current_user: CurrentAdminUser
 ):
     """删除分类"""
-    category = get_category_service(categoryId, session)
+    category = await get_category_service(categoryId, session)
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="分类不存在")
-    delete_category_service(category, session)
+    await delete_category_service(category, session)
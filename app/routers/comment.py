@@ -1,7 +1,9 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query, status
 import logging
 
-from app.core.dependencies import (CurrentActiveUser, SessionDep)
+from app.core.dependencies import (CurrentActiveUser, ReadSessionDep,
+                                   SessionDep)
 from app.schemas.comment import (CommentCreate, CommentListResponse,
                                  CommentResponse, CommentUpdate)
 from app.services.comment_service import (
@@ -21,24 +23,39 @@ router = APIRouter(prefix="/api/comments", tags=["comments"])
 # 获取评论列表
 @router.get("/", response_model=CommentListResponse)
 async def get_comments(
-    session: SessionDep,
+    session: ReadSessionDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     postId: int = None,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
 ):
-    """获取评论列表，可按文章ID筛选"""
+    """获取评论列表，可按文章ID筛选；传入上一页返回的 next_cursor 获取下一页
+
+    with_total=false 时不计算总数；estimated=true 时返回近似总数。
+    """
     try:
         # 获取评论列表和总数
-        total, comments = get_comments_service(session, skip, limit, postId)
-        logger.info(f"获取评论列表: 总数={total}, 返回={len(comments)}")
+        page = await get_comments_service(
+            session, skip, limit, postId, cursor, with_total=with_total, estimated=estimated
+        )
+        logger.info(f"获取评论列表: 总数={page.total}, 返回={len(page.items)}")
         
         # 将SQLModel对象转换为Pydantic响应模型
-        formatted_comments = [CommentResponse.model_validate(comment, from_attributes=True) for comment in comments]
+        formatted_comments = [CommentResponse.model_validate(comment, from_attributes=True) for comment in page.items]
         logger.info(f"格式化后的评论列表长度: {len(formatted_comments)}")
         
         # 构建并返回响应
-        response = CommentListResponse(total=total, comments=formatted_comments)
+        response = CommentListResponse(
+            total=page.total,
+            comments=formatted_comments,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
+        )
         return response
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取评论列表出错: {str(e)}", exc_info=True)
         raise
@@ -46,9 +63,9 @@ async def get_comments(
 
 # 获取评论详情
 @router.get("/{commentId}", response_model=CommentResponse)
-async def get_comment(commentId: int, session: SessionDep):
+async def get_comment(commentId: int, session: ReadSessionDep):
     """获取评论详情"""
-    comment = get_comment_service(commentId, session)
+    comment = await get_comment_service(commentId, session)
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="评论不存在")
     return comment
@@ -60,7 +77,7 @@ async def create_comment(
     comment_data: CommentCreate, session: SessionDep, current_user: CurrentActiveUser
 ):
     """创建评论"""
-    new_comment = create_comment_service(comment_data, session, current_user.id)
+    new_comment = await create_comment_service(comment_data, session, current_user.id)
     if not new_comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文章不存在")
     return new_comment
@@ -75,14 +92,14 @@ async def update_comment(
     current_user: CurrentActiveUser,
 ):
     """更新评论"""
-    comment = get_comment_service(commentId, session)
+    comment = await get_comment_service(commentId, session)
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="评论不存在")
     if comment.author_id != current_user.id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="没有权限更新此评论"
         )
-    updated_comment = update_comment_service(comment, comment_data, session)
+    updated_comment = await update_comment_service(comment, comment_data, session)
     return updated_comment
 
 
@@ -92,11 +109,11 @@ async def delete_comment(
     commentId: int, session: SessionDep, current_user: CurrentActiveUser
 ):
     """删除评论"""
-    comment = get_comment_service(commentId, session)
+    comment = await get_comment_service(commentId, session)
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="评论不存在")
     if comment.author_id != current_user.id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="没有权限删除此评论"
         )
-    delete_comment_service(comment, session)
+    await delete_comment_service(comment, session)
@@ -3,8 +3,8 @@ import logging
 
 from fastapi import APIRouter, HTTPException, Query, status
 
-from app.core.dependencies import (CurrentActiveUser, SessionDep)
-from app.models.post import Post
+from app.core.dependencies import (CurrentActiveUser, ReadSessionDep,
+                                   SessionDep)
 from app.schemas.post import (PostCreate, PostListResponse, PostResponse,
                               PostUpdate, PostBrief)
 from app.services.post_service import (
@@ -24,18 +24,24 @@ router = APIRouter(prefix="/api/posts", tags=["posts"])
 # 获取文章列表
 @router.get("/", response_model=PostListResponse)
 async def get_posts(
-    session: SessionDep,
+    session: ReadSessionDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
     categoryId: Optional[int] = None,
     tagId: Optional[int] = None,
     published: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
 ):
-    """获取文章列表"""
+    """获取文章列表；传入上一页返回的 next_cursor 获取下一页
+
+    with_total=false 时不计算总数；estimated=true 且没有筛选条件时返回近似总数。
+    """
     try:
         # 获取文章列表和总数
-        total, posts = get_posts_service(
+        page = await get_posts_service(
             session=session,
             skip=skip,
             limit=limit,
@@ -43,16 +49,31 @@ async def get_posts(
             categoryId=categoryId,
             tagId=tagId,
             published=published,
+            cursor=cursor,
+            with_total=with_total,
+            estimated=estimated,
         )
-        logger.info(f"获取文章列表: 总数={total}, 返回={len(posts)}")
+        logger.info(f"获取文章列表: 总数={page.total}, 返回={len(page.items)}")
         
-        # 将SQLModel对象转换为Pydantic响应模型
-        formatted_posts = [PostBrief.model_validate(post, from_attributes=True) for post in posts]
+        # 将查询行转换为Pydantic响应模型
+        formatted_posts = [
+            PostBrief.model_validate(post, from_attributes=True).model_copy(
+                update={"snippet": (page.snippets or {}).get(post.id)}
+            )
+            for post in page.items
+        ]
         logger.info(f"格式化后的文章列表长度: {len(formatted_posts)}")
         
         # 构建并返回响应
-        response = PostListResponse(total=total, posts=formatted_posts)
+        response = PostListResponse(
+            total=page.total,
+            posts=formatted_posts,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
+        )
         return response
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取文章列表出错: {str(e)}", exc_info=True)
         raise
@@ -60,9 +81,9 @@ async def get_posts(
 
 # 获取文章详情
 @router.get("/{postId}", response_model=PostResponse)
-async def get_post(postId: int, session: SessionDep):
+async def get_post(postId: int, session: ReadSessionDep):
     """获取文章详情"""
-    post = get_post_service(postId, session)
+    post = await get_post_service(postId, session)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文章不存在")
     return post
@@ -74,7 +95,7 @@ async def create_post(
     post_data: PostCreate, session: SessionDep, current_user: CurrentActiveUser
 ):
     """创建文章"""
-    new_post = create_post_service(post_data, session, current_user.id)
+    new_post = await create_post_service(post_data, session, current_user.id)
     return new_post
 
 
@@ -87,14 +108,14 @@ async def update_post(
     current_user: CurrentActiveUser,
 ):
     """更新文章"""
-    post = session.get(Post, postId)
+    post = await get_post_service(postId, session)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文章不存在")
     if post.author_id != current_user.id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="没有权限更新此文章"
         )
-    updated_post = update_post_service(post, post_data, session)
+    updated_post = await update_post_service(post, post_data, session)
     return updated_post
 
 
@@ -104,11 +125,11 @@ async def delete_post(
     postId: int, session: SessionDep, current_user: CurrentActiveUser
 ):
     """删除文章"""
-    post = session.get(Post, postId)
+    post = await get_post_service(postId, session)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文章不存在")
     if post.author_id != current_user.id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="没有权限删除此文章"
         )
-    delete_post_service(post, session)
+    await delete_post_service(post, session)
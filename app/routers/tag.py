@@ -1,7 +1,8 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query, status
 import logging
 
-from app.core.dependencies import (CurrentAdminUser,
+from app.core.dependencies import (CurrentAdminUser, ReadSessionDep,
                                    SessionDep)
 from app.schemas.tag import TagCreate, TagListResponse, TagResponse, TagUpdate
 from app.services.tag_service import (
@@ -22,23 +23,38 @@ router = APIRouter(prefix="/api/tags", tags=["tags"])
 # 获取标签列表
 @router.get("/", response_model=TagListResponse)
 async def get_tags(
-    session: SessionDep,
+    session: ReadSessionDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
 ):
-    """获取标签列表"""
+    """获取标签列表；传入上一页返回的 next_cursor 获取下一页
+
+    with_total=false 时不计算总数；estimated=true 时返回近似总数。
+    """
     try:
         # 获取标签列表和总数
-        total, tags = get_tags_service(session, skip, limit)
-        logger.info(f"获取标签列表: 总数={total}, 返回={len(tags)}")
+        page = await get_tags_service(
+            session, skip, limit, cursor, with_total=with_total, estimated=estimated
+        )
+        logger.info(f"获取标签列表: 总数={page.total}, 返回={len(page.items)}")
         
         # 将SQLModel对象转换为Pydantic响应模型
-        formatted_tags = [TagResponse.model_validate(tag, from_attributes=True) for tag in tags]
+        formatted_tags = [TagResponse.model_validate(tag, from_attributes=True) for tag in page.items]
         logger.info(f"格式化后的标签列表长度: {len(formatted_tags)}")
         
         # 构建并返回响应
-        response = TagListResponse(total=total, tags=formatted_tags)
+        response = TagListResponse(
+            total=page.total,
+            tags=formatted_tags,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
+        )
         return response
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取标签列表出错: {str(e)}", exc_info=True)
         raise
@@ -46,9 +62,9 @@ async def get_tags(
 
 # 获取标签详情
 @router.get("/{tagId}", response_model=TagResponse)
-async def get_tag(tagId: int, session: SessionDep):
+async def get_tag(tagId: int, session: ReadSessionDep):
     """获取标签详情"""
-    tag = get_tag_service(tagId, session)
+    tag = await get_tag_service(tagId, session)
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="标签不存在")
     return tag
@@ -60,11 +76,11 @@ async def create_tag(
     tag_data: TagCreate, session: SessionDep, current_user: CurrentAdminUser
 ):
     """创建标签"""
-    if check_tag_exists(session, tag_data.name):
+    if await check_tag_exists(session, tag_data.name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="标签名已存在"
         )
-    new_tag = create_tag_service(tag_data, session)
+    new_tag = await create_tag_service(tag_data, session)
     return new_tag
 
 
@@ -74,14 +90,14 @@ async def update_tag(
     tagId: int, tag_data: TagUpdate, session: SessionDep, current_user: CurrentAdminUser
 ):
     """更新标签"""
-    tag = get_tag_service(tagId, session)
+    tag = await get_tag_service(tagId, session)
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="标签不存在")
-    if tag_data.name != tag.name and check_tag_exists(session, tag_data.name):
+    if tag_data.name != tag.name and await check_tag_exists(session, tag_data.name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="标签名已存在"
         )
-    updated_tag = update_tag_service(tag, tag_data, session)
+    updated_tag = await update_tag_service(tag, tag_data, session)
     return updated_tag
 
 
@@ -89,7 +105,7 @@ async def update_tag(
 @router.delete("/{tagId}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_tag(tagId: int, session: SessionDep, current_user: CurrentAdminUser):
     """删除标签"""
-    tag = get_tag_service(tagId, session)
+    tag = await get_tag_service(tagId, session)
     if not tag:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="标签不存在")
-    delete_tag_service(tag, session)
+    await delete_tag_service(tag, session)
@@ -1,11 +1,11 @@
 from datetime import datetime, UTC
 import logging
+from typing import Optional
 
 from fastapi import APIRouter, Query, status, HTTPException
 
 from app.core.dependencies import (CurrentActiveUser, CurrentAdminUser,
-                                   CurrentUser, SessionDep)
-from app.core.security import get_password_hash
+                                   CurrentUser, ReadSessionDep, SessionDep)
 from app.schemas.user import UserListResponse, UserResponse, UserUpdate
 from app.services.user_service import (
     get_users_service,
@@ -23,9 +23,12 @@ router = APIRouter(prefix="/api/users", tags=["users"])
 
 # 获取当前用户信息
 @router.get("/me", response_model=UserResponse)
-async def get_user_me(current_user: CurrentUser):
+async def get_user_me(current_user: CurrentUser, session: ReadSessionDep):
     """获取当前登录用户信息"""
-    return current_user
+    user = await get_user_service(current_user.id, session)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
+    return user
 
 
 # 更新当前用户信息
@@ -34,64 +37,71 @@ async def update_user_me(
     user_data: UserUpdate, current_user: CurrentActiveUser, session: SessionDep
 ):
     """更新当前用户信息"""
+    user = await get_user_service(current_user.id, session)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
+
     # 用户名检查
-    if user_data.username and user_data.username != current_user.username:
-        if check_user_exists(session, username=user_data.username):
+    if user_data.username and user_data.username != user.username:
+        if await check_user_exists(session, username=user_data.username):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="用户名已存在"
             )
-        current_user.username = user_data.username
+        user.username = user_data.username
 
     # 邮箱检查
-    if user_data.email and user_data.email != current_user.email:
-        if check_user_exists(session, email=user_data.email):
+    if user_data.email and user_data.email != user.email:
+        if await check_user_exists(session, email=user_data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="邮箱已存在"
             )
-        current_user.email = user_data.email
-
-    # 密码更新
-    if user_data.password:
-        current_user.hashed_password = get_password_hash(user_data.password)
+        user.email = user_data.email
 
     # 更新时间
-    current_user.updated_at = datetime.now(UTC)
-
-    updated_user = update_user_service(current_user, user_data)
-    session.add(updated_user)
-    session.commit()
-    session.refresh(updated_user)
+    user.updated_at = datetime.now(UTC)
 
-    return updated_user
+    return await update_user_service(user, user_data, session)
 
 
 # 管理员获取所有用户列表
 @router.get("/", response_model=UserListResponse)
 async def get_users(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: CurrentAdminUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
 ):
-    """管理员获取用户列表"""
+    """管理员获取用户列表；传入上一页返回的 next_cursor 获取下一页
+
+    with_total=false 时不计算总数；estimated=true 时返回近似总数。
+    """
     # 日志记录
     logger.info(f"获取用户列表请求: skip={skip}, limit={limit}, 当前用户={current_user.id}")
     
     try:
         # 获取用户列表和总数
-        total, users = get_users_service(session, skip, limit)
-        logger.info(f"获取到用户列表: {len(users)}条记录, 总数={total}, 类型={type(total)}")
-        
-        # 确保total是整数
-        total_count = int(total) if total is not None else 0
+        page = await get_users_service(
+            session, skip, limit, cursor, with_total=with_total, estimated=estimated
+        )
+        logger.info(f"获取到用户列表: {len(page.items)}条记录, 总数={page.total}")
         
         # 确保用户列表正确格式化
-        formatted_users = [UserResponse.model_validate(u, from_attributes=True) for u in users]
+        formatted_users = [UserResponse.model_validate(u, from_attributes=True) for u in page.items]
         
         # 构建并返回响应
-        response = UserListResponse(total=total_count, users=formatted_users)
+        response = UserListResponse(
+            total=page.total,
+            users=formatted_users,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
+        )
         logger.info(f"返回响应: 总数={response.total}, 用户列表长度={len(response.users)}")
         return response
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取用户列表出错: {str(e)}", exc_info=True)
         raise
@@ -99,9 +109,9 @@ async def get_users(
 
 # 管理员获取单个用户详情
 @router.get("/{userId}", response_model=UserResponse)
-async def get_user(userId: int, session: SessionDep, current_user: CurrentAdminUser):
+async def get_user(userId: int, session: ReadSessionDep, current_user: CurrentAdminUser):
     """管理员获取用户详情"""
-    user = get_user_service(userId, session)
+    user = await get_user_service(userId, session)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
@@ -117,13 +127,13 @@ async def update_user(
     current_user: CurrentAdminUser,
 ):
     """管理员更新用户信息"""
-    user = get_user_service(userId, session)
+    user = await get_user_service(userId, session)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
     # 用户名检查
     if user_data.username and user_data.username != user.username:
-        if check_user_exists(session, username=user_data.username):
+        if await check_user_exists(session, username=user_data.username):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="用户名已存在"
             )
@@ -131,16 +141,12 @@ async def update_user(
 
     # 邮箱检查
     if user_data.email and user_data.email != user.email:
-        if check_user_exists(session, email=user_data.email):
+        if await check_user_exists(session, email=user_data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="邮箱已存在"
             )
         user.email = user_data.email
 
-    # 密码更新
-    if user_data.password:
-        user.hashed_password = get_password_hash(user_data.password)
-
     # 是否激活
     if user_data.is_active is not None:
         user.is_active = user_data.is_active
@@ -152,19 +158,14 @@ async def update_user(
     # 更新时间
     user.updated_at = datetime.now(UTC)
 
-    updated_user = update_user_service(user, user_data)
-    session.add(updated_user)
-    session.commit()
-    session.refresh(updated_user)
-
-    return updated_user
+    return await update_user_service(user, user_data, session)
 
 
 # 管理员删除用户
 @router.delete("/{userId}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(userId: int, session: SessionDep, current_user: CurrentAdminUser):
     """管理员删除用户"""
-    user = get_user_service(userId, session)
+    user = await get_user_service(userId, session)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
@@ -174,4 +175,4 @@ async def delete_user(userId: int, session: SessionDep, current_user: CurrentAdm
             status_code=status.HTTP_400_BAD_REQUEST, detail="不能删除当前用户"
         )
 
-    delete_user_service(user, session)
+    await delete_user_service(user, session)
@@ -1,10 +1,12 @@
+from app.schemas.admin import PoolStatus, PoolStatusResponse
 from app.schemas.auth import LoginRequest, Token, TokenData
 from app.schemas.category import (CategoryCreate, CategoryListResponse,
                                   CategoryResponse, CategoryUpdate)
 from app.schemas.comment import (CommentCreate, CommentListResponse,
                                  CommentResponse, CommentUpdate)
 from app.schemas.dashboard import DashboardSummary
-from app.schemas.post import (PostBase, PostBrief, PostCreate,
+from app.schemas.post import (PostBase, PostBrief, PostCreate, PostImport,
+                              PostImportError, PostImportResult,
                               PostListResponse, PostResponse, PostUpdate)
 from app.schemas.tag import TagCreate, TagListResponse, TagResponse, TagUpdate
 from app.schemas.user import (UserCreate, UserListResponse, UserResponse,
@@ -32,9 +34,14 @@ __all__ = [
     "PostResponse",
     "PostBrief",
     "PostListResponse",
+    "PostImport",
+    "PostImportError",
+    "PostImportResult",
     "CommentCreate",
     "CommentUpdate",
     "CommentResponse",
     "CommentListResponse",
     "DashboardSummary",
+    "PoolStatus",
+    "PoolStatusResponse",
 ]
@@ -0,0 +1,38 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+# 单个连接池状态
+class PoolStatus(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_avg: float = 0.0
+    wait_ms_max: float = 0.0
+    histogram: Dict[str, int] = {}
+
+
+# 连接池状态响应模型
+class PoolStatusResponse(BaseModel):
+    pools: Dict[str, PoolStatus]
+
+
+# 渲染缓存状态响应模型
+class RenderCacheStatus(BaseModel):
+    size: int
+    maxsize: int
+    bytes: int
+    max_bytes: int
+    persistent: bool
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
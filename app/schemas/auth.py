@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
@@ -8,11 +9,24 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
     user_id: int = None
     username: str = None
     is_admin: bool = False
 
 
+class RefreshRequest(BaseModel):
+    """刷新令牌请求"""
+
+    refresh_token: str = Field(..., min_length=1)
+
+
+class LogoutRequest(BaseModel):
+    """注销请求；提供刷新令牌时只吊销它所在的登录会话"""
+
+    refresh_token: Optional[str] = None
+
+
 class TokenData(BaseModel):
     """令牌数据"""
 
@@ -24,8 +24,10 @@ class CategoryResponse(CategoryBase):
 
 # 分类列表响应模型
 class CategoryListResponse(BaseModel):
-    total: int
+    total: Optional[int]  # with_total=false 时为空
     categories: List[CategoryResponse]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
+    total_estimated: bool = False  # total 是否为近似值
 
 
 # 分类更新请求模型
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -27,8 +27,10 @@ class CommentResponse(CommentBase):
 
 # 评论列表响应模型
 class CommentListResponse(BaseModel):
-    total: int
+    total: Optional[int]  # with_total=false 时为空
     comments: List[CommentResponse]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
+    total_estimated: bool = False  # total 是否为近似值
 
 
 # 评论更新请求模型
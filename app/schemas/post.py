@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -31,6 +31,7 @@ class PostBrief(BaseModel):
     created_at: datetime
     updated_at: datetime
     author_id: int
+    snippet: Optional[str] = None  # 搜索时命中内容的高亮片段
 
 
 # 文章详细响应模型
@@ -46,8 +47,10 @@ class PostResponse(PostBase):
 
 # 文章列表响应模型
 class PostListResponse(BaseModel):
-    total: int
+    total: Optional[int]  # with_total=false 时为空
     posts: List[PostBrief]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
+    total_estimated: bool = False  # total 是否为近似值
 
 
 # 文章更新请求模型
@@ -58,3 +61,22 @@ class PostUpdate(BaseModel):
     published: Optional[bool] = None
     category_id: Optional[int] = None
     tag_ids: Optional[List[int]] = None
+
+
+# 批量导入的一行（NDJSON）：可按名称指定标签（不存在时创建），可保留原创建时间
+class PostImport(PostCreate):
+    tags: List[Annotated[str, Field(min_length=1, max_length=30)]] = []
+    created_at: Optional[datetime] = None
+
+
+# 批量导入中失败的一行
+class PostImportError(BaseModel):
+    line: int  # 从 1 开始的行号
+    error: str
+
+
+# 批量导入结果
+class PostImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[PostImportError]  # 最多返回 POST_IMPORT_MAX_ERRORS 条
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -22,8 +22,10 @@ class TagResponse(TagBase):
 
 # 标签列表响应模型
 class TagListResponse(BaseModel):
-    total: int
+    total: Optional[int]  # with_total=false 时为空
     tags: List[TagResponse]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
+    total_estimated: bool = False  # total 是否为近似值
 
 
 # 标签更新请求模型
@@ -26,8 +26,10 @@ class UserResponse(UserBase):
 
 # 用户列表响应模型
 class UserListResponse(BaseModel):
-    total: int
+    total: Optional[int]  # with_total=false 时为空
     users: List[UserResponse]
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为空
+    total_estimated: bool = False  # total 是否为近似值
 
 
 # 用户更新请求模型
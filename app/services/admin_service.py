@@ -0,0 +1,21 @@
+from app.core.database import named_engines
+from app.core.pool_stats import pool_status
+from app.core.renderer import render_cache
+from app.schemas.admin import PoolStatus, PoolStatusResponse, RenderCacheStatus
+
+
+# 获取连接池状态业务逻辑
+def get_pool_status_service() -> PoolStatusResponse:
+    """汇总各引擎连接池的当前状态和获取连接统计"""
+    return PoolStatusResponse(
+        pools={
+            name: PoolStatus(**pool_status(engine.pool))
+            for name, engine in named_engines().items()
+        }
+    )
+
+
+# 获取渲染缓存状态业务逻辑
+def get_render_cache_status_service() -> RenderCacheStatus:
+    """返回 Markdown 渲染缓存的容量和命中统计"""
+    return RenderCacheStatus(**render_cache.stats())
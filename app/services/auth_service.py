@@ -1,28 +1,64 @@
+import asyncio
 import logging
+import uuid
 from datetime import datetime, timedelta, UTC
-from typing import Optional
-from jose import jwt, JWTError
-from sqlmodel import Session, select
+from typing import Optional, Tuple
+from fastapi import BackgroundTasks
+from jose import jwt
+from sqlmodel import delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.core.database import session_scope
+from app.core.hashing import get_password_hash_async, verify_password_async
+from app.core.principal import Principal, principal_cache
+from app.core.revocation import revocation_list, revoke_token, revoke_user_tokens
 from app.core.security import (
-    create_access_token, generate_reset_token, get_password_hash, verify_password
+    create_access_token, generate_refresh_token, generate_reset_token, hash_token,
+    password_needs_rehash,
 )
 from app.core.validators import validate_password
+from app.models.password_reset import PasswordResetToken
+from app.models.refresh_token import RefreshToken
 from app.models.user import User
 from app.schemas.auth import PasswordChange, PasswordReset, PasswordResetRequest
 from app.schemas.user import UserCreate
-from app.services.email_service import send_email
+from app.services.email_service import enqueue_email
 
 logger = logging.getLogger(__name__)
 
 # 登录业务逻辑
-def login_service(session: Session, username: str, password: str) -> Optional[User]:
-    """登录业务逻辑，返回用户对象或 None"""
-    user = session.exec(select(User).where(User.email == username)).first()
-    if not user or not verify_password(password, user.hashed_password):
+async def login_service(
+    session: AsyncSession,
+    username: str,
+    password: str,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Optional[User]:
+    """登录业务逻辑，返回用户对象或 None；哈希成本过低时在响应后重新哈希"""
+    user = (await session.exec(select(User).where(User.email == username))).first()
+    if not user or not await verify_password_async(password, user.hashed_password):
         return None
+    if background_tasks is not None and password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(
+            rehash_password_service, user.id, user.hashed_password, password
+        )
     return user
 
+# 重新哈希密码业务逻辑
+async def rehash_password_service(user_id: int, old_hash: str, password: str) -> None:
+    """按当前配置的成本重新哈希密码；期间密码已被修改时放弃"""
+    try:
+        new_hash = await get_password_hash_async(password)
+        async with session_scope() as session:
+            await session.exec(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await session.commit()
+        logger.info(f"已按当前成本重新哈希用户 {user_id} 的密码")
+    except Exception as e:
+        logger.warning(f"重新哈希用户 {user_id} 的密码失败: {e}")
+
 # 创建访问令牌业务逻辑
 def create_token_for_user(user: User) -> str:
     """为用户创建访问令牌"""
@@ -30,19 +66,19 @@ def create_token_for_user(user: User) -> str:
     return create_access_token(subject=str(user.id), expires_delta=access_token_expires)
 
 # 用户注册业务逻辑
-def register_user_service(user_data: UserCreate, session: Session) -> User:
+async def register_user_service(user_data: UserCreate, session: AsyncSession) -> User:
     """注册新用户业务逻辑"""
     is_valid, error_messages = validate_password(user_data.password)
     if not is_valid:
         error_detail = ", ".join(error_messages)
         raise ValueError(f"密码不符合安全要求: {error_detail}")
-    db_user = session.exec(select(User).where(User.username == user_data.username)).first()
+    db_user = (await session.exec(select(User).where(User.username == user_data.username))).first()
     if db_user:
         raise ValueError("用户名已存在")
-    db_email = session.exec(select(User).where(User.email == user_data.email)).first()
+    db_email = (await session.exec(select(User).where(User.email == user_data.email))).first()
     if db_email:
         raise ValueError("邮箱已存在")
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -51,75 +87,203 @@ def register_user_service(user_data: UserCreate, session: Session) -> User:
         is_admin=user_data.is_admin,
     )
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     return new_user
 
+# 当前 UTC 时间（不带时区，与数据库中保存的时间一致）
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
 # 密码重置请求业务逻辑
-def password_reset_request_service(reset_request: PasswordResetRequest, session: Session) -> dict:
+async def password_reset_request_service(reset_request: PasswordResetRequest, session: AsyncSession) -> dict:
     """请求密码重置业务逻辑"""
-    user = session.exec(select(User).where(User.email == reset_request.email)).first()
+    user = (await session.exec(select(User).where(User.email == reset_request.email))).first()
     if not user:
         return {"message": "如果该邮箱存在，密码重置链接已发送"}
     reset_token = generate_reset_token()
-    token_expires = datetime.now(UTC) + timedelta(hours=24)
-    user.reset_token = reset_token
-    user.reset_token_expires = token_expires
-    session.add(user)
-    session.commit()
+    session.add(
+        PasswordResetToken(
+            user_id=user.id,
+            token_hash=hash_token(reset_token),
+            expires_at=_utcnow() + timedelta(hours=settings.PASSWORD_RESET_EXPIRE_HOURS),
+        )
+    )
     reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
     logger.info(f"生成密码重置链接: {reset_url}")
-    # 发送邮件
-    send_email(
+    # 邮件与令牌在同一事务中写入发件箱，由后台任务发送
+    enqueue_email(
+        session,
         to_email=user.email,
         subject="密码重置请求",
         body=f"您好，\n\n请点击以下链接重置您的密码：\n{reset_url}\n\n如果不是您本人操作，请忽略此邮件。",
         html=False
     )
+    await session.commit()
     return {"message": "密码重置链接已发送到您的邮箱", "reset_url": reset_url, "token": reset_token}
 
 # 密码重置业务逻辑
-def reset_password_service(reset_data: PasswordReset, session: Session):
-    """重置密码业务逻辑"""
-    user = session.exec(select(User).where(User.reset_token == reset_data.token)).first()
-    if not user:
+async def reset_password_service(reset_data: PasswordReset, session: AsyncSession):
+    """重置密码业务逻辑；成功后作废该用户所有未使用的重置令牌"""
+    token = (await session.exec(
+        select(PasswordResetToken).where(
+            PasswordResetToken.token_hash == hash_token(reset_data.token)
+        )
+    )).first()
+    if not token:
         raise ValueError("无效的重置令牌")
-    if user.reset_token_expires is None or user.reset_token_expires < datetime.now(UTC):
+    if token.expires_at < _utcnow():
         raise ValueError("重置令牌已过期")
     is_valid, error_messages = validate_password(reset_data.new_password)
     if not is_valid:
         error_detail = ", ".join(error_messages)
         raise ValueError(f"密码不符合安全要求: {error_detail}")
-    user.hashed_password = get_password_hash(reset_data.new_password)
-    user.reset_token = None
-    user.reset_token_expires = None
+    user = await session.get(User, token.user_id)
+    if not user:
+        raise ValueError("无效的重置令牌")
+    user.hashed_password = await get_password_hash_async(reset_data.new_password)
     session.add(user)
-    session.commit()
+    await session.exec(
+        delete(PasswordResetToken).where(PasswordResetToken.user_id == user.id)
+    )
+    revocation_key = await revoke_user_tokens(session, user.id)
+    await session.commit()
+    revocation_list.add(revocation_key)
+    principal_cache.invalidate_user(user.id)
     return {"message": "密码重置成功"}
 
+# 清理过期令牌业务逻辑
+async def purge_expired_tokens(session: AsyncSession, model, batch_size: int) -> int:
+    """分批删除过期的重置令牌或刷新令牌，每批单独提交以缩短写锁时间，返回删除总数"""
+    deleted = 0
+    while True:
+        expired_ids = (
+            select(model.id)
+            .where(model.expires_at < _utcnow())
+            .limit(batch_size)
+        )
+        result = await session.exec(delete(model).where(model.id.in_(expired_ids)))
+        await session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+# 定期清理过期令牌
+async def run_token_sweeper(interval: float, batch_size: int) -> None:
+    """后台循环清理过期的重置令牌和刷新令牌，直到任务被取消"""
+    while True:
+        await asyncio.sleep(interval)
+        for model, name in ((PasswordResetToken, "密码重置令牌"), (RefreshToken, "刷新令牌")):
+            try:
+                async with session_scope() as session:
+                    deleted = await purge_expired_tokens(session, model, batch_size)
+                if deleted:
+                    logger.info(f"已清理 {deleted} 个过期的{name}")
+            except Exception as e:
+                logger.error(f"清理过期{name}失败: {e}")
+
+# 签发刷新令牌业务逻辑
+async def create_refresh_token_service(
+    session: AsyncSession, user_id: int, family_id: Optional[str] = None
+) -> str:
+    """签发刷新令牌并提交，返回令牌明文；family_id 为空时开始新的登录会话"""
+    refresh_token = generate_refresh_token()
+    session.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=hash_token(refresh_token),
+            family_id=family_id or uuid.uuid4().hex,
+            expires_at=_utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    await session.commit()
+    return refresh_token
+
+# 刷新访问令牌业务逻辑
+async def refresh_access_token_service(
+    session: AsyncSession, refresh_token: str
+) -> Optional[Tuple[User, str, str]]:
+    """用刷新令牌换取新的访问令牌和刷新令牌（不做密码校验）
+
+    刷新令牌每次使用后作废；已作废的令牌再次出现说明可能被盗用，
+    吊销同一会话的全部刷新令牌。令牌无效时返回 None。
+    """
+    token = (await session.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_token(refresh_token))
+    )).first()
+    if not token or token.revoked_at is not None or token.expires_at < _utcnow():
+        return None
+    # 条件更新保证并发请求中只有一个能轮换成功
+    result = await session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.id == token.id, RefreshToken.used_at.is_(None))
+        .values(used_at=_utcnow())
+    )
+    if result.rowcount != 1:
+        await session.exec(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == token.family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=_utcnow())
+        )
+        await session.commit()
+        logger.warning(f"检测到刷新令牌重复使用，已吊销用户 {token.user_id} 的登录会话")
+        return None
+    user = await session.get(User, token.user_id)
+    if not user or not user.is_active:
+        await session.rollback()
+        return None
+    new_refresh_token = await create_refresh_token_service(session, user.id, token.family_id)
+    return user, create_token_for_user(user), new_refresh_token
+
 # 修改密码业务逻辑
-def change_password_service(password_data: PasswordChange, user: User, session: Session):
+async def change_password_service(password_data: PasswordChange, user: User, session: AsyncSession):
     """修改密码业务逻辑"""
-    if not verify_password(password_data.current_password, user.hashed_password):
+    if not await verify_password_async(password_data.current_password, user.hashed_password):
         raise ValueError("当前密码不正确")
     is_valid, error_messages = validate_password(password_data.new_password)
     if not is_valid:
         error_detail = ", ".join(error_messages)
         raise ValueError(f"密码不符合安全要求: {error_detail}")
-    user.hashed_password = get_password_hash(password_data.new_password)
+    user.hashed_password = await get_password_hash_async(password_data.new_password)
     session.add(user)
-    session.commit()
+    revocation_key = await revoke_user_tokens(session, user.id)
+    await session.commit()
+    revocation_list.add(revocation_key)
+    principal_cache.invalidate_user(user.id)
     return {"message": "密码修改成功"}
 
-# 通过 token 获取用户业务逻辑
-def get_user_by_token_service(token: str, session: Session) -> Optional[User]:
-    """通过 token 获取用户业务逻辑"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
-        return None
-    user = session.get(User, int(user_id))
-    return user 
\ No newline at end of file
+# 注销业务逻辑
+async def logout_service(
+    token: str, principal: Principal, session: AsyncSession, refresh_token: Optional[str] = None
+) -> dict:
+    """吊销当前访问令牌和对应的刷新令牌
+
+    提供 refresh_token 时吊销它所在登录会话的全部刷新令牌；未提供时无法确定会话，
+    吊销该用户的全部刷新令牌。没有 jti 的旧令牌无法单独吊销，改为吊销该用户的全部令牌。
+    """
+    if principal.token_jti:
+        payload = jwt.get_unverified_claims(token)
+        expires_at = datetime.fromtimestamp(payload["exp"], UTC).replace(tzinfo=None)
+        await revoke_token(session, principal.id, principal.token_jti, expires_at)
+        revocation_key = principal.token_jti
+        refresh_filter = RefreshToken.user_id == principal.id
+        if refresh_token:
+            family_id = (await session.exec(
+                select(RefreshToken.family_id).where(
+                    RefreshToken.token_hash == hash_token(refresh_token),
+                    RefreshToken.user_id == principal.id,
+                )
+            )).first()
+            if family_id:
+                refresh_filter = refresh_filter & (RefreshToken.family_id == family_id)
+        await session.exec(
+            update(RefreshToken)
+            .where(refresh_filter, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=_utcnow())
+        )
+    else:
+        revocation_key = await revoke_user_tokens(session, principal.id)
+    await session.commit()
+    revocation_list.add(revocation_key)
+    principal_cache.discard(token)
+    return {"message": "已退出登录"}
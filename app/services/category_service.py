@@ -1,6 +1,10 @@
 from datetime import datetime, UTC
 import logging
-from sqlmodel import Session, select, func
+from typing import Optional
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.count_cache import count_rows
+from app.core.pagination import Page, fetch_page
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
 
@@ -8,46 +12,53 @@ from app.schemas.category import CategoryCreate, CategoryUpdate
 logger = logging.getLogger(__name__)
 
 # 获取分类列表业务逻辑
-def get_categories_service(session: Session, skip: int = 0, limit: int = 100):
-    """获取分类列表业务逻辑"""
+async def get_categories_service(
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
+) -> Page:
+    """获取分类列表业务逻辑；传入 cursor 时按游标分页，with_total/estimated 见 count_rows"""
     try:
         # 获取分页数据
-        categories_query = select(Category).offset(skip).limit(limit)
-        categories = session.exec(categories_query).all()
+        categories, next_cursor = await fetch_page(session, select(Category), Category, skip, limit, cursor)
         
         # 获取总数
         count_query = select(func.count(Category.id))
-        total_result = session.exec(count_query).first()
-        total = int(total_result) if total_result is not None else 0
+        total, total_estimated = await count_rows(
+            session, count_query, Category, {}, with_total=with_total, estimated=estimated
+        )
         
         logger.info(f"获取分类列表: 总数={total}, 返回={len(categories)}")
-        return total, categories
+        return Page(total, categories, next_cursor, total_estimated=total_estimated)
     except Exception as e:
         logger.error(f"获取分类列表错误: {str(e)}", exc_info=True)
         raise
 
 # 获取分类详情业务逻辑
-def get_category_service(categoryId: int, session: Session):
+async def get_category_service(categoryId: int, session: AsyncSession):
     """获取分类详情业务逻辑"""
-    return session.get(Category, categoryId)
+    return await session.get(Category, categoryId)
 
 # 检查分类名是否存在
-def check_category_exists(session: Session, name: str):
+async def check_category_exists(session: AsyncSession, name: str):
     """检查分类名是否存在"""
-    db_category = session.exec(select(Category).where(Category.name == name)).first()
+    db_category = (await session.exec(select(Category).where(Category.name == name))).first()
     return db_category is not None
 
 # 创建分类业务逻辑
-def create_category_service(category_data: CategoryCreate, session: Session):
+async def create_category_service(category_data: CategoryCreate, session: AsyncSession):
     """创建分类业务逻辑"""
     new_category = Category(**category_data.model_dump())
     session.add(new_category)
-    session.commit()
-    session.refresh(new_category)
+    await session.commit()
+    await session.refresh(new_category)
     return new_category
 
 # 更新分类业务逻辑
-def update_category_service(category: Category, category_data: CategoryUpdate, session: Session):
+async def update_category_service(category: Category, category_data: CategoryUpdate, session: AsyncSession):
     """更新分类业务逻辑"""
     if category_data.name and category_data.name != category.name:
         category.name = category_data.name
@@ -55,12 +66,12 @@ def update_category_service(category: Category, category_data: CategoryUpdate, s
         category.description = category_data.description
     category.updated_at = datetime.now(UTC)
     session.add(category)
-    session.commit()
-    session.refresh(category)
+    await session.commit()
+    await session.refresh(category)
     return category
 
 # 删除分类业务逻辑
-def delete_category_service(category: Category, session: Session):
+async def delete_category_service(category: Category, session: AsyncSession):
     """删除分类业务逻辑"""
-    session.delete(category)
-    session.commit() 
\ No newline at end of file
+    await session.delete(category)
+    await session.commit() 
\ No newline at end of file
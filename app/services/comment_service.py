@@ -1,6 +1,11 @@
 from datetime import datetime, UTC
 import logging
-from sqlmodel import Session, select, func
+from typing import Optional
+from sqlalchemy.orm import joinedload, raiseload
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.count_cache import count_rows
+from app.core.pagination import Page, fetch_page
 from app.models.comment import Comment
 from app.models.post import Post
 from app.schemas.comment import CommentCreate, CommentUpdate
@@ -8,42 +13,72 @@ from app.schemas.comment import CommentCreate, CommentUpdate
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 评论响应需要预加载作者，异步会话中不能在序列化时懒加载；作者是多对一，随主查询 JOIN 取回
+COMMENT_LOAD_OPTIONS = (joinedload(Comment.author),)
+# 列表只需要作者，其余关联禁止懒加载
+COMMENT_LIST_LOAD_OPTIONS = (*COMMENT_LOAD_OPTIONS, raiseload("*"))
+
+
+async def _load_comment(session: AsyncSession, commentId: int):
+    """按响应结构重新加载评论（覆盖会话中已有的对象）"""
+    query = (
+        select(Comment)
+        .where(Comment.id == commentId)
+        .options(*COMMENT_LOAD_OPTIONS)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(query)).first()
+
+def filter_comments_query(query, postId: Optional[int] = None):
+    """给评论查询加上列表的筛选条件（列表、计数和导出共用）"""
+    if postId:
+        query = query.filter(Comment.post_id == postId)
+    return query
+
 # 获取评论列表业务逻辑
-def get_comments_service(session: Session, skip: int = 0, limit: int = 100, postId: int = None):
-    """获取评论列表业务逻辑"""
+async def get_comments_service(
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    postId: int = None,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
+) -> Page:
+    """获取评论列表业务逻辑；传入 cursor 时按游标分页，with_total/estimated 见 count_rows"""
     try:
         # 构建基础查询
-        query = select(Comment)
+        query = select(Comment).options(*COMMENT_LIST_LOAD_OPTIONS)
         count_query = select(func.count(Comment.id))
         
         # 添加过滤条件
-        if postId:
-            query = query.filter(Comment.post_id == postId)
-            count_query = count_query.filter(Comment.post_id == postId)
+        query = filter_comments_query(query, postId)
+        count_query = filter_comments_query(count_query, postId)
         
         # 获取总数
-        total_result = session.exec(count_query).first()
-        total = int(total_result) if total_result is not None else 0
+        total, total_estimated = await count_rows(
+            session, count_query, Comment, {"post_id": postId or None},
+            with_total=with_total, estimated=estimated,
+        )
         
         # 获取分页数据
-        comments_query = query.order_by(Comment.created_at.desc()).offset(skip).limit(limit)
-        comments = session.exec(comments_query).all()
+        comments, next_cursor = await fetch_page(session, query, Comment, skip, limit, cursor)
         
         logger.info(f"获取评论列表: 总数={total}, 返回={len(comments)}")
-        return total, comments
+        return Page(total, comments, next_cursor, total_estimated=total_estimated)
     except Exception as e:
         logger.error(f"获取评论列表错误: {str(e)}", exc_info=True)
         raise
 
 # 获取评论详情业务逻辑
-def get_comment_service(commentId: int, session: Session):
+async def get_comment_service(commentId: int, session: AsyncSession):
     """获取评论详情业务逻辑"""
-    return session.get(Comment, commentId)
+    return await session.get(Comment, commentId, options=COMMENT_LOAD_OPTIONS)
 
 # 创建评论业务逻辑
-def create_comment_service(comment_data: CommentCreate, session: Session, user_id: int):
+async def create_comment_service(comment_data: CommentCreate, session: AsyncSession, user_id: int):
     """创建评论业务逻辑"""
-    post = session.get(Post, comment_data.post_id)
+    post = await session.get(Post, comment_data.post_id)
     if not post:
         return None
     new_comment = Comment(
@@ -52,22 +87,20 @@ def create_comment_service(comment_data: CommentCreate, session: Session, user_i
         post_id=comment_data.post_id,
     )
     session.add(new_comment)
-    session.commit()
-    session.refresh(new_comment)
-    return new_comment
+    await session.commit()
+    return await _load_comment(session, new_comment.id)
 
 # 更新评论业务逻辑
-def update_comment_service(comment: Comment, comment_data: CommentUpdate, session: Session):
+async def update_comment_service(comment: Comment, comment_data: CommentUpdate, session: AsyncSession):
     """更新评论业务逻辑"""
     comment.content = comment_data.content
     comment.updated_at = datetime.now(UTC)
     session.add(comment)
-    session.commit()
-    session.refresh(comment)
-    return comment
+    await session.commit()
+    return await _load_comment(session, comment.id)
 
 # 删除评论业务逻辑
-def delete_comment_service(comment: Comment, session: Session):
+async def delete_comment_service(comment: Comment, session: AsyncSession):
     """删除评论业务逻辑"""
-    session.delete(comment)
-    session.commit() 
\ No newline at end of file
+    await session.delete(comment)
+    await session.commit() 
\ No newline at end of file
@@ -1,31 +1,41 @@
-from sqlmodel import Session, select
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.category import Category
 from app.models.comment import Comment
 from app.models.post import Post
 from app.models.tag import Tag
 from app.models.user import User
+from app.schemas.comment import CommentResponse
 from app.schemas.dashboard import DashboardSummary
+from app.schemas.post import PostBrief
+from app.services.comment_service import COMMENT_LIST_LOAD_OPTIONS
+from app.services.post_service import POST_BRIEF_COLUMNS
 
 # 获取仪表盘摘要数据业务逻辑
-def get_dashboard_summary_service(session: Session) -> DashboardSummary:
+async def get_dashboard_summary_service(session: AsyncSession) -> DashboardSummary:
     """获取仪表盘摘要数据业务逻辑"""
-    total_posts = session.exec(select(Post)).count()
-    total_categories = session.exec(select(Category)).count()
-    total_tags = session.exec(select(Tag)).count()
-    total_comments = session.exec(select(Comment)).count()
-    total_users = session.exec(select(User)).count()
-    recent_posts = session.exec(
-        select(Post).order_by(Post.created_at.desc()).limit(5)
-    ).all()
-    recent_comments = session.exec(
-        select(Comment).order_by(Comment.created_at.desc()).limit(5)
-    ).all()
+    total_posts = (await session.exec(select(func.count(Post.id)))).one()
+    total_categories = (await session.exec(select(func.count(Category.id)))).one()
+    total_tags = (await session.exec(select(func.count(Tag.id)))).one()
+    total_comments = (await session.exec(select(func.count(Comment.id)))).one()
+    total_users = (await session.exec(select(func.count(User.id)))).one()
+    recent_posts = (await session.exec(
+        select(*POST_BRIEF_COLUMNS).order_by(Post.created_at.desc()).limit(5)
+    )).all()
+    recent_comments = (await session.exec(
+        select(Comment)
+        .options(*COMMENT_LIST_LOAD_OPTIONS)
+        .order_by(Comment.created_at.desc())
+        .limit(5)
+    )).all()
     return DashboardSummary(
         total_posts=total_posts,
         total_categories=total_categories,
         total_tags=total_tags,
         total_comments=total_comments,
         total_users=total_users,
-        recent_posts=recent_posts,
-        recent_comments=recent_comments,
-    ) 
\ No newline at end of file
+        recent_posts=[PostBrief.model_validate(p, from_attributes=True) for p in recent_posts],
+        recent_comments=[
+            CommentResponse.model_validate(c, from_attributes=True) for c in recent_comments
+        ],
+    )
@@ -1,38 +1,243 @@
+import asyncio
+import logging
 import smtplib
-from email.mime.text import MIMEText
+import threading
+import time
+from datetime import UTC, datetime, timedelta
 from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
 from email.utils import formataddr
+from typing import List, Optional, Tuple
+
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
 from app.core.config import settings
-import logging
+from app.core.database import session_scope
+from app.models.email_outbox import EmailOutbox
 
 logger = logging.getLogger(__name__)
 
+# 取件后在该时长内其他发送任务不会重复取到同一封邮件（进程崩溃时由它兜底重试）
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def build_message(to_email: str, subject: str, body: str, html: bool = False) -> MIMEMultipart:
+    """构造邮件"""
+    msg = MIMEMultipart()
+    msg['From'] = formataddr((settings.EMAIL_FROM_NAME, settings.EMAIL_FROM))
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html' if html else 'plain', 'utf-8'))
+    return msg
+
+
+def connect_smtp() -> smtplib.SMTP:
+    """建立并登录 SMTP 连接；未配置用户名时不登录（本地测试服务器）"""
+    if settings.SMTP_TLS:
+        server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+    else:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+        server.ehlo()
+        if server.has_extn("starttls"):
+            server.starttls()
+            server.ehlo()
+    if settings.SMTP_USER:
+        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    return server
+
+
+def _sendmail(server: smtplib.SMTP, msg: MIMEMultipart) -> None:
+    server.sendmail(settings.EMAIL_FROM, [msg['To']], msg.as_string())
+
+
+def _quit(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+class SMTPConnectionPool:
+    """已登录 SMTP 连接池
+
+    建立 TLS 连接并登录需要多次往返，这里在多封邮件之间复用连接；
+    空闲超过 idle_timeout 的连接（服务器多半已断开）在取用时重新建立。
+    发送在线程中进行，方法均为同步且线程安全。
+    """
+
+    def __init__(self, size: int, idle_timeout: float):
+        self.size = max(size, 1)
+        self.idle_timeout = idle_timeout
+        self._idle: List[Tuple[float, smtplib.SMTP]] = []
+        self._lock = threading.Lock()
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = connect_smtp()
+        with self._lock:
+            self.connects += 1
+        return server
+
+    def acquire(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                released_at, server = self._idle.pop()
+            if time.monotonic() - released_at < self.idle_timeout:
+                return server
+            _quit(server)
+        return self._connect()
+
+    def release(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((time.monotonic(), server))
+                return
+        _quit(server)
+
+    def send(self, messages: List[MIMEMultipart]) -> List[Optional[str]]:
+        """用同一个连接依次发送，返回每封邮件的错误信息（成功为 None）"""
+        errors: List[Optional[str]] = []
+        server = None
+        for msg in messages:
+            try:
+                if server is None:
+                    server = self.acquire()
+                try:
+                    _sendmail(server, msg)
+                except smtplib.SMTPServerDisconnected:
+                    # 复用的连接可能已被服务器关闭，重连后重试一次
+                    server.close()
+                    server = self._connect()
+                    _sendmail(server, msg)
+                errors.append(None)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                # 单封邮件被拒绝，连接仍然可用
+                errors.append(str(e))
+            except Exception as e:
+                errors.append(str(e) or type(e).__name__)
+                if server is not None:
+                    server.close()
+                    server = None
+        if server is not None:
+            self.release(server)
+        return errors
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, server in idle:
+            _quit(server)
+
+
+smtp_pool = SMTPConnectionPool(settings.SMTP_POOL_SIZE, settings.SMTP_IDLE_TIMEOUT)
+
+
+def enqueue_email(session: AsyncSession, to_email: str, subject: str, body: str, html: bool = False) -> EmailOutbox:
+    """把邮件写入发件箱（调用方负责提交），由后台任务发送"""
+    email = EmailOutbox(to_email=to_email, subject=subject, body=body, html=html)
+    session.add(email)
+    return email
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """第 attempts 次失败后的重试间隔"""
+    return timedelta(seconds=settings.EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+
+
+async def deliver_outbox(
+    session: AsyncSession, batch_size: int, pool: Optional[SMTPConnectionPool] = None
+) -> int:
+    """发送一批到期的邮件，返回本轮取到的邮件数"""
+    pool = pool or smtp_pool
+    now = _utcnow()
+    emails = (await session.exec(
+        select(EmailOutbox)
+        .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(batch_size)
+    )).all()
+    # 条件更新取件，多个进程同时运行发送任务时每封邮件只会被一个进程取到
+    claimed = []
+    for email in emails:
+        result = await session.exec(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == email.id, EmailOutbox.next_attempt_at == email.next_attempt_at)
+            .values(next_attempt_at=now + CLAIM_LEASE)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed.append(email)
+    await session.commit()
+    if not claimed:
+        return 0
+
+    # 按连接数分组，每组在一个线程里复用同一个连接发送
+    groups = [claimed[i::pool.size] for i in range(pool.size) if claimed[i::pool.size]]
+    results = await asyncio.gather(*(
+        asyncio.to_thread(
+            pool.send,
+            [build_message(e.to_email, e.subject, e.body, e.html) for e in group],
+        )
+        for group in groups
+    ))
+
+    sent = 0
+    finished_at = _utcnow()
+    for group, errors in zip(groups, results):
+        for email, error in zip(group, errors):
+            email.attempts += 1
+            if error is None:
+                email.status = "sent"
+                email.sent_at = finished_at
+                email.last_error = None
+                sent += 1
+            else:
+                email.last_error = error[:500]
+                if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                    email.status = "failed"
+                    logger.error(f"邮件发送失败，已放弃: {email.to_email}: {error}")
+                else:
+                    email.next_attempt_at = finished_at + retry_delay(email.attempts)
+                    logger.warning(f"邮件发送失败，将重试: {email.to_email}: {error}")
+            session.add(email)
+    await session.commit()
+    if sent:
+        logger.info(f"已发送 {sent} 封邮件")
+    return len(claimed)
+
+
+async def run_email_worker(interval: float, batch_size: int) -> None:
+    """后台循环发送发件箱中的邮件，直到任务被取消"""
+    while True:
+        delivered = 0
+        try:
+            async with session_scope() as session:
+                delivered = await deliver_outbox(session, batch_size)
+        except Exception as e:
+            logger.error(f"发送发件箱邮件失败: {e}")
+        # 取满一批说明还有积压，立即继续
+        if delivered < batch_size:
+            await asyncio.sleep(interval)
+
+
 def send_email(to_email: str, subject: str, body: str, html: bool = False):
     """
-    发送邮件
+    立即发送邮件（不经过发件箱）
     :param to_email: 收件人邮箱
     :param subject: 邮件主题
     :param body: 邮件正文
     :param html: 是否为HTML格式
     """
     try:
-        msg = MIMEMultipart()
-        msg['From'] = formataddr((settings.EMAIL_FROM_NAME, settings.EMAIL_FROM))
-        msg['To'] = to_email
-        msg['Subject'] = subject
-
-        if html:
-            msg.attach(MIMEText(body, 'html', 'utf-8'))
-        else:
-            msg.attach(MIMEText(body, 'plain', 'utf-8'))
-
-        if settings.SMTP_TLS:
-            server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT)
-        else:
-            server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
-            server.starttls()
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        server.sendmail(settings.EMAIL_FROM, [to_email], msg.as_string())
+        server = connect_smtp()
+        _sendmail(server, build_message(to_email, subject, body, html))
         server.quit()
         logger.info(f"邮件已发送到: {to_email}")
         return True
@@ -49,4 +254,4 @@ if __name__ == "__main__":
     if result:
         print("邮件发送成功！")
     else:
-        print("邮件发送失败，请检查日志和SMTP配置。") 
\ No newline at end of file
+        print("邮件发送失败，请检查日志和SMTP配置。")
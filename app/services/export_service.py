@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import session_scope
+from app.core.search import build_match_query, fts_supported
+from app.models.association import PostTagLink
+from app.models.comment import Comment
+from app.models.post import Post
+from app.services.comment_service import filter_comments_query
+from app.services.post_service import filter_posts_query
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 支持的导出格式及其 Content-Type
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# 文章导出的列（另附 tag_ids），NDJSON 格式的每一行可以直接用于批量导入
+POST_EXPORT_COLUMNS = (
+    Post.id,
+    Post.title,
+    Post.summary,
+    Post.content_markdown,
+    Post.published,
+    Post.author_id,
+    Post.category_id,
+    Post.created_at,
+    Post.updated_at,
+)
+POST_EXPORT_FIELDS = [column.key for column in POST_EXPORT_COLUMNS] + ["tag_ids"]
+
+COMMENT_EXPORT_COLUMNS = (
+    Comment.id,
+    Comment.content,
+    Comment.post_id,
+    Comment.author_id,
+    Comment.created_at,
+    Comment.updated_at,
+)
+COMMENT_EXPORT_FIELDS = [column.key for column in COMMENT_EXPORT_COLUMNS]
+
+
+async def _stream_partitions(session: AsyncSession, query, batch_size: int) -> AsyncIterator[Sequence]:
+    """用服务端游标（yield_per）按批取回查询结果，内存中只保留当前一批"""
+    query = query.execution_options(yield_per=batch_size)
+    if isinstance(session, AsyncSession):
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            yield rows
+    else:
+        # DB_ASYNC=False：与其他查询一样直接在事件循环中阻塞执行
+        for rows in session.sync_session.execute(query).partitions():
+            yield rows
+
+
+async def _attach_tag_ids(session: AsyncSession, records: List[dict]) -> None:
+    """每批用一次 IN 查询取回文章的标签ID"""
+    tag_ids: Dict[int, List[int]] = {record["id"]: [] for record in records}
+    links = await session.exec(
+        select(PostTagLink.post_id, PostTagLink.tag_id)
+        .where(PostTagLink.post_id.in_(tag_ids))
+        .order_by(PostTagLink.post_id, PostTagLink.tag_id)
+    )
+    for post_id, tag_id in links.all():
+        tag_ids[post_id].append(tag_id)
+    for record in records:
+        record["tag_ids"] = tag_ids[record["id"]]
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_value(value):
+    """CSV 中布尔值写为 true/false，列表写为空格分隔的值，时间写为 ISO 格式"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return _json_value(value)
+
+
+def _encode(records: List[dict], fields: List[str], fmt: str, header: bool = False) -> bytes:
+    """把一批记录编码为 NDJSON 行或 CSV 行"""
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({key: _json_value(value) for key, value in record.items()}, ensure_ascii=False) + "\n"
+            for record in records
+        ).encode()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    if header:
+        writer.writeheader()
+    writer.writerows({key: _csv_value(value) for key, value in record.items()} for record in records)
+    return buffer.getvalue().encode()
+
+
+async def _export(
+    name: str,
+    query,
+    fields: List[str],
+    fmt: str,
+    batch_size: Optional[int],
+    enrich: Optional[Callable[[AsyncSession, List[dict]], Awaitable[None]]] = None,
+) -> AsyncIterator[bytes]:
+    """在独立的只读会话中流式执行查询，每批编码后立即输出"""
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    exported = 0
+    try:
+        if fmt == "csv":
+            yield _encode([], fields, fmt, header=True)
+        async with session_scope(read_only=True) as session:
+            async for rows in _stream_partitions(session, query, batch_size):
+                records = [dict(row._mapping) for row in rows]
+                if enrich:
+                    await enrich(session, records)
+                exported += len(records)
+                yield _encode(records, fields, fmt)
+        logger.info(f"导出{name}: 格式={fmt}, 行数={exported}")
+    except Exception as e:
+        logger.error(f"导出{name}错误: {str(e)}", exc_info=True)
+        raise
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+
+
+# 业务逻辑：导出文章
+def export_posts_service(
+    fmt: str = "ndjson",
+    search: Optional[str] = None,
+    categoryId: Optional[int] = None,
+    tagId: Optional[int] = None,
+    published: Optional[bool] = None,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """按文章列表的筛选条件导出文章，返回编码后的字节块
+
+    按 (created_at, id) 倒序，每次从服务端游标取 batch_size（默认 EXPORT_BATCH_SIZE）行，
+    内存占用与表的大小无关。生成器自己打开和关闭会话，可以在请求结束后继续输出。
+    """
+    _check_format(fmt)
+    match_query = build_match_query(search) if search and fts_supported() else None
+    query = filter_posts_query(
+        select(*POST_EXPORT_COLUMNS), match_query, search, categoryId, tagId, published
+    ).order_by(Post.created_at.desc(), Post.id.desc())
+    return _export("文章", query, POST_EXPORT_FIELDS, fmt, batch_size, _attach_tag_ids)
+
+
+# 业务逻辑：导出评论
+def export_comments_service(
+    fmt: str = "ndjson",
+    postId: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """按评论列表的筛选条件导出评论，返回编码后的字节块（分批方式同 export_posts_service）"""
+    _check_format(fmt)
+    query = filter_comments_query(select(*COMMENT_EXPORT_COLUMNS), postId).order_by(
+        Comment.created_at.desc(), Comment.id.desc()
+    )
+    return _export("评论", query, COMMENT_EXPORT_FIELDS, fmt, batch_size)
@@ -0,0 +1,259 @@
+import json
+import logging
+from datetime import UTC, datetime
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.database import session_scope
+from app.core.renderer import RenderError, renderer
+from app.models.association import PostTagLink
+from app.models.category import Category
+from app.models.post import Post
+from app.models.tag import Tag
+from app.schemas.post import PostImport, PostImportError, PostImportResult
+from app.services.search_service import index_new_posts
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """把请求体的字节块切分为 (行号, 行内容)，不把整个请求体读入内存
+
+    超过 max_line 字节的行不再缓存，丢弃到下一个换行为止，行内容返回 None。
+    """
+    buffer = bytearray()
+    line_no = 0
+    too_long = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not too_long:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line:
+                        too_long = True
+                        buffer.clear()
+                break
+            line_no += 1
+            if not too_long:
+                buffer += chunk[start:end]
+            if too_long or len(buffer) > max_line:
+                yield line_no, None
+            else:
+                yield line_no, bytes(buffer)
+            buffer.clear()
+            too_long = False
+            start = end + 1
+    if too_long:
+        yield line_no + 1, None
+    elif buffer:
+        yield line_no + 1, bytes(buffer)
+
+
+def _parse_line(raw: bytes) -> PostImport:
+    """解析并校验一行，失败时抛出 ValueError（说明错误原因）"""
+    try:
+        data = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"JSON 格式错误: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("每行必须是一个 JSON 对象")
+    try:
+        return PostImport.model_validate(data)
+    except ValidationError as e:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+        )
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """数据库中的时间统一保存为不带时区的 UTC 时间"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def _insert_ignoring_conflicts(table):
+    """遇到唯一约束冲突时跳过该行的 INSERT"""
+    if settings.DATABASE_URL.startswith("postgresql"):
+        return pg_insert(table).on_conflict_do_nothing()
+    return sqlite_insert(table).on_conflict_do_nothing()
+
+
+async def _resolve_tags(session, rows: List[PostImport]) -> Dict[str, int]:
+    """一次查询按名称解析本批用到的标签，不存在的标签一次插入
+
+    查询之后其他请求可能已创建同名标签，插入时跳过冲突的名称，再统一查询ID。
+    """
+    names = {name for row in rows for name in row.tags}
+    if not names:
+        return {}
+    found = dict((await session.exec(select(Tag.name, Tag.id).where(Tag.name.in_(names)))).all())
+    missing = sorted(names - found.keys())
+    if missing:
+        now = datetime.utcnow()
+        await session.exec(
+            _insert_ignoring_conflicts(Tag).values(
+                [{"name": name, "created_at": now} for name in missing]
+            )
+        )
+        created = (await session.exec(select(Tag.name, Tag.id).where(Tag.name.in_(missing)))).all()
+        found.update(dict(created))
+    return found
+
+
+async def _import_chunk(
+    chunk: List[Tuple[int, PostImport]], author_id: int
+) -> Tuple[int, List[PostImportError]]:
+    """渲染并在一个事务中写入一批文章，返回 (写入数, 错误行)
+
+    渲染失败、分类不存在的行单独报错；事务失败时整批记为失败，不影响其他批次。
+    """
+    errors: List[PostImportError] = []
+    htmls = await renderer.render_many([row.content_markdown for _, row in chunk])
+    rendered = []
+    for (line_no, row), html in zip(chunk, htmls):
+        if isinstance(html, RenderError):
+            errors.append(PostImportError(line=line_no, error=str(html)))
+        else:
+            rendered.append((line_no, row, html))
+    if not rendered:
+        return 0, errors
+
+    try:
+        async with session_scope() as session:
+            category_ids = {row.category_id for _, row, _ in rendered if row.category_id}
+            existing_categories: Set[int] = set()
+            if category_ids:
+                existing_categories = set(
+                    (await session.exec(select(Category.id).where(Category.id.in_(category_ids)))).all()
+                )
+            valid = []
+            for line_no, row, html in rendered:
+                if row.category_id and row.category_id not in existing_categories:
+                    errors.append(PostImportError(line=line_no, error=f"分类不存在: {row.category_id}"))
+                else:
+                    valid.append((row, html))
+            if not valid:
+                return 0, errors
+
+            tag_ids_by_name = await _resolve_tags(session, [row for row, _ in valid])
+            tag_ids = {tag_id for row, _ in valid for tag_id in row.tag_ids}
+            existing_tags = set(tag_ids_by_name.values())
+            if tag_ids:
+                existing_tags |= set(
+                    (await session.exec(select(Tag.id).where(Tag.id.in_(tag_ids)))).all()
+                )
+
+            now = datetime.utcnow()
+            values = [
+                {
+                    "title": row.title,
+                    "content_markdown": row.content_markdown,
+                    "content_html": html,
+                    "summary": row.summary,
+                    "published": row.published,
+                    "author_id": author_id,
+                    "category_id": row.category_id,
+                    "created_at": _naive_utc(row.created_at) or now,
+                    "updated_at": _naive_utc(row.created_at) or now,
+                }
+                for row, html in valid
+            ]
+            # INSERT ... RETURNING 按参数顺序取回新文章ID；支持的数据库（PostgreSQL）合并为多行语句，
+            # SQLite 不保证 RETURNING 的顺序，逐行执行，但仍在同一事务中，只在提交时落盘一次
+            result = await session.exec(
+                insert(Post).returning(Post.id, sort_by_parameter_order=True), params=values
+            )
+            post_ids = [post_id for post_id, in result.all()]
+
+            links = {
+                (post_id, tag_id)
+                for post_id, (row, _) in zip(post_ids, valid)
+                for tag_id in [*row.tag_ids, *(tag_ids_by_name[name] for name in row.tags)]
+                if tag_id in existing_tags
+            }
+            if links:
+                await session.exec(
+                    insert(PostTagLink).values(
+                        [{"post_id": post_id, "tag_id": tag_id} for post_id, tag_id in sorted(links)]
+                    )
+                )
+            await index_new_posts(
+                session,
+                [
+                    (post_id, row.title, row.summary, row.content_markdown)
+                    for post_id, (row, _) in zip(post_ids, valid)
+                ],
+            )
+            await session.commit()
+            return len(post_ids), errors
+    except Exception as e:
+        logger.error(f"导入文章批次失败: {e}", exc_info=True)
+        failed = {line_no for line_no, _, _ in rendered} - {error.line for error in errors}
+        errors.extend(PostImportError(line=line_no, error=f"写入失败: {e}") for line_no in sorted(failed))
+        return 0, errors
+
+
+# 业务逻辑：批量导入文章
+async def import_posts_service(
+    chunks: AsyncIterable[bytes],
+    author_id: int,
+    chunk_size: Optional[int] = None,
+) -> PostImportResult:
+    """从 NDJSON 字节流导入文章，每行一篇（字段同 PostImport）
+
+    边读边按 chunk_size（默认 POST_IMPORT_CHUNK_SIZE）分批：每批的 Markdown 在渲染执行器中并行渲染，
+    标签名称和ID按批解析，文章、标签关联和全文索引在每批一个事务中写入。
+    出错的行记录到结果中，不中断整个导入。
+    """
+    chunk_size = chunk_size or settings.POST_IMPORT_CHUNK_SIZE
+    # 中文按 \uXXXX 转义时长度是 UTF-8 的两倍，另留出其他字段的余量
+    max_line = settings.RENDER_MAX_SIZE * 2 + 64 * 1024
+    imported = 0
+    failed = 0
+    errors: List[PostImportError] = []
+
+    def record(batch_errors: List[PostImportError]) -> None:
+        nonlocal failed
+        failed += len(batch_errors)
+        room = settings.POST_IMPORT_MAX_ERRORS - len(errors)
+        errors.extend(batch_errors[:max(room, 0)])
+
+    chunk: List[Tuple[int, PostImport]] = []
+    async for line_no, raw in iter_lines(chunks, max_line):
+        if raw is None:
+            record([PostImportError(line=line_no, error=f"行长度超过 {max_line} 字节")])
+            continue
+        if not raw.strip():
+            continue
+        try:
+            chunk.append((line_no, _parse_line(raw)))
+        except ValueError as e:
+            record([PostImportError(line=line_no, error=str(e))])
+            continue
+        if len(chunk) >= chunk_size:
+            written, batch_errors = await _import_chunk(chunk, author_id)
+            imported += written
+            record(batch_errors)
+            chunk = []
+    if chunk:
+        written, batch_errors = await _import_chunk(chunk, author_id)
+        imported += written
+        record(batch_errors)
+
+    logger.info(f"批量导入文章: 成功={imported}, 失败={failed}")
+    errors.sort(key=lambda error: error.line)
+    return PostImportResult(imported=imported, failed=failed, errors=errors)
@@ -1,77 +1,180 @@
 from datetime import datetime, UTC
-from typing import Optional
+from typing import Iterable, Optional, Set
 import logging
 
-import markdown
-from sqlmodel import Session, select, func
+from sqlalchemy import delete, insert, literal_column
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import settings
+from app.core.count_cache import count_rows
+from app.core.pagination import Page, brief_columns, fetch_page
+from app.core.renderer import render_markdown_async
+from app.core.search import (bm25_rank, build_match_query, fts_supported,
+                             post_fts, post_fts_match, snippet,
+                             strip_segmentation)
+from app.models.association import PostTagLink
 from app.models.post import Post
 from app.models.tag import Tag
-from app.schemas.post import PostCreate, PostUpdate
+from app.schemas.post import PostBrief, PostCreate, PostUpdate
+from app.services.search_service import index_post, remove_post_from_index
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 文章详情响应需要预加载的关联数据，异步会话中不能在序列化时懒加载：
+# 多对一的作者、分类随主查询 JOIN 取回，多对多的标签用一次 IN 查询，共两条语句
+POST_LOAD_OPTIONS = (
+    joinedload(Post.author),
+    joinedload(Post.category),
+    selectinload(Post.tags),
+)
+# 列表项（PostBrief）只查询需要的列，不加载正文和渲染结果
+POST_BRIEF_COLUMNS = brief_columns(Post, PostBrief)
+
+
+async def _load_post(session: AsyncSession, postId: int):
+    """按响应结构重新加载文章（覆盖会话中已有的对象）"""
+    query = (
+        select(Post)
+        .where(Post.id == postId)
+        .options(*POST_LOAD_OPTIONS)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(query)).first()
+
+def filter_posts_query(
+    query,
+    match_query: Optional[str],
+    search: Optional[str] = None,
+    categoryId: Optional[int] = None,
+    tagId: Optional[int] = None,
+    published: Optional[bool] = None,
+):
+    """给文章查询加上列表的筛选条件（列表、计数和导出共用）
+
+    match_query 为 build_match_query 的结果，非空时按全文索引匹配，否则按 LIKE 搜索 search。
+    """
+    if match_query:
+        query = query.join(post_fts, post_fts.c.rowid == Post.id).filter(
+            post_fts_match.op("MATCH")(match_query)
+        )
+    elif search:
+        query = query.filter(Post.title.contains(search) | Post.content_markdown.contains(search))
+    if categoryId:
+        query = query.filter(Post.category_id == categoryId)
+    if tagId:
+        query = query.join(Post.tags).filter(Tag.id == tagId)
+    if published is not None:
+        query = query.filter(Post.published == published)
+    return query
+
+
 # 业务逻辑：获取文章列表
-def get_posts_service(
-    session: Session,
+async def get_posts_service(
+    session: AsyncSession,
     skip: int = 0,
     limit: int = 10,
     search: Optional[str] = None,
     categoryId: Optional[int] = None,
     tagId: Optional[int] = None,
     published: Optional[bool] = None,
-):
-    """获取文章列表业务逻辑"""
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
+) -> Page:
+    """获取文章列表业务逻辑
+
+    默认按创建时间倒序，传入 cursor 时按游标分页。有搜索词时优先使用 FTS5 全文索引，
+    按 bm25 相关度排序并返回高亮片段（此时只支持 skip 分页）；
+    全文索引不可用或搜索词中没有可检索的字符时退回 LIKE 查询。
+    总数按筛选条件缓存，with_total=False 时不计数，estimated=True 且无筛选时返回近似值。
+    列表项是只含 PostBrief 所需列的 Row 对象，不是 Post 实例。
+    """
     try:
         # 构建基础查询
-        query = select(Post)
+        query = select(*POST_BRIEF_COLUMNS)
         count_query = select(func.count(Post.id))
-        
+        match_query = build_match_query(search) if search and fts_supported() else None
+        snippets = None
+        if match_query and cursor:
+            raise ValueError("搜索结果按相关度排序，不支持游标分页")
+
         # 添加过滤条件
-        if search:
-            search_filter = Post.title.contains(search) | Post.content_markdown.contains(search)
-            query = query.filter(search_filter)
-            count_query = count_query.filter(search_filter)
-        
-        if categoryId:
-            query = query.filter(Post.category_id == categoryId)
-            count_query = count_query.filter(Post.category_id == categoryId)
+        if match_query:
+            query = select(
+                *POST_BRIEF_COLUMNS, bm25_rank().label("rank"), snippet().label("match_snippet")
+            )
+        query = filter_posts_query(query, match_query, search, categoryId, tagId, published)
+        count_query = filter_posts_query(count_query, match_query, search, categoryId, tagId, published)
         
-        if tagId:
-            query = query.join(Post.tags).filter(Tag.id == tagId)
-            count_query = count_query.join(Post.tags).filter(Tag.id == tagId)
-        
-        if published is not None:
-            query = query.filter(Post.published == published)
-            count_query = count_query.filter(Post.published == published)
-        
-        # 获取总数
-        total_result = session.exec(count_query).first()
-        total = int(total_result) if total_result is not None else 0
+        # 获取总数（搜索词按规范化后的 MATCH 表达式缓存，两种搜索方式的结果分开缓存）
+        filters = {
+            "match": match_query,
+            "search": search if search and not match_query else None,
+            "category_id": categoryId or None,
+            "tag_id": tagId or None,
+            "published": published,
+        }
+        dependencies = [PostTagLink.__tablename__] if tagId else []
+        if match_query:
+            dependencies.append(post_fts.name)
+        total, total_estimated = await count_rows(
+            session, count_query, Post, filters, dependencies,
+            with_total=with_total, estimated=estimated,
+        )
         
         # 获取分页数据
-        posts_query = query.order_by(Post.created_at.desc()).offset(skip).limit(limit)
-        posts = session.exec(posts_query).all()
+        if match_query:
+            # bm25 越小越相关
+            posts_query = query.order_by(literal_column("rank"), Post.created_at.desc())
+            rows = (await session.exec(posts_query.offset(skip).limit(limit))).all()
+            posts = list(rows)
+            snippets = {row.id: strip_segmentation(row.match_snippet) for row in rows}
+            next_cursor = None
+        else:
+            posts, next_cursor = await fetch_page(session, query, Post, skip, limit, cursor)
         
         logger.info(f"获取文章列表: 总数={total}, 返回={len(posts)}")
-        return total, posts
+        return Page(total, posts, next_cursor, snippets, total_estimated)
     except Exception as e:
         logger.error(f"获取文章列表错误: {str(e)}", exc_info=True)
         raise
 
 # 业务逻辑：获取文章详情
-def get_post_service(postId: int, session: Session):
+async def get_post_service(postId: int, session: AsyncSession):
     """获取文章详情业务逻辑"""
-    return session.get(Post, postId)
+    return await session.get(Post, postId, options=POST_LOAD_OPTIONS)
+
+async def _sync_post_tags(
+    session: AsyncSession, post_id: int, tag_ids: Iterable[int], current: Set[int]
+) -> None:
+    """按差集同步文章标签（在调用方的事务中执行）
+
+    只删除被移除的关联、一条语句插入新增的关联；不存在的标签ID被忽略。
+    """
+    wanted = set(tag_ids)
+    removed = current - wanted
+    if removed:
+        await session.exec(
+            delete(PostTagLink).where(
+                PostTagLink.post_id == post_id, PostTagLink.tag_id.in_(removed)
+            )
+        )
+    added = wanted - current
+    if added:
+        existing = (await session.exec(select(Tag.id).where(Tag.id.in_(added)))).all()
+        if existing:
+            await session.exec(
+                insert(PostTagLink).values(
+                    [{"post_id": post_id, "tag_id": tag_id} for tag_id in sorted(existing)]
+                )
+            )
 
 # 业务逻辑：创建文章
-def create_post_service(post_data: PostCreate, session: Session, user_id: int):
-    """创建文章业务逻辑"""
-    html_content = markdown.markdown(
-        post_data.content_markdown, extensions=settings.MARKDOWN_EXTENSIONS.split(",")
-    )
+async def create_post_service(post_data: PostCreate, session: AsyncSession, user_id: int):
+    """创建文章业务逻辑：文章、标签关联和全文索引在同一事务中提交"""
+    html_content = await render_markdown_async(post_data.content_markdown)
     new_post = Post(
         title=post_data.title,
         content_markdown=post_data.content_markdown,
@@ -82,49 +185,48 @@ def create_post_service(post_data: PostCreate, session: Session, user_id: int):
         category_id=post_data.category_id,
     )
     session.add(new_post)
-    session.commit()
-    session.refresh(new_post)
-    if post_data.tag_ids:
-        tags = session.exec(select(Tag).where(Tag.id.in_(post_data.tag_ids))).all()
-        for tag in tags:
-            new_post.tags.append(tag)
-        session.commit()
-        session.refresh(new_post)
-    return new_post
+    await session.flush()
+    await _sync_post_tags(session, new_post.id, post_data.tag_ids, current=set())
+    await index_post(session, new_post)
+    await session.commit()
+    return await _load_post(session, new_post.id)
 
 # 业务逻辑：更新文章
-def update_post_service(post: Post, post_data: PostUpdate, session: Session):
-    """更新文章业务逻辑"""
-    if post_data.title:
+async def update_post_service(post: Post, post_data: PostUpdate, session: AsyncSession):
+    """更新文章业务逻辑
+
+    所有修改在一个事务中提交；正文变化时才重新渲染，标题、摘要或正文变化时才更新全文索引，
+    标签按差集增删。post 需由 get_post_service 加载（已预加载标签）。
+    """
+    searchable_changed = False
+    if post_data.title and post_data.title != post.title:
         post.title = post_data.title
-    if post_data.content_markdown:
+        searchable_changed = True
+    if post_data.content_markdown and post_data.content_markdown != post.content_markdown:
         post.content_markdown = post_data.content_markdown
-        post.content_html = markdown.markdown(
-            post_data.content_markdown,
-            extensions=settings.MARKDOWN_EXTENSIONS.split(","),
-        )
-    if post_data.summary is not None:
+        post.content_html = await render_markdown_async(post_data.content_markdown)
+        searchable_changed = True
+    if post_data.summary is not None and post_data.summary != post.summary:
         post.summary = post_data.summary
+        searchable_changed = True
     if post_data.published is not None:
         post.published = post_data.published
     if post_data.category_id is not None:
         post.category_id = post_data.category_id
     post.updated_at = datetime.now(UTC)
     session.add(post)
-    session.commit()
     if post_data.tag_ids is not None:
-        post.tags = []
-        session.commit()
-        if post_data.tag_ids:
-            tags = session.exec(select(Tag).where(Tag.id.in_(post_data.tag_ids))).all()
-            for tag in tags:
-                post.tags.append(tag)
-    session.commit()
-    session.refresh(post)
-    return post
+        await _sync_post_tags(
+            session, post.id, post_data.tag_ids, current={tag.id for tag in post.tags}
+        )
+    if searchable_changed:
+        await index_post(session, post)
+    await session.commit()
+    return await _load_post(session, post.id)
 
 # 业务逻辑：删除文章
-def delete_post_service(post: Post, session: Session):
+async def delete_post_service(post: Post, session: AsyncSession):
     """删除文章业务逻辑"""
-    session.delete(post)
-    session.commit() 
\ No newline at end of file
+    await remove_post_from_index(session, post.id)
+    await session.delete(post)
+    await session.commit() 
\ No newline at end of file
@@ -0,0 +1,87 @@
+import logging
+import time
+from typing import Iterable, Tuple
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.search import (CREATE_FTS_TABLE, DROP_FTS_TABLE, FTS_TABLE,
+                             fts_supported, post_fts, segment_cjk)
+from app.models.post import Post
+
+logger = logging.getLogger(__name__)
+
+posts = Post.__table__
+
+
+def _index_row(post_id: int, title: str, summary, content: str) -> dict:
+    return {
+        "rowid": post_id,
+        "title": segment_cjk(title),
+        "summary": segment_cjk(summary),
+        "content": segment_cjk(content),
+    }
+
+
+# 写入或更新文章的全文索引（在调用方的事务中执行）
+async def index_post(session: AsyncSession, post: Post) -> None:
+    """写入或更新文章的全文索引，与文章修改在同一事务中提交"""
+    if not fts_supported():
+        return
+    await session.exec(delete(post_fts).where(post_fts.c.rowid == post.id))
+    await session.exec(
+        insert(post_fts).values(**_index_row(post.id, post.title, post.summary, post.content_markdown))
+    )
+
+
+# 批量写入新文章的全文索引
+async def index_new_posts(session: AsyncSession, new_posts: Iterable[tuple]) -> None:
+    """为刚创建的文章批量写入全文索引（一条 INSERT，在调用方的事务中执行）
+
+    new_posts 的每一项为 (id, title, summary, content_markdown)。
+    """
+    rows = [_index_row(*post) for post in new_posts]
+    if not rows or not fts_supported():
+        return
+    await session.exec(insert(post_fts).values(rows))
+
+
+# 从全文索引中删除文章
+async def remove_post_from_index(session: AsyncSession, post_id: int) -> None:
+    """从全文索引中删除文章（在调用方的事务中执行）"""
+    if not fts_supported():
+        return
+    await session.exec(delete(post_fts).where(post_fts.c.rowid == post_id))
+
+
+def _iter_index_rows(conn: Connection, batch_size: int) -> Iterable[list]:
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(posts.c.id, posts.c.title, posts.c.summary, posts.c.content_markdown)
+            .where(posts.c.id > last_id)
+            .order_by(posts.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield [_index_row(*row) for row in rows]
+        last_id = rows[-1].id
+
+
+# 重建全文索引
+def rebuild_search_index(conn: Connection, batch_size: int = 2000) -> Tuple[int, float]:
+    """删除并重建全文索引，返回 (索引文章数, 耗时秒)；调用方负责提交"""
+    started = time.perf_counter()
+    conn.execute(text(DROP_FTS_TABLE))
+    conn.execute(text(CREATE_FTS_TABLE))
+    indexed = 0
+    for batch in _iter_index_rows(conn, batch_size):
+        conn.execute(insert(post_fts), batch)
+        indexed += len(batch)
+    # 合并索引段，提高查询速度
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+    elapsed = time.perf_counter() - started
+    logger.info(f"全文索引重建完成: {indexed} 篇文章，耗时 {elapsed:.1f} 秒")
+    return indexed, elapsed
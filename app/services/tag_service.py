@@ -1,5 +1,9 @@
 import logging
-from sqlmodel import Session, select, func
+from typing import Optional
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.count_cache import count_rows
+from app.core.pagination import Page, fetch_page
 from app.models.tag import Tag
 from app.schemas.tag import TagCreate, TagUpdate
 
@@ -7,56 +11,63 @@ from app.schemas.tag import TagCreate, TagUpdate
 logger = logging.getLogger(__name__)
 
 # 获取标签列表业务逻辑
-def get_tags_service(session: Session, skip: int = 0, limit: int = 100):
-    """获取标签列表业务逻辑"""
+async def get_tags_service(
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
+) -> Page:
+    """获取标签列表业务逻辑；传入 cursor 时按游标分页，with_total/estimated 见 count_rows"""
     try:
         # 获取分页数据
-        tags_query = select(Tag).offset(skip).limit(limit)
-        tags = session.exec(tags_query).all()
+        tags, next_cursor = await fetch_page(session, select(Tag), Tag, skip, limit, cursor)
         
         # 获取总数
         count_query = select(func.count(Tag.id))
-        total_result = session.exec(count_query).first()
-        total = int(total_result) if total_result is not None else 0
+        total, total_estimated = await count_rows(
+            session, count_query, Tag, {}, with_total=with_total, estimated=estimated
+        )
         
         logger.info(f"获取标签列表: 总数={total}, 返回={len(tags)}")
-        return total, tags
+        return Page(total, tags, next_cursor, total_estimated=total_estimated)
     except Exception as e:
         logger.error(f"获取标签列表错误: {str(e)}", exc_info=True)
         raise
 
 # 获取标签详情业务逻辑
-def get_tag_service(tagId: int, session: Session):
+async def get_tag_service(tagId: int, session: AsyncSession):
     """获取标签详情业务逻辑"""
-    return session.get(Tag, tagId)
+    return await session.get(Tag, tagId)
 
 # 检查标签名是否存在
-def check_tag_exists(session: Session, name: str):
+async def check_tag_exists(session: AsyncSession, name: str):
     """检查标签名是否存在"""
-    db_tag = session.exec(select(Tag).where(Tag.name == name)).first()
+    db_tag = (await session.exec(select(Tag).where(Tag.name == name))).first()
     return db_tag is not None
 
 # 创建标签业务逻辑
-def create_tag_service(tag_data: TagCreate, session: Session):
+async def create_tag_service(tag_data: TagCreate, session: AsyncSession):
     """创建标签业务逻辑"""
     new_tag = Tag(**tag_data.model_dump())
     session.add(new_tag)
-    session.commit()
-    session.refresh(new_tag)
+    await session.commit()
+    await session.refresh(new_tag)
     return new_tag
 
 # 更新标签业务逻辑
-def update_tag_service(tag: Tag, tag_data: TagUpdate, session: Session):
+async def update_tag_service(tag: Tag, tag_data: TagUpdate, session: AsyncSession):
     """更新标签业务逻辑"""
     if tag_data.name != tag.name:
         tag.name = tag_data.name
     session.add(tag)
-    session.commit()
-    session.refresh(tag)
+    await session.commit()
+    await session.refresh(tag)
     return tag
 
 # 删除标签业务逻辑
-def delete_tag_service(tag: Tag, session: Session):
+async def delete_tag_service(tag: Tag, session: AsyncSession):
     """删除标签业务逻辑"""
-    session.delete(tag)
-    session.commit() 
\ No newline at end of file
+    await session.delete(tag)
+    await session.commit() 
\ No newline at end of file
@@ -1,74 +1,102 @@
 from datetime import datetime, UTC
 import logging
-from sqlmodel import Session, select, func
+from typing import Optional
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.count_cache import count_rows
+from app.core.pagination import Page, brief_columns, fetch_page
 from app.models.user import User
-from app.schemas.user import UserUpdate
-from app.core.security import get_password_hash
+from app.schemas.user import UserResponse, UserUpdate
+from app.core.principal import principal_cache
+from app.core.revocation import revocation_list, revoke_user_tokens
+from app.core.hashing import get_password_hash_async
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 用户列表只查询响应需要的列，不读取密码哈希
+USER_LIST_COLUMNS = brief_columns(User, UserResponse)
+
 # 获取用户列表业务逻辑
-def get_users_service(session: Session, skip: int = 0, limit: int = 100):
-    """获取用户列表业务逻辑"""
+async def get_users_service(
+    session: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    estimated: bool = False,
+) -> Page:
+    """获取用户列表业务逻辑；传入 cursor 时按游标分页，with_total/estimated 见 count_rows
+
+    列表项是只含 UserResponse 所需列的 Row 对象。
+    """
     try:
         # 获取分页用户列表
-        users_query = select(User).offset(skip).limit(limit)
-        logger.info(f"用户查询: {users_query}")
-        users = session.exec(users_query).all()
+        users, next_cursor = await fetch_page(
+            session, select(*USER_LIST_COLUMNS), User, skip, limit, cursor
+        )
         logger.info(f"获取到用户列表: {len(users)} 条记录")
         
         # 获取用户总数
         total_query = select(func.count(User.id))
-        logger.info(f"总数查询: {total_query}")
-        total_result = session.exec(total_query).first()
-        logger.info(f"获取到用户总数结果: {total_result}, 类型: {type(total_result)}")
-        
-        # 确保total是整数
-        total = int(total_result) if total_result is not None else 0
+        total, total_estimated = await count_rows(
+            session, total_query, User, {}, with_total=with_total, estimated=estimated
+        )
         logger.info(f"最终用户总数: {total}")
         
-        return total, users
+        return Page(total, users, next_cursor, total_estimated=total_estimated)
     except Exception as e:
         logger.error(f"获取用户列表错误: {str(e)}", exc_info=True)
         raise
 
 # 获取单个用户详情业务逻辑
-def get_user_service(userId: int, session: Session):
+async def get_user_service(userId: int, session: AsyncSession):
     """获取单个用户详情业务逻辑"""
-    return session.get(User, userId)
+    return await session.get(User, userId)
 
 # 检查用户名或邮箱是否已存在
-def check_user_exists(session: Session, username: str = None, email: str = None):
+async def check_user_exists(session: AsyncSession, username: str = None, email: str = None):
     """检查用户名或邮箱是否已存在"""
     if username:
-        db_user = session.exec(select(User).where(User.username == username)).first()
+        db_user = (await session.exec(select(User).where(User.username == username))).first()
         if db_user:
             return True
     if email:
-        db_user = session.exec(select(User).where(User.email == email)).first()
+        db_user = (await session.exec(select(User).where(User.email == email))).first()
         if db_user:
             return True
     return False
 
 # 更新用户信息业务逻辑
-def update_user_service(user: User, user_data: UserUpdate):
-    """更新用户信息业务逻辑"""
+async def update_user_service(user: User, user_data: UserUpdate, session: AsyncSession):
+    """更新用户信息业务逻辑（提交后清除该用户的令牌缓存；改密码或禁用时吊销已签发的令牌）"""
+    revoke = bool(user_data.password) or user_data.is_active is False
     if user_data.username and user_data.username != user.username:
         user.username = user_data.username
     if user_data.email and user_data.email != user.email:
         user.email = user_data.email
     if user_data.password:
-        user.hashed_password = get_password_hash(user_data.password)
+        user.hashed_password = await get_password_hash_async(user_data.password)
     if hasattr(user_data, 'is_active') and user_data.is_active is not None:
         user.is_active = user_data.is_active
     if hasattr(user_data, 'is_admin') and user_data.is_admin is not None:
         user.is_admin = user_data.is_admin
     user.updated_at = datetime.now(UTC)
+    session.add(user)
+    revocation_key = await revoke_user_tokens(session, user.id) if revoke else None
+    await session.commit()
+    await session.refresh(user)
+    if revocation_key:
+        revocation_list.add(revocation_key)
+    principal_cache.invalidate_user(user.id)
     return user
 
 # 删除用户业务逻辑
-def delete_user_service(user: User, session: Session):
+async def delete_user_service(user: User, session: AsyncSession):
     """删除用户业务逻辑"""
-    session.delete(user)
-    session.commit() 
\ No newline at end of file
+    user_id = user.id
+    await session.delete(user)
+    revocation_key = await revoke_user_tokens(session, user_id)
+    await session.commit()
+    revocation_list.add(revocation_key)
+    principal_cache.invalidate_user(user_id) 
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""文章导出基准：不同表大小下流式导出的耗时和内存峰值
+
+内存峰值只取决于每批的行数（EXPORT_BATCH_SIZE），不随文章总数增长。
+
+用法：
+    poetry run python -m benchmarks.bench_export --posts 2000 20000 --body-kb 10
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+# 基准使用独立的临时数据库，需在导入应用之前设置
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-export-')}/bench.db"
+os.environ["DEBUG"] = "false"
+
+from sqlmodel import SQLModel, delete  # noqa: E402
+
+from app.core.database import async_engine, engine  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from app.services.export_service import export_posts_service  # noqa: E402
+
+
+def prepare_database(posts: int, body_kb: int) -> None:
+    SQLModel.metadata.create_all(engine)
+    body = "正文" * (body_kb * 1024 // 6)  # 每个汉字 UTF-8 编码 3 字节
+    with engine.begin() as conn:
+        conn.execute(delete(Post))
+        conn.execute(delete(User))
+        conn.execute(
+            User.__table__.insert(),
+            [{"id": 1, "username": "bench", "email": "bench@example.com",
+              "hashed_password": "x", "is_active": True, "is_admin": False}],
+        )
+        for offset in range(0, posts, 1000):
+            conn.execute(
+                Post.__table__.insert(),
+                [
+                    {"title": f"post {i}", "content_markdown": body, "content_html": body,
+                     "published": True, "author_id": 1}
+                    for i in range(offset, min(offset + 1000, posts))
+                ],
+            )
+
+
+async def measure(posts: int, fmt: str, batch_size: int) -> None:
+    """消费整个导出流（丢弃输出），统计耗时、输出大小和内存峰值"""
+    size = 0
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        async for chunk in export_posts_service(fmt, batch_size=batch_size):
+            size += len(chunk)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    finally:
+        await async_engine.dispose()
+    print(f"{posts:>7} 篇 {fmt:<6} 耗时={elapsed:7.2f}s 输出={size / 1024 / 1024:8.1f}MB "
+          f"内存峰值={peak:6.2f}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--body-kb", type=int, default=10, help="每篇正文的大小（KB）")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    for posts in args.posts:
+        prepare_database(posts, args.body_kb)
+        for fmt in ("ndjson", "csv"):
+            asyncio.run(measure(posts, fmt, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
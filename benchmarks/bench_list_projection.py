@@ -0,0 +1,92 @@
+"""文章列表基准：加载完整 ORM 对象 vs 只查询 PostBrief 需要的列
+
+正文较大时，完整对象会把 content_markdown 和 content_html 一并读出并放入身份映射。
+
+用法：
+    poetry run python -m benchmarks.bench_list_projection --posts 1000 --body-kb 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+# 基准使用独立的临时数据库，需在导入应用之前设置
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-proj-')}/bench.db"
+os.environ["DEBUG"] = "false"
+
+from sqlmodel import SQLModel, select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.core.database import async_engine, engine  # noqa: E402
+from app.core.pagination import fetch_page  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from app.schemas.post import PostBrief  # noqa: E402
+from app.services.post_service import POST_BRIEF_COLUMNS  # noqa: E402
+
+
+def prepare_database(posts: int, body_kb: int) -> None:
+    SQLModel.metadata.create_all(engine)
+    body = "正文" * (body_kb * 1024 // 6)  # 每个汉字 UTF-8 编码 3 字节
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [{"id": 1, "username": "bench", "email": "bench@example.com",
+              "hashed_password": "x", "is_active": True, "is_admin": False}],
+        )
+        for offset in range(0, posts, 200):
+            conn.execute(
+                Post.__table__.insert(),
+                [
+                    {"title": f"post {i}", "summary": "摘要", "content_markdown": body,
+                     "content_html": f"<p>{body}</p>", "published": True, "author_id": 1}
+                    for i in range(offset, min(offset + 200, posts))
+                ],
+            )
+
+
+async def measure(name: str, query, repeat: int, limit: int) -> None:
+    """逐页读取并序列化为 PostBrief，统计耗时和内存峰值"""
+    async def read_page(session: AsyncSession) -> list:
+        rows, _ = await fetch_page(session, query, Post, 0, limit)
+        return [PostBrief.model_validate(row, from_attributes=True) for row in rows]
+
+    latencies = []
+    try:
+        async with AsyncSession(async_engine) as session:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                briefs = await read_page(session)
+                latencies.append((time.perf_counter() - started) * 1000)
+                session.expunge_all()
+            # 内存单独测一次，tracemalloc 会拖慢执行
+            tracemalloc.start()
+            await read_page(session)
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+    finally:
+        await async_engine.dispose()
+    assert len(briefs) == limit
+    print(f"{name:<12} p50={statistics.median(latencies):8.2f}ms "
+          f"max={max(latencies):8.2f}ms 内存峰值={peak:7.2f}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--body-kb", type=int, default=50, help="每篇正文的大小（KB）")
+    parser.add_argument("--limit", type=int, default=100, help="每页条数")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"写入 {args.posts} 篇 {args.body_kb}KB 的文章...")
+    prepare_database(args.posts, args.body_kb)
+    asyncio.run(measure("ORM 对象", select(Post), args.repeat, args.limit))
+    asyncio.run(measure("列投影", select(*POST_BRIEF_COLUMNS), args.repeat, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""登录风暴期间其他接口的延迟：bcrypt 在事件循环内执行 vs 交给哈希执行器
+
+用法：
+    poetry run python -m benchmarks.bench_login_storm --logins 8 --seconds 10
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+# 基准使用独立的临时数据库，需在导入应用之前设置
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-login-')}/bench.db"
+os.environ["DEBUG"] = "false"
+
+import httpx  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+from app.core import hashing  # noqa: E402
+from app.core.database import async_engine, engine  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "Password123!"
+
+
+class InlineHasher(hashing.PasswordHasher):
+    """对照组：直接在事件循环中计算哈希（改造前的行为）"""
+
+    async def run(self, func, *args):
+        return func(*args)
+
+
+def prepare_database() -> None:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(username="storm", email=EMAIL,
+                         hashed_password=get_password_hash(PASSWORD)))
+        session.commit()
+
+
+async def login_storm(client: httpx.AsyncClient, deadline: float, counter: list) -> None:
+    while time.perf_counter() < deadline:
+        resp = await client.post(
+            "/api/auth/token", data={"username": EMAIL, "password": PASSWORD}
+        )
+        counter.append(resp.status_code)
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, latencies: list) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/api/tags/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def run_scenario(name: str, logins: int, args) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 预热：启动哈希子进程、建立数据库连接
+        await client.post("/api/auth/token", data={"username": EMAIL, "password": PASSWORD})
+        latencies, statuses = [], []
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            probe(client, deadline, latencies),
+            *(login_storm(client, deadline, statuses) for _ in range(logins)),
+        )
+    await async_engine.dispose()
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    print(
+        f"{name:<18} logins/s={len(statuses) / args.seconds:6.1f} "
+        f"probe n={len(latencies):5d} p50={q[49]:8.2f}ms p99={q[98]:8.2f}ms "
+        f"max={max(latencies):8.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=8, help="并发登录客户端数")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2, help="哈希进程数")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    prepare_database()
+
+    asyncio.run(run_scenario("idle", 0, args))
+    hashing.password_hasher.shutdown()
+
+    hashing.password_hasher = InlineHasher(0, args.logins + 1)
+    asyncio.run(run_scenario("storm/inline", args.logins, args))
+
+    hashing.password_hasher = hashing.PasswordHasher(args.workers, args.logins + 1)
+    try:
+        asyncio.run(run_scenario("storm/process-pool", args.logins, args))
+    finally:
+        hashing.password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
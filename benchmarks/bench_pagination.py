@@ -0,0 +1,89 @@
+"""文章列表分页基准：OFFSET 分页 vs 游标（键集）分页，第 1 页与深页对比
+
+用法：
+    poetry run python -m benchmarks.bench_pagination --posts 110000 --page 10000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 基准使用独立的临时数据库，需在导入应用之前设置
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-page-')}/bench.db"
+os.environ["DEBUG"] = "false"
+
+from sqlmodel import SQLModel, select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.core.database import async_engine, engine  # noqa: E402
+from app.core.pagination import encode_cursor, fetch_page  # noqa: E402
+from app.models import Post, User  # noqa: E402
+
+
+def prepare_database(posts: int) -> None:
+    SQLModel.metadata.create_all(engine)
+    start = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [{"id": 1, "username": "bench", "email": "bench@example.com",
+              "hashed_password": "x", "is_active": True, "is_admin": False}],
+        )
+        for offset in range(0, posts, 10000):
+            conn.execute(
+                Post.__table__.insert(),
+                [
+                    {"title": f"post {i}", "content_markdown": "x" * 500, "content_html": "x" * 500,
+                     "published": True, "author_id": 1, "created_at": start + timedelta(minutes=i)}
+                    for i in range(offset, min(offset + 10000, posts))
+                ],
+            )
+
+
+async def measure(name: str, repeat: int, limit: int, skip: int = 0, cursor=None) -> None:
+    latencies = []
+    try:
+        async with AsyncSession(async_engine) as session:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                rows, _ = await fetch_page(session, select(Post), Post, skip, limit, cursor)
+                latencies.append((time.perf_counter() - started) * 1000)
+                session.expunge_all()
+    finally:
+        await async_engine.dispose()
+    assert len(rows) == limit
+    print(f"{name:<22} p50={statistics.median(latencies):8.2f}ms max={max(latencies):8.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=110000)
+    parser.add_argument("--page", type=int, default=10000, help="深页页码")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"写入 {args.posts} 篇文章...")
+    prepare_database(args.posts)
+    skip = (args.page - 1) * args.limit
+    # 深页的游标就是上一页最后一行的 (created_at, id)
+    with engine.connect() as conn:
+        last = conn.execute(
+            select(Post.created_at, Post.id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .offset(skip - 1)
+            .limit(1)
+        ).one()
+    cursor = encode_cursor(last.created_at, last.id)
+
+    asyncio.run(measure("offset page 1", args.repeat, args.limit))
+    asyncio.run(measure(f"offset page {args.page}", args.repeat, args.limit, skip=skip))
+    asyncio.run(measure(f"cursor page {args.page}", args.repeat, args.limit, cursor=cursor))
+
+
+if __name__ == "__main__":
+    main()
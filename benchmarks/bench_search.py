@@ -0,0 +1,117 @@
+"""文章搜索基准：LIKE 全表扫描 vs FTS5 全文索引
+
+用法：
+    poetry run python -m benchmarks.bench_search --posts 100000 --queries 50
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# 基准使用独立的临时数据库，需在导入应用之前设置
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-search-')}/bench.db"
+os.environ["DEBUG"] = "false"
+
+from sqlmodel import SQLModel  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import async_engine, engine  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from app.services.post_service import get_posts_service  # noqa: E402
+from app.services.search_service import rebuild_search_index  # noqa: E402
+
+
+class Corpus:
+    """由常用汉字组成的 2~3 字词表（混入少量英文词），词频近似齐夫分布"""
+
+    def __init__(self, rng: random.Random, size: int):
+        words = {
+            "".join(chr(rng.randint(0x4E00, 0x62FF)) for _ in range(rng.choice((2, 2, 3))))
+            for _ in range(size)
+        }
+        self.words = sorted(words) + ["FastAPI", "SQLite", "Python", "Docker", "latency"]
+        rng.shuffle(self.words)
+        # 排在前面的词更常见
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(self.words))))
+
+    def text(self, rng: random.Random, words: int) -> str:
+        picks = rng.choices(self.words, cum_weights=self.cum_weights, k=words)
+        return "".join(word + rng.choice(["，", "。", " ", ""]) for word in picks)
+
+
+def prepare_database(posts: int, body_words: int, corpus: Corpus) -> float:
+    """建表、写入测试数据并建立全文索引，返回建索引耗时"""
+    rng = random.Random(42)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [{"id": 1, "username": "bench", "email": "bench@example.com",
+              "hashed_password": "x", "is_active": True, "is_admin": False}],
+        )
+        for start in range(0, posts, 5000):
+            conn.execute(
+                Post.__table__.insert(),
+                [
+                    {"title": corpus.text(rng, 4),
+                     "content_markdown": corpus.text(rng, body_words),
+                     "content_html": "", "published": True, "author_id": 1}
+                    for _ in range(start, min(start + 5000, posts))
+                ],
+            )
+    with engine.begin() as conn:
+        _, elapsed = rebuild_search_index(conn)
+    return elapsed
+
+
+async def run_queries(name: str, queries: list) -> None:
+    latencies = []
+    totals = {}
+    try:
+        async with AsyncSession(async_engine) as session:
+            for query in queries:
+                start = time.perf_counter()
+                page = await get_posts_service(session, limit=10, search=query)
+                latencies.append((time.perf_counter() - start) * 1000)
+                totals[query] = page.total
+    finally:
+        await async_engine.dispose()
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    hits = statistics.median(totals.values())
+    print(f"{name:<6} n={len(latencies):4d} p50={q[49]:9.2f}ms p99={q[98]:9.2f}ms "
+          f"max={max(latencies):9.2f}ms 命中数中位数={hits:.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--body-words", type=int, default=200, help="每篇正文的词数")
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--vocabulary", type=int, default=20000, help="词表大小")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    corpus = Corpus(rng, args.vocabulary)
+    print(f"写入 {args.posts} 篇文章...")
+    elapsed = prepare_database(args.posts, args.body_words, corpus)
+    print(f"全文索引建立耗时 {elapsed:.1f} 秒")
+
+    # 查询词一半取自常见词，一半取自少见词
+    queries = [
+        rng.choice(corpus.words[:50] if i % 2 else corpus.words[50:])
+        for i in range(args.queries)
+    ]
+    settings.SEARCH_FTS_ENABLED = False
+    asyncio.run(run_queries("LIKE", queries))
+    settings.SEARCH_FTS_ENABLED = True
+    asyncio.run(run_queries("FTS5", queries))
+
+
+if __name__ == "__main__":
+    main()
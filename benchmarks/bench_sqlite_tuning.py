@@ -0,0 +1,128 @@
+"""SQLite 混合读写吞吐基准：默认回滚日志模式 vs WAL + PRAGMA + 单写通道
+
+用法：
+    poetry run python -m benchmarks.bench_sqlite_tuning --workers 32 --seconds 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# 导入应用时会按配置创建引擎，需在导入之前指向临时数据库并关闭 DEBUG（SQL 回显）
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-sqlite-')}/app.db"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlmodel import SQLModel, create_engine, select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.core.database import (RoutingSession,  # noqa: E402
+                               create_writer_lane_engine,
+                               install_sqlite_pragmas,
+                               sqlite_pragmas_from_settings)
+from app.models import Comment, Post, User  # noqa: E402
+
+
+def prepare_database(path: str, posts: int) -> None:
+    """建表并写入测试数据"""
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [{"id": 1, "username": "bench", "email": "bench@example.com",
+              "hashed_password": "x", "is_active": True, "is_admin": False}],
+        )
+        conn.execute(
+            Post.__table__.insert(),
+            [
+                {"title": f"post {i}", "content_markdown": "x" * 2000,
+                 "content_html": "x" * 2000, "published": True, "author_id": 1}
+                for i in range(posts)
+            ],
+        )
+    engine.dispose()
+
+
+def build_session_maker(path: str, tuned: bool):
+    """构建会话工厂；tuned=True 时启用 PRAGMA 配置和单写通道"""
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(url)
+    writer = None
+    if tuned:
+        install_sqlite_pragmas(engine.sync_engine, sqlite_pragmas_from_settings())
+        writer = create_writer_lane_engine(url, timeout=60)
+    maker = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        writer_bind=writer.sync_engine if writer else None,
+        expire_on_commit=False,
+    )
+    return maker, [e for e in (engine, writer) if e is not None]
+
+
+async def worker(maker, deadline: float, write_ratio: float, stats: dict) -> None:
+    while time.perf_counter() < deadline:
+        is_write = random.random() < write_ratio
+        start = time.perf_counter()
+        try:
+            async with maker() as session:
+                if is_write:
+                    session.add(Comment(content="bench", author_id=1,
+                                        post_id=random.randint(1, 100)))
+                    await session.commit()
+                else:
+                    query = select(Post).order_by(Post.created_at.desc()).limit(20)
+                    (await session.exec(query)).all()
+        except Exception as e:  # noqa: BLE001
+            stats["errors"].append(type(e).__name__)
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        stats["writes" if is_write else "reads"].append(elapsed)
+
+
+async def run_profile(name: str, tuned: bool, args) -> None:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-sqlite-"), "bench.db")
+    prepare_database(path, args.posts)
+    maker, engines = build_session_maker(path, tuned)
+    stats = {"reads": [], "writes": [], "errors": []}
+    deadline = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        *(worker(maker, deadline, args.write_ratio, stats) for _ in range(args.workers))
+    )
+    for engine in engines:
+        await engine.dispose()
+
+    total = len(stats["reads"]) + len(stats["writes"])
+
+    def p(values, q):
+        return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else 0.0
+
+    print(
+        f"{name:<10} ops/s={total / args.seconds:8.1f} "
+        f"reads={len(stats['reads']):6d} writes={len(stats['writes']):6d} "
+        f"errors={len(stats['errors']):4d} "
+        f"read p50={p(stats['reads'], 50):7.2f}ms p99={p(stats['reads'], 99):7.2f}ms "
+        f"write p99={p(stats['writes'], 99):7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    asyncio.run(run_profile("baseline", False, args))
+    asyncio.run(run_profile("tuned", True, args))
+
+
+if __name__ == "__main__":
+    main()
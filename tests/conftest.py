@@ -1,23 +1,46 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
-from sqlmodel.pool import StaticPool
+import os
+import tempfile
 
-from app.core.database import get_session
-from app.core.security import get_password_hash
-from app.main import app
-from app.models.user import User
+# 测试使用独立的临时数据库文件，需在导入应用配置之前设置
+_test_db_dir = tempfile.mkdtemp(prefix="blog-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_test_db_dir}/test.db"
+os.environ["DEBUG"] = "false"
+# 每个测试客户端都会在关闭时停止哈希和渲染执行器，测试中使用线程避免反复启动子进程
+os.environ["HASH_WORKERS"] = "0"
+os.environ["RENDER_WORKERS"] = "0"
+# 测试使用最低的 bcrypt 成本，避免大部分时间耗在哈希上
+os.environ["PASSWORD_HASH_ROUNDS"] = "4"
+# 测试中不启动发件箱发送任务，由用例直接调用 deliver_outbox
+os.environ["EMAIL_OUTBOX_POLL_INTERVAL"] = "0"
 
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
 
-# 使用内存数据库进行测试
+from app.core import database  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.count_cache import count_cache  # noqa: E402
+from app.core.principal import principal_cache  # noqa: E402
+from app.core.renderer import render_cache  # noqa: E402
+from app.core.revocation import revocation_list  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+# 使用临时文件数据库进行测试（同步与异步引擎共用同一文件）
 @pytest.fixture(name="engine")
 def engine_fixture():
-    """创建测试用的SQLite内存数据库引擎"""
-    engine = create_engine(
-        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
-    )
+    """创建测试用的SQLite数据库表，测试结束后清理"""
+    engine = database.engine
     SQLModel.metadata.create_all(engine)
-    return engine
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+    # 每个测试重建数据库后用户ID会复用，清空令牌缓存和吊销列表；渲染缓存计数和列表总数缓存也重新开始
+    principal_cache.clear()
+    count_cache.clear()
+    revocation_list.clear()
+    render_cache.clear()
 
 
 @pytest.fixture(name="session")
@@ -27,16 +50,12 @@ def session_fixture(engine):
         yield session
 
 
-@pytest.fixture(name="client")
-def client_fixture(session):
-    """创建测试客户端，覆盖数据库会话依赖"""
-
-    def get_session_override():
-        return session
-
-    app.dependency_overrides[get_session] = get_session_override
-    client = TestClient(app)
-    yield client
+@pytest.fixture(name="client", params=["async", "sync"])
+def client_fixture(request, engine, monkeypatch):
+    """创建测试客户端，分别覆盖异步与同步两种数据库会话模式"""
+    monkeypatch.setattr(settings, "DB_ASYNC", request.param == "async")
+    with TestClient(app) as client:
+        yield client
     app.dependency_overrides.clear()
 
 
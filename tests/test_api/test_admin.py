@@ -0,0 +1,207 @@
+import pytest
+from fastapi import status
+
+
+def get_auth_headers(client, email, password):
+    resp = client.post("/api/auth/token", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest.fixture
+def admin(client):
+    admin_data = {
+        "username": "pooladmin",
+        "email": "pooladmin@example.com",
+        "password": "Password123!",
+        "is_active": True,
+        "is_admin": True,
+    }
+    client.post("/api/auth/register", json=admin_data)
+    return admin_data
+
+
+def test_pool_status(client, admin):
+    """测试管理员查看连接池状态"""
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    resp = client.get("/api/admin/db/pool", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    pools = resp.json()["pools"]
+    assert {"sync", "primary"} <= set(pools)
+    for pool in pools.values():
+        assert pool["pool_class"].startswith("Instrumented")
+        assert pool["size"] == 5
+        assert pool["timeouts"] == 0
+        assert sum(pool["histogram"].values()) == pool["checkouts"]
+    # 注册和登录已经从当前模式对应的连接池取过连接
+    assert pools["primary"]["checkouts"] + pools["sync"]["checkouts"] > 0
+
+
+def test_pool_status_forbidden(client, test_user):
+    """测试普通用户无权查看连接池状态"""
+    headers = get_auth_headers(client, test_user.email, "password")
+    resp = client.get("/api/admin/db/pool", headers=headers)
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_render_cache_status(client, admin):
+    """测试相同内容的文章只渲染一次，管理员可查看渲染缓存命中统计"""
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    for title in ("First", "Second"):
+        post = {"title": title, "content_markdown": "# Same body", "tag_ids": []}
+        assert client.post("/api/posts/", json=post, headers=headers).status_code == 201
+    resp = client.get("/api/admin/render-cache", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    data = resp.json()
+    assert (data["hits"], data["misses"]) == (1, 1)
+    assert data["hit_rate"] == 0.5
+
+
+def test_import_posts(client, admin, monkeypatch):
+    """测试 NDJSON 批量导入：按名称解析标签，出错的行单独报告"""
+    import json
+
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "POST_IMPORT_CHUNK_SIZE", 2)
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    existing_tag = client.post("/api/tags/", json={"name": "旧标签"}, headers=headers).json()["id"]
+    lines = [
+        {"title": "导入文章一", "content_markdown": "# 一", "published": True, "tags": ["旧标签", "新标签"]},
+        "not json",
+        {"title": "短", "content_markdown": "标题太短"},
+        {"title": "导入文章二", "content_markdown": "二", "tag_ids": [existing_tag],
+         "created_at": "2019-05-01T08:00:00+08:00"},
+        {"title": "导入文章三", "content_markdown": "三", "category_id": 999},
+        {"title": "导入文章四", "content_markdown": "四", "tags": ["新标签"]},
+    ]
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n\n"
+    resp = client.post("/api/admin/posts/import", content=body.encode("utf-8"), headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    result = resp.json()
+    assert (result["imported"], result["failed"]) == (3, 3)
+    assert [error["line"] for error in result["errors"]] == [2, 3, 5]
+    assert "title" in result["errors"][1]["error"]
+
+    posts = client.get("/api/posts/", params={"limit": 10}).json()["posts"]
+    assert [post["title"] for post in posts] == ["导入文章四", "导入文章一", "导入文章二"]
+    assert posts[2]["created_at"].startswith("2019-05-01T00:00:00")
+    first = client.get(f"/api/posts/{posts[1]['id']}").json()
+    assert first["content_html"] == "<h1>一</h1>"
+    assert {tag["name"] for tag in first["tags"]} == {"旧标签", "新标签"}
+    assert client.get("/api/tags/").json()["total"] == 2
+    assert client.get("/api/posts/", params={"search": "导入"}).json()["total"] == 3
+
+
+def test_import_rejects_overlong_lines(client, admin, monkeypatch):
+    """测试超长的行单独报错，后面的行照常导入"""
+    import json
+
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "RENDER_MAX_SIZE", 1024)
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    long_line = json.dumps({"title": "超长的行", "content_markdown": "x" * 100 * 1024})
+    short_line = json.dumps({"title": "正常的行", "content_markdown": "正文"})
+    body = f"{long_line}\n{short_line}\n".encode("utf-8")
+    result = client.post("/api/admin/posts/import", content=body, headers=headers).json()
+    assert (result["imported"], result["failed"]) == (1, 1)
+    assert result["errors"][0]["line"] == 1
+    assert "行长度超过" in result["errors"][0]["error"]
+
+
+def test_import_posts_forbidden(client, test_user):
+    """测试普通用户不能批量导入"""
+    headers = get_auth_headers(client, test_user.email, "password")
+    resp = client.post("/api/admin/posts/import", content=b"{}", headers=headers)
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_export_posts(client, admin):
+    """测试按列表的筛选条件导出文章，NDJSON 可以重新导入"""
+    import csv
+    import io
+    import json
+
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    lines = [
+        {"title": "导出文章一", "content_markdown": "一", "published": True, "tags": ["导出"]},
+        {"title": "导出文章二", "content_markdown": "二", "summary": "摘要, 带逗号"},
+        {"title": "导出文章三", "content_markdown": "三", "published": True},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+    assert client.post("/api/admin/posts/import", content=body, headers=headers).json()["imported"] == 3
+
+    resp = client.get("/api/admin/posts/export", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="posts.ndjson"' in resp.headers["content-disposition"]
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["title"] for row in rows] == ["导出文章三", "导出文章二", "导出文章一"]
+    tag_id = rows[2]["tag_ids"][0]
+    assert rows[0]["tag_ids"] == []
+
+    published = client.get("/api/admin/posts/export", params={"published": True}, headers=headers)
+    assert [json.loads(line)["title"] for line in published.text.splitlines()] == ["导出文章三", "导出文章一"]
+    tagged = client.get("/api/admin/posts/export", params={"tagId": tag_id}, headers=headers)
+    assert [json.loads(line)["title"] for line in tagged.text.splitlines()] == ["导出文章一"]
+
+    resp = client.get("/api/admin/posts/export", params={"format": "csv", "search": "导出文章二"}, headers=headers)
+    assert resp.headers["content-type"] == "text/csv; charset=utf-8"
+    records = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(records) == 1
+    assert records[0]["summary"] == "摘要, 带逗号"
+    assert records[0]["published"] == "false"
+
+    # 导出的行去掉主键后直接导入
+    resp = client.post("/api/admin/posts/import", content=published.content, headers=headers)
+    assert resp.json()["imported"] == 2
+    assert client.get("/api/posts/", params={"tagId": tag_id}).json()["total"] == 2
+
+
+def test_export_comments(client, admin):
+    """测试按文章导出评论，CSV 只有表头时也是合法的文件"""
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    post_id = client.post("/api/posts/", json={"title": "评论导出", "content_markdown": "正文"}, headers=headers).json()["id"]
+    for content in ("第一条", "第二条"):
+        client.post("/api/comments/", json={"content": content, "post_id": post_id}, headers=headers)
+
+    resp = client.get("/api/admin/comments/export", params={"postId": post_id}, headers=headers)
+    lines = resp.text.splitlines()
+    assert len(lines) == 2
+    assert '"content": "第二条"' in lines[0]
+
+    resp = client.get("/api/admin/comments/export", params={"postId": post_id + 1, "format": "csv"}, headers=headers)
+    assert resp.text.strip() == "id,content,post_id,author_id,created_at,updated_at"
+    resp = client.get("/api/admin/comments/export", params={"format": "xml"}, headers=headers)
+    assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_export_streams_in_batches(client, admin):
+    """测试导出按批从游标读取，每批输出一个数据块"""
+    import asyncio
+    import json
+
+    from app.core.database import async_engine
+    from app.services.export_service import export_posts_service
+
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    body = "\n".join(
+        json.dumps({"title": f"分批导出{i}", "content_markdown": "正文"}) for i in range(5)
+    ).encode("utf-8")
+    client.post("/api/admin/posts/import", content=body, headers=headers)
+
+    async def collect():
+        try:
+            return [chunk async for chunk in export_posts_service(batch_size=2)]
+        finally:
+            await async_engine.dispose()
+
+    chunks = asyncio.run(collect())
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+
+
+def test_export_forbidden(client, test_user):
+    """测试普通用户不能导出"""
+    headers = get_auth_headers(client, test_user.email, "password")
+    for url in ("/api/admin/posts/export", "/api/admin/comments/export"):
+        assert client.get(url, headers=headers).status_code == status.HTTP_403_FORBIDDEN
@@ -1,4 +1,9 @@
+from datetime import datetime
+
 from fastapi import status
+from sqlmodel import select
+
+from app.models import RefreshToken
 
 def test_register_user(client):
     """测试用户注册功能"""
@@ -110,3 +115,219 @@ def test_login_inactive_user(client, session, test_user):
     # 验证响应为禁止访问
     assert response.status_code == status.HTTP_403_FORBIDDEN
     assert "用户已被禁用" in response.json()["detail"]
+
+
+def test_invalid_token_does_not_checkout_connection(client):
+    """测试认证失败的请求不会从连接池取连接"""
+    from app.core.database import named_engines
+
+    def checkouts():
+        return sum(e.pool.stats.checkouts for e in named_engines().values())
+
+    before = checkouts()
+    response = client.post(
+        "/api/tags/",
+        json={"name": "nope"},
+        headers={"Authorization": "Bearer invalid-token"},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert checkouts() == before
+
+
+def test_cached_principal_skips_user_query(client, test_user):
+    """测试令牌缓存命中后认证不再查询数据库"""
+    token = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = client.get("/api/users/me", headers=headers)
+    second = client.get("/api/users/me", headers=headers)
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    assert int(second.headers["X-DB-Queries"]) == int(first.headers["X-DB-Queries"]) - 1
+
+
+def test_disabled_user_token_rejected_immediately(client, test_user):
+    """测试管理员禁用用户后缓存立即失效"""
+    admin_data = {
+        "username": "cacheadmin",
+        "email": "cacheadmin@example.com",
+        "password": "Password123!",
+        "is_admin": True,
+    }
+    client.post("/api/auth/register", json=admin_data)
+    admin_token = client.post(
+        "/api/auth/token",
+        data={"username": admin_data["email"], "password": admin_data["password"]},
+    ).json()["access_token"]
+    user_token = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    ).json()["access_token"]
+    user_headers = {"Authorization": f"Bearer {user_token}"}
+    assert client.get("/api/dashboard/summary", headers=user_headers).status_code == 200
+
+    resp = client.put(
+        f"/api/users/{test_user.id}",
+        json={"is_active": False},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    # 禁用用户会吊销其已签发的令牌
+    resp = client.get("/api/dashboard/summary", headers=user_headers)
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_rejected_when_hash_queue_full(client, test_user, monkeypatch):
+    """测试密码哈希排队已满时返回 503"""
+    from app.core.hashing import password_hasher
+
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_outdated_hash(client, session, test_user, monkeypatch):
+    """测试登录时把低于当前成本的哈希在后台重新哈希"""
+    from passlib.context import CryptContext
+
+    from app.core import security
+
+    stronger = CryptContext(
+        schemes=["bcrypt"], bcrypt__ident="2b",
+        bcrypt__default_rounds=5, bcrypt__min_rounds=5,
+    )
+    monkeypatch.setattr(security, "pwd_context", stronger)
+    assert test_user.hashed_password.startswith("$2b$04$")
+
+    response = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    session.refresh(test_user)
+    assert test_user.hashed_password.startswith("$2b$05$")
+    # 新哈希仍然可以登录
+    response = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def login(client, email, password):
+    response = client.post("/api/auth/token", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_logout_revokes_only_current_token(client, test_user):
+    """测试注销只吊销当前令牌"""
+    first = login(client, test_user.email, "password")
+    second = login(client, test_user.email, "password")
+    assert client.get("/api/users/me", headers=first).status_code == status.HTTP_200_OK
+
+    response = client.post("/api/auth/logout", headers=first)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/api/users/me", headers=first).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/api/users/me", headers=second).status_code == status.HTTP_200_OK
+
+
+def test_change_password_revokes_existing_tokens(client, test_user):
+    """测试修改密码后之前签发的令牌全部失效"""
+    old = login(client, test_user.email, "password")
+    other = login(client, test_user.email, "password")
+    response = client.post(
+        "/api/auth/change-password",
+        json={"current_password": "password", "new_password": "NewPassword123!"},
+        headers=old,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/api/users/me", headers=old).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/api/users/me", headers=other).status_code == status.HTTP_401_UNAUTHORIZED
+
+    new = login(client, test_user.email, "NewPassword123!")
+    assert client.get("/api/users/me", headers=new).status_code == status.HTTP_200_OK
+
+
+def refresh(client, refresh_token):
+    return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_issues_new_pair_without_password_check(client, test_user, monkeypatch):
+    """测试刷新令牌换取新的令牌对，不经过 bcrypt"""
+    tokens = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    ).json()
+    assert tokens["refresh_token"]
+
+    async def fail(*args):
+        raise AssertionError("刷新令牌不应校验密码")
+
+    monkeypatch.setattr("app.services.auth_service.verify_password_async", fail)
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["refresh_token"] != tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert client.get("/api/users/me", headers=headers).status_code == status.HTTP_200_OK
+
+
+def test_refresh_token_reuse_revokes_family(client, test_user):
+    """测试已轮换的刷新令牌再次使用时吊销整个登录会话"""
+    tokens = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    ).json()
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    # 轮换出的新令牌随之失效
+    assert refresh(client, rotated["refresh_token"]).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_logout_revokes_refresh_token(client, test_user):
+    """测试注销后刷新令牌失效；提供刷新令牌时只吊销它所在的登录会话"""
+    def token_pair():
+        return client.post(
+            "/api/auth/token", data={"username": test_user.email, "password": "password"}
+        ).json()
+
+    first, second = token_pair(), token_pair()
+    response = client.post(
+        "/api/auth/logout",
+        json={"refresh_token": first["refresh_token"]},
+        headers={"Authorization": f"Bearer {first['access_token']}"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert refresh(client, first["refresh_token"]).status_code == status.HTTP_401_UNAUTHORIZED
+    second = refresh(client, second["refresh_token"]).json()
+
+    # 不带请求体时无法确定登录会话，吊销该用户的全部刷新令牌
+    client.post("/api/auth/logout", headers={"Authorization": f"Bearer {second['access_token']}"})
+    assert refresh(client, second["refresh_token"]).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_refresh_token_rejected_after_password_change(client, test_user):
+    """测试修改密码后刷新令牌失效"""
+    tokens = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    ).json()
+    client.post(
+        "/api/auth/change-password",
+        json={"current_password": "password", "new_password": "NewPassword123!"},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert refresh(client, tokens["refresh_token"]).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_expired_refresh_token_rejected(client, session, test_user):
+    """测试过期的刷新令牌被拒绝"""
+    tokens = client.post(
+        "/api/auth/token", data={"username": test_user.email, "password": "password"}
+    ).json()
+    token = session.exec(select(RefreshToken)).one()
+    token.expires_at = datetime(2000, 1, 1)
+    session.add(token)
+    session.commit()
+    assert refresh(client, tokens["refresh_token"]).status_code == status.HTTP_401_UNAUTHORIZED
+    assert refresh(client, "not-a-token").status_code == status.HTTP_401_UNAUTHORIZED
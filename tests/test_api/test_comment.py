@@ -73,4 +73,20 @@ def test_delete_comment(client, user, post_id):
 def test_comment_unauthorized(client, post_id):
     comment_data = {"content": "No Auth", "post_id": post_id}
     resp = client.post("/api/comments/", json=comment_data)
-    assert resp.status_code == status.HTTP_401_UNAUTHORIZED 
\ No newline at end of file
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_comment_list_query_count(client, user, post_id):
+    headers = get_auth_headers(client, user["email"], user["password"])
+    other = {"username": "commenter2", "email": "commenter2@example.com", "password": "Password123!"}
+    client.post("/api/auth/register", json=other)
+    other_headers = get_auth_headers(client, other["email"], other["password"])
+    for i, h in enumerate([headers, other_headers, headers, other_headers]):
+        client.post("/api/comments/", json={"content": f"评论{i}", "post_id": post_id}, headers=h)
+
+    # 作者随评论一条 JOIN 查询取回，不随评论数或作者数增加
+    resp = client.get("/api/comments/", params={"postId": post_id, "with_total": False})
+    assert {c["author"]["username"] for c in resp.json()["comments"]} == {"commentuser", "commenter2"}
+    assert int(resp.headers["X-DB-Queries"]) == 1
+    resp = client.get(f"/api/comments/{resp.json()['comments'][0]['id']}")
+    assert int(resp.headers["X-DB-Queries"]) == 1
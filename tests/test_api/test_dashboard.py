@@ -0,0 +1,48 @@
+from fastapi import status
+
+
+def get_auth_headers(client, email, password):
+    resp = client.post("/api/auth/token", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_dashboard_summary(client, test_user):
+    """测试仪表盘摘要统计"""
+    headers = get_auth_headers(client, test_user.email, "password")
+    post_data = {"title": "Dashboard Post", "content_markdown": "content", "published": True}
+    post_id = client.post("/api/posts/", json=post_data, headers=headers).json()["id"]
+    client.post("/api/comments/", json={"content": "hi", "post_id": post_id}, headers=headers)
+
+    resp = client.get("/api/dashboard/summary", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    data = resp.json()
+    assert data["total_posts"] == 1
+    assert data["total_comments"] == 1
+    assert data["total_users"] == 1
+    assert data["recent_posts"][0]["id"] == post_id
+    assert data["recent_comments"][0]["author"]["username"] == test_user.username
+
+
+def test_dashboard_unauthorized(client):
+    """测试未登录访问仪表盘"""
+    resp = client.get("/api/dashboard/summary")
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_db_profile_headers(client, test_user):
+    """测试响应头带有 SQL 统计"""
+    headers = get_auth_headers(client, test_user.email, "password")
+    resp = client.get("/api/dashboard/summary", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    # 认证查询用户 + 5 次计数 + 最近文章 + 最近评论（作者随 JOIN 取回）
+    assert int(resp.headers["X-DB-Queries"]) >= 8
+    assert resp.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_db_profile_sampling_disabled(client, monkeypatch):
+    """测试采样比例为 0 时不统计"""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DB_PROFILER_SAMPLE_RATE", 0.0)
+    resp = client.get("/api/tags/")
+    assert "X-DB-Queries" not in resp.headers
@@ -1,10 +1,31 @@
+import asyncio
 from datetime import datetime, timedelta, UTC
 
 from fastapi import status
 from sqlmodel import select
 
-from app.core.security import generate_reset_token
-from app.models.user import User
+from app.core.database import async_engine, session_scope
+from app.core.security import generate_reset_token, hash_token
+from app.models.password_reset import PasswordResetToken
+from app.services.auth_service import purge_expired_tokens
+
+
+def utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def create_reset_token(session, user, expires_in: timedelta) -> str:
+    """为用户写入一条重置令牌记录，返回令牌明文"""
+    reset_token = generate_reset_token()
+    session.add(
+        PasswordResetToken(
+            user_id=user.id,
+            token_hash=hash_token(reset_token),
+            expires_at=utcnow() + expires_in,
+        )
+    )
+    session.commit()
+    return reset_token
 
 
 def test_request_password_reset_existing_user(client, test_user, session):
@@ -21,11 +42,33 @@ def test_request_password_reset_existing_user(client, test_user, session):
     assert "message" in data
     assert "token" in data  # 注意：实际应用中不应直接返回令牌
 
-    # 验证用户记录更新
-    updated_user = session.exec(select(User).where(User.id == test_user.id)).first()
-    assert updated_user.reset_token is not None
-    assert updated_user.reset_token_expires is not None
-    assert updated_user.reset_token_expires > datetime.now(UTC)
+    # 验证只保存了令牌摘要
+    tokens = session.exec(
+        select(PasswordResetToken).where(PasswordResetToken.user_id == test_user.id)
+    ).all()
+    assert len(tokens) == 1
+    assert tokens[0].token_hash == hash_token(data["token"])
+    assert tokens[0].expires_at > utcnow()
+
+
+def test_multiple_outstanding_reset_tokens(client, test_user, session):
+    """测试同一用户可以同时持有多个重置令牌，任一令牌重置后全部作废"""
+    first = client.post(
+        "/api/auth/password-reset-request", json={"email": test_user.email}
+    ).json()["token"]
+    second = client.post(
+        "/api/auth/password-reset-request", json={"email": test_user.email}
+    ).json()["token"]
+    assert first != second
+
+    response = client.post(
+        "/api/auth/password-reset", json={"token": first, "new_password": "NewPassword123!"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = client.post(
+        "/api/auth/password-reset", json={"token": second, "new_password": "NewPassword456!"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 def test_request_password_reset_nonexistent_user(client):
@@ -45,11 +88,7 @@ def test_request_password_reset_nonexistent_user(client):
 def test_reset_password_valid_token(client, test_user, session):
     """测试使用有效令牌重置密码"""
     # 准备测试数据
-    reset_token = generate_reset_token()
-    test_user.reset_token = reset_token
-    test_user.reset_token_expires = datetime.now(UTC) + timedelta(hours=1)
-    session.add(test_user)
-    session.commit()
+    reset_token = create_reset_token(session, test_user, timedelta(hours=1))
 
     # 准备请求数据
     reset_data = {"token": reset_token, "new_password": "NewPassword123!"}
@@ -62,10 +101,8 @@ def test_reset_password_valid_token(client, test_user, session):
     data = response.json()
     assert "message" in data
 
-    # 验证用户记录更新
-    session.refresh(test_user)
-    assert test_user.reset_token is None
-    assert test_user.reset_token_expires is None
+    # 验证令牌已作废
+    assert session.exec(select(PasswordResetToken)).all() == []
 
     # 验证可以使用新密码登录
     login_data = {"username": test_user.email, "password": "NewPassword123!"}
@@ -76,12 +113,8 @@ def test_reset_password_valid_token(client, test_user, session):
 
 def test_reset_password_expired_token(client, test_user, session):
     """测试使用过期令牌重置密码"""
-    # 准备测试数据
-    reset_token = generate_reset_token()
-    test_user.reset_token = reset_token
-    test_user.reset_token_expires = datetime.now(UTC) - timedelta(hours=1)  # 过期的令牌
-    session.add(test_user)
-    session.commit()
+    # 准备测试数据（过期的令牌）
+    reset_token = create_reset_token(session, test_user, timedelta(hours=-1))
 
     # 准备请求数据
     reset_data = {"token": reset_token, "new_password": "NewPassword123!"}
@@ -110,11 +143,7 @@ def test_reset_password_invalid_token(client):
 def test_reset_password_weak_password(client, test_user, session):
     """测试使用弱密码重置密码"""
     # 准备测试数据
-    reset_token = generate_reset_token()
-    test_user.reset_token = reset_token
-    test_user.reset_token_expires = datetime.now(UTC) + timedelta(hours=1)
-    session.add(test_user)
-    session.commit()
+    reset_token = create_reset_token(session, test_user, timedelta(hours=1))
 
     # 准备请求数据（弱密码）
     reset_data = {"token": reset_token, "new_password": "weak"}
@@ -186,3 +215,21 @@ def test_change_password_wrong_current(client, test_user, session):
     # 验证响应为错误
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert "当前密码不正确" in response.json()["detail"]
+
+
+def test_purge_expired_reset_tokens(engine, session, test_user):
+    """测试分批清理过期令牌，保留未过期的令牌"""
+    for _ in range(5):
+        create_reset_token(session, test_user, timedelta(hours=-1))
+    valid = create_reset_token(session, test_user, timedelta(hours=1))
+
+    async def purge():
+        try:
+            async with session_scope() as db:
+                return await purge_expired_tokens(db, PasswordResetToken, batch_size=2)
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(purge()) == 5
+    remaining = session.exec(select(PasswordResetToken)).all()
+    assert [t.token_hash for t in remaining] == [hash_token(valid)]
@@ -124,4 +124,271 @@ def test_post_unauthorized(client):
         "tag_ids": [],
     }
     resp = client.post("/api/posts/", json=post_data)
-    assert resp.status_code == status.HTTP_401_UNAUTHORIZED 
\ No newline at end of file
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED 
+def test_create_post_too_large_to_render(client, user, monkeypatch):
+    from app.core.renderer import renderer
+
+    monkeypatch.setattr(renderer, "max_size", 1024)
+    headers = get_auth_headers(client, user["email"], user["password"])
+    post_data = {
+        "title": "Huge Post",
+        "content_markdown": "x" * 2048,
+        "summary": "huge",
+        "published": True,
+        "category_id": None,
+        "tag_ids": [],
+    }
+    resp = client.post("/api/posts/", json=post_data, headers=headers)
+    assert resp.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+def create_post(client, headers, title, content, summary=None):
+    post_data = {"title": title, "content_markdown": content, "summary": summary, "tag_ids": []}
+    resp = client.post("/api/posts/", json=post_data, headers=headers)
+    assert resp.status_code == status.HTTP_201_CREATED
+    return resp.json()["id"]
+
+def test_search_posts_full_text(client, user):
+    headers = get_auth_headers(client, user["email"], user["password"])
+    body_hit = create_post(client, headers, "今日随笔", "今天介绍全文搜索的实现。")
+    title_hit = create_post(client, headers, "全文搜索入门", "正文没有关键词。")
+    create_post(client, headers, "无关文章", "全部文章的搜索入口")
+
+    resp = client.get("/api/posts/", params={"search": "全文搜索"})
+    data = resp.json()
+    # 只匹配相邻的字，标题命中排在正文命中之前
+    assert data["total"] == 2
+    assert [post["id"] for post in data["posts"]] == [title_hit, body_hit]
+    assert data["posts"][1]["snippet"] == "今天介绍<mark>全文搜索</mark>的实现。"
+
+    # 多个词同时出现才匹配
+    assert client.get("/api/posts/", params={"search": "全文 实现"}).json()["total"] == 1
+
+def test_search_index_follows_updates(client, user):
+    headers = get_auth_headers(client, user["email"], user["password"])
+    post_id = create_post(client, headers, "Draft post", "旧的内容")
+    client.put(f"/api/posts/{post_id}", json={"content_markdown": "新的内容 FastAPI"}, headers=headers)
+    assert client.get("/api/posts/", params={"search": "旧的"}).json()["total"] == 0
+    assert client.get("/api/posts/", params={"search": "fastapi"}).json()["total"] == 1
+
+    client.delete(f"/api/posts/{post_id}", headers=headers)
+    assert client.get("/api/posts/", params={"search": "新的"}).json()["total"] == 0
+
+def test_search_falls_back_to_like(client, user, monkeypatch):
+    from app.core.config import settings
+
+    headers = get_auth_headers(client, user["email"], user["password"])
+    create_post(client, headers, "Symbols", "价格是 100% 正确")
+    # 没有可检索字符的搜索词使用 LIKE 查询
+    assert client.get("/api/posts/", params={"search": "%"}).json()["total"] == 1
+    monkeypatch.setattr(settings, "SEARCH_FTS_ENABLED", False)
+    data = client.get("/api/posts/", params={"search": "正确"}).json()
+    assert data["total"] == 1
+    assert data["posts"][0]["snippet"] is None
+
+def test_rebuild_search_index(client, user):
+    from app.core.database import engine
+    from app.services.search_service import rebuild_search_index
+
+    headers = get_auth_headers(client, user["email"], user["password"])
+    create_post(client, headers, "重建索引", "索引内容")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM post_fts")
+        assert rebuild_search_index(conn)[0] == 1
+    assert client.get("/api/posts/", params={"search": "重建"}).json()["total"] == 1
+
+def test_cursor_pagination(client, user):
+    headers = get_auth_headers(client, user["email"], user["password"])
+    ids = [create_post(client, headers, f"Paged post {i}", "body") for i in range(5)]
+
+    first = client.get("/api/posts/", params={"limit": 2}).json()
+    assert [post["id"] for post in first["posts"]] == [ids[4], ids[3]]
+    # 翻页期间发布的新文章不会让后续页面出现重复或遗漏
+    create_post(client, headers, "Newest post", "body")
+    second = client.get("/api/posts/", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    third = client.get("/api/posts/", params={"limit": 2, "cursor": second["next_cursor"]}).json()
+    assert [post["id"] for post in second["posts"] + third["posts"]] == [ids[2], ids[1], ids[0]]
+    assert third["next_cursor"] is None
+
+    # skip 分页仍然可用，并同样返回下一页游标
+    legacy = client.get("/api/posts/", params={"skip": 1, "limit": 2}).json()
+    assert [post["id"] for post in legacy["posts"]] == [ids[4], ids[3]]
+    assert legacy["next_cursor"]
+
+def test_invalid_cursor(client):
+    assert client.get("/api/posts/", params={"cursor": "bad"}).status_code == status.HTTP_400_BAD_REQUEST
+    resp = client.get("/api/posts/", params={"cursor": "bad", "search": "词"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_list_totals_are_optional_and_cached(client, user):
+    from app.core.count_cache import count_cache
+    from app.core.database import engine
+
+    headers = get_auth_headers(client, user["email"], user["password"])
+    create_post(client, headers, "Counted post", "body")
+    resp = client.get("/api/posts/", params={"with_total": False}).json()
+    assert resp["total"] is None and len(resp["posts"]) == 1
+
+    assert client.get("/api/posts/").json()["total"] == 1
+    # 绕过 ORM 的原始 SQL 写入不会触发失效，第二次读取命中缓存
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO post (title, content_markdown, content_html, published, author_id, created_at, updated_at) "
+            "SELECT title, content_markdown, content_html, published, author_id, created_at, updated_at FROM post"
+        )
+    hits = count_cache.hits
+    assert client.get("/api/posts/").json()["total"] == 1
+    assert count_cache.hits == hits + 1
+    # 通过应用写入并提交后缓存立即失效
+    create_post(client, headers, "Another post", "body")
+    assert client.get("/api/posts/").json()["total"] == 3
+
+def test_estimated_total(client, user):
+    headers = get_auth_headers(client, user["email"], user["password"])
+    ids = [create_post(client, headers, f"Estimated post {i}", "body") for i in range(3)]
+    client.delete(f"/api/posts/{ids[0]}", headers=headers)
+
+    resp = client.get("/api/posts/", params={"estimated": True}).json()
+    assert resp["total_estimated"] is True and resp["total"] >= 2
+    # 有筛选条件时估算不可用，仍返回精确总数
+    resp = client.get("/api/posts/", params={"estimated": True, "published": False}).json()
+    assert resp["total_estimated"] is False and resp["total"] == 2
+
+
+def test_query_counts_do_not_grow_with_rows(client, user, admin):
+    admin_headers = get_auth_headers(client, admin["email"], admin["password"])
+    headers = get_auth_headers(client, user["email"], user["password"])
+    tag_ids = [
+        client.post("/api/tags/", json={"name": f"计数{i}"}, headers=admin_headers).json()["id"]
+        for i in range(3)
+    ]
+    category_id = client.post("/api/categories/", json={"name": "计数分类"}, headers=admin_headers).json()["id"]
+    plain = create_post(client, headers, "Plain post", "body")
+    post_data = {"title": "Tagged post", "content_markdown": "body", "category_id": category_id, "tag_ids": tag_ids}
+    tagged = client.post("/api/posts/", json=post_data, headers=headers).json()["id"]
+
+    # 详情：文章连同作者、分类一条 JOIN 查询，标签一条 IN 查询
+    for post_id in (plain, tagged):
+        resp = client.get(f"/api/posts/{post_id}")
+        assert int(resp.headers["X-DB-Queries"]) == 2
+    assert len(resp.json()["tags"]) == 3 and resp.json()["category"]["id"] == category_id
+
+    # 列表：不计总数时只有一条查询，与返回的行数无关
+    one = client.get("/api/posts/", params={"limit": 1, "with_total": False})
+    many = client.get("/api/posts/", params={"limit": 10, "with_total": False})
+    assert len(many.json()["posts"]) == 2
+    assert int(one.headers["X-DB-Queries"]) == int(many.headers["X-DB-Queries"]) == 1
+
+def test_post_list_does_not_read_bodies(client, user):
+    from sqlalchemy import event
+    from app.core.database import named_engines
+
+    headers = get_auth_headers(client, user["email"], user["password"])
+    create_post(client, headers, "Projected post", "很长的正文" * 100)
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = list(named_engines().values())
+    for target in engines:
+        event.listen(target, "before_cursor_execute", _record)
+    try:
+        resp = client.get("/api/posts/")
+        client.get("/api/posts/", params={"search": "正文"})
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", _record)
+    assert resp.json()["posts"][0]["title"] == "Projected post"
+    # 列表只查询 PostBrief 需要的列（全文搜索的片段来自索引表）
+    assert statements and not any("post.content_" in statement for statement in statements)
+
+def test_update_post_in_one_transaction(client, user, admin, monkeypatch):
+    from sqlalchemy import event
+    from sqlalchemy.sql.dml import UpdateBase
+    from app.core.database import named_engines
+    from app.services import post_service
+
+    admin_headers = get_auth_headers(client, admin["email"], admin["password"])
+    headers = get_auth_headers(client, user["email"], user["password"])
+    a, b, c = (
+        client.post("/api/tags/", json={"name": name}, headers=admin_headers).json()["id"]
+        for name in ("差集A", "差集B", "差集C")
+    )
+    post_data = {"title": "Diff tags", "content_markdown": "# 正文", "tag_ids": [a, b]}
+    post_id = client.post("/api/posts/", json=post_data, headers=headers).json()["id"]
+
+    renders, commits = [], []
+    original_render = post_service.render_markdown_async
+
+    async def counting_render(text):
+        renders.append(text)
+        return await original_render(text)
+
+    monkeypatch.setattr(post_service, "render_markdown_async", counting_render)
+
+    def _mark_write(conn, clauseelement, *args):
+        if isinstance(clauseelement, UpdateBase):
+            conn.info["test_wrote"] = True
+
+    def _count_commit(conn):
+        if conn.info.pop("test_wrote", False):
+            commits.append(conn)
+
+    engines = list(named_engines().values())
+    for target in engines:
+        event.listen(target, "after_execute", _mark_write)
+        event.listen(target, "commit", _count_commit)
+    try:
+        # 正文未变化：不重新渲染；标签 A 删除、C 新增，B 保持不动
+        resp = client.put(
+            f"/api/posts/{post_id}",
+            json={"title": "Diff tags v2", "content_markdown": "# 正文", "tag_ids": [b, c, 9999]},
+            headers=headers,
+        )
+        update_commits = len(commits)
+        client.put(f"/api/posts/{post_id}", json={"content_markdown": "# 新正文"}, headers=headers)
+    finally:
+        for target in engines:
+            event.remove(target, "after_execute", _mark_write)
+            event.remove(target, "commit", _count_commit)
+    assert resp.status_code == status.HTTP_200_OK
+    assert {tag["id"] for tag in resp.json()["tags"]} == {b, c}
+    assert resp.json()["title"] == "Diff tags v2"
+    # 字段、标签和全文索引的修改只提交一次
+    assert update_commits == 1
+    assert renders == ["# 新正文"]
+    assert client.get(f"/api/posts/{post_id}").json()["content_html"].startswith("<h1>新正文")
+
+
+def test_author_reads_own_post_from_lagging_replica(client, user, tmp_path, monkeypatch):
+    """测试副本尚未同步时，作者通过公开接口仍能读到自己刚创建的文章"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.core import database
+    from app.core.config import settings
+    from app.core.replication import LocalReplicator, sqlite_path
+
+    # 副本停留在创建文章之前的状态
+    replica_path = str(tmp_path / "replica.db")
+    replicator = LocalReplicator(sqlite_path(settings.DATABASE_URL), [replica_path])
+    replicator.sync(force=True)
+    replicator.close()
+    replica = create_async_engine(f"sqlite+aiosqlite:///{replica_path}", poolclass=NullPool)
+    monkeypatch.setattr(database, "read_session_maker", async_sessionmaker(
+        database.async_engine, class_=AsyncSession, sync_session_class=database.RoutingSession,
+        reader_binds=[replica.sync_engine], expire_on_commit=False,
+    ))
+
+    headers = get_auth_headers(client, user["email"], user["password"])
+    post_id = client.post(
+        "/api/posts/", json={"title": "刚写的文章", "content_markdown": "正文"}, headers=headers
+    ).json()["id"]
+
+    resp = client.get(f"/api/posts/{post_id}", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert client.get("/api/posts/", headers=headers).json()["total"] == 1
+    if settings.DB_ASYNC:
+        # 匿名读取仍然走副本，看不到尚未复制的文章
+        assert client.get(f"/api/posts/{post_id}").status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,169 @@
+"""热点查询的执行计划回归测试
+
+跑一遍覆盖各业务接口和后台任务的流程，记录期间执行的全部 SELECT/UPDATE/DELETE，
+再对每条语句执行 EXPLAIN QUERY PLAN，出现全表扫描（不走任何索引的 SCAN）即失败。
+LIKE 搜索本身无法使用索引，只在关闭全文索引时使用，不在此覆盖。
+"""
+
+import asyncio
+import re
+
+import pytest
+from fastapi import status
+from sqlalchemy import event
+
+from app.core.database import async_engine, engine, named_engines, session_scope
+from app.core.revocation import purge_expired_revocations, revocation_list
+from app.models.password_reset import PasswordResetToken
+from app.models.refresh_token import RefreshToken
+from app.services.auth_service import purge_expired_tokens
+from app.services.email_service import deliver_outbox
+
+# 不带 USING INDEX / USING COVERING INDEX 的 SCAN 是全表扫描；虚拟表和子查询不计
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+class RecordingPool:
+    """只记录邮件、不连接 SMTP 的发送池"""
+
+    size = 1
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, messages):
+        self.sent.extend(messages)
+        return [None] * len(messages)
+
+
+@pytest.fixture
+def statements(client):
+    """记录测试期间所有引擎上执行的语句"""
+    recorded = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            recorded.append((statement, parameters[0] if executemany else parameters))
+
+    engines = list(named_engines().values())
+    for target in engines:
+        event.listen(target, "before_cursor_execute", _record)
+    yield recorded
+    for target in engines:
+        event.remove(target, "before_cursor_execute", _record)
+
+
+def query_plan(statement, parameters):
+    """返回执行计划每一步的描述"""
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in plan]
+
+
+def register(client, username, is_admin=False):
+    data = {
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "Password123!",
+        "is_admin": is_admin,
+    }
+    assert client.post("/api/auth/register", json=data).status_code == status.HTTP_200_OK
+    resp = client.post("/api/auth/token", data={"username": data["email"], "password": data["password"]})
+    tokens = resp.json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}, tokens["refresh_token"]
+
+
+def exercise_api(client):
+    admin, refresh_token = register(client, "planadmin", is_admin=True)
+    author, _ = register(client, "planauthor")
+    category_id = client.post("/api/categories/", json={"name": "计划分类"}, headers=admin).json()["id"]
+    tag_id = client.post("/api/tags/", json={"name": "计划"}, headers=admin).json()["id"]
+    post = {"title": "执行计划", "content_markdown": "查询计划正文", "published": True,
+            "category_id": category_id, "tag_ids": [tag_id]}
+    post_id = client.post("/api/posts/", json=post, headers=author).json()["id"]
+    comment_id = client.post(
+        "/api/comments/", json={"content": "评论", "post_id": post_id}, headers=admin
+    ).json()["id"]
+
+    first_page = client.get("/api/posts/", params={"limit": 1}).json()
+    for params in (
+        {},
+        {"published": True},
+        {"categoryId": category_id},
+        {"tagId": tag_id},
+        {"search": "计划"},
+        {"cursor": first_page["next_cursor"] or ""},
+        {"estimated": True},
+    ):
+        assert client.get("/api/posts/", params=params).status_code == status.HTTP_200_OK
+    for params in ({}, {"published": True}, {"categoryId": category_id}, {"tagId": tag_id}, {"search": "计划"}):
+        resp = client.get("/api/admin/posts/export", params=params, headers=admin)
+        assert resp.status_code == status.HTTP_200_OK
+    for url in ("/api/comments/", f"/api/comments/?postId={post_id}", "/api/tags/",
+                "/api/admin/comments/export", f"/api/admin/comments/export?postId={post_id}",
+                "/api/categories/", "/api/users/", "/api/dashboard/summary",
+                f"/api/posts/{post_id}", f"/api/comments/{comment_id}", f"/api/tags/{tag_id}",
+                f"/api/categories/{category_id}", "/api/users/me"):
+        assert client.get(url, headers=admin).status_code == status.HTTP_200_OK
+
+    client.put(f"/api/posts/{post_id}", json={"title": "执行计划二", "tag_ids": []}, headers=author)
+    client.put(f"/api/comments/{comment_id}", json={"content": "改过的评论"}, headers=admin)
+    client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    client.post("/api/auth/password-reset-request", json={"email": "planauthor@example.com"})
+    client.delete(f"/api/comments/{comment_id}", headers=admin)
+    client.delete(f"/api/posts/{post_id}", headers=author)
+    client.delete(f"/api/tags/{tag_id}", headers=admin)
+    client.delete(f"/api/categories/{category_id}", headers=admin)
+    client.post("/api/auth/logout", headers=author)
+    author_id = client.get("/api/users/", headers=admin).json()["users"][0]["id"]
+    assert client.delete(f"/api/users/{author_id}", headers=admin).status_code == status.HTTP_204_NO_CONTENT
+
+
+async def exercise_background_tasks():
+    try:
+        async with session_scope() as session:
+            await deliver_outbox(session, 10, pool=RecordingPool())
+        async with session_scope() as session:
+            await purge_expired_tokens(session, PasswordResetToken, 100)
+            await purge_expired_tokens(session, RefreshToken, 100)
+        async with session_scope() as session:
+            await revocation_list.refresh(session)
+            await purge_expired_revocations(session)
+    finally:
+        await async_engine.dispose()
+
+
+def test_service_queries_use_indexes(client, statements):
+    """测试业务查询都不做全表扫描"""
+    exercise_api(client)
+    asyncio.run(exercise_background_tasks())
+    assert len(statements) > 50
+
+    offenders = {}
+    for statement, parameters in statements:
+        scans = [detail for detail in query_plan(statement, parameters) if FULL_SCAN.match(detail)]
+        if scans:
+            offenders[statement] = scans
+    assert not offenders, "\n\n".join(f"{scans}\n{sql}" for sql, scans in offenders.items())
+
+
+@pytest.mark.parametrize(
+    "params, index",
+    [
+        ({"published": True}, "ix_post_published_created_at"),
+        ({"categoryId": 1}, "ix_post_category_id_created_at"),
+        ({"tagId": 1}, "ix_post_tag_link_tag_id_post_id"),
+    ],
+)
+def test_filtered_post_lists_use_composite_indexes(client, statements, params, index):
+    """测试带筛选条件的文章列表使用对应的组合索引"""
+    client.get("/api/posts/", params={**params, "with_total": False})
+    plans = [detail for statement, parameters in statements for detail in query_plan(statement, parameters)]
+    assert any(index in detail for detail in plans), plans
+
+
+def test_post_comments_use_composite_index(client, statements):
+    """测试按文章筛选的评论列表使用组合索引"""
+    client.get("/api/comments/", params={"postId": 1, "with_total": False})
+    plans = [detail for statement, parameters in statements for detail in query_plan(statement, parameters)]
+    assert any("ix_comment_post_id_created_at" in detail for detail in plans), plans
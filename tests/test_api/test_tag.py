@@ -29,6 +29,16 @@ def test_get_tag_list(client):
     assert resp.status_code == status.HTTP_200_OK
     assert "tags" in resp.json()
 
+def test_get_tag_list_cursor(client, admin):
+    headers = get_auth_headers(client, admin["email"], admin["password"])
+    for name in ("tag-a", "tag-b", "tag-c"):
+        client.post("/api/tags/", json={"name": name}, headers=headers)
+    first = client.get("/api/tags/", params={"limit": 2}).json()
+    assert [tag["name"] for tag in first["tags"]] == ["tag-c", "tag-b"]
+    second = client.get("/api/tags/", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [tag["name"] for tag in second["tags"]] == ["tag-a"]
+    assert second["next_cursor"] is None
+
 def test_get_tag_detail(client, admin):
     headers = get_auth_headers(client, admin["email"], admin["password"])
     tag_data = {"name": "detail-tag"}
@@ -0,0 +1,41 @@
+import time
+
+from sqlmodel import Session
+
+from app.core.count_cache import CountCache, count_cache
+from app.models.tag import Tag
+
+
+def test_key_ignores_order_and_empty_filters():
+    """测试筛选条件与顺序无关，值为 None 的条件被忽略"""
+    assert CountCache.key("post", {"a": 1, "b": None, "c": 2}) == CountCache.key("post", {"c": 2, "a": 1})
+
+
+def test_ttl_and_dependency_invalidation():
+    """测试条目过期，以及写入依赖表时相关条目失效"""
+    cache = CountCache(maxsize=10, ttl=0.05)
+    by_tag = cache.key("post", {"tag_id": 1})
+    plain = cache.key("post", {})
+    cache.put(by_tag, 3, {"post", "post_tag_link"})
+    cache.put(plain, 5, {"post"})
+    cache.invalidate({"post_tag_link"})
+    assert cache.get(by_tag) is None
+    assert cache.get(plain) == 5
+    time.sleep(0.06)
+    assert cache.get(plain) is None
+
+
+def test_commit_invalidates_written_tables(engine):
+    """测试提交后失效，回滚不影响缓存"""
+    key = count_cache.key("tag", {})
+    count_cache.put(key, 0, {"tag"})
+    with Session(engine) as session:
+        session.add(Tag(name="rolled-back"))
+        session.flush()
+        session.rollback()
+    assert count_cache.get(key) == 0
+
+    with Session(engine) as session:
+        session.add(Tag(name="committed"))
+        session.commit()
+    assert count_cache.get(key) is None
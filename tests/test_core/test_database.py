@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import (LazySession, RoutingSession, async_engine,
+                               create_writer_lane_engine,
+                               get_async_database_url, install_sqlite_pragmas)
+from app.models.tag import Tag
+
+
+def test_async_database_url():
+    """测试由同步地址推导异步驱动地址"""
+    assert get_async_database_url("sqlite:///./blog.db") == "sqlite+aiosqlite:///./blog.db"
+    assert get_async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_sqlite_pragmas_applied(engine):
+    """测试新连接上应用了配置中的 PRAGMA"""
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_custom_pragmas(tmp_path):
+    """测试可以为任意引擎安装自定义 PRAGMA"""
+    custom = create_engine(f"sqlite:///{tmp_path}/custom.db")
+    install_sqlite_pragmas(custom, {"synchronous": "OFF", "cache_size": None})
+    with custom.connect() as conn:
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 0
+
+
+def test_writer_lane_routes_writes(engine):
+    """测试开启单写通道后写操作与其后的读取都走写引擎"""
+    url = get_async_database_url(str(engine.url))
+
+    async def run():
+        reader = create_async_engine(url)
+        writer = create_writer_lane_engine(url, timeout=5)
+        maker = async_sessionmaker(
+            reader, class_=AsyncSession, sync_session_class=RoutingSession,
+            writer_bind=writer.sync_engine, expire_on_commit=False,
+        )
+        async with maker() as session:
+            sync_session = session.sync_session
+            assert sync_session.get_bind(Tag) is reader.sync_engine
+            session.add(Tag(name="lane"))
+            await session.flush()
+            assert sync_session.get_bind(Tag) is writer.sync_engine
+            assert writer.sync_engine.pool.checkedout() == 1
+            await session.commit()
+            assert writer.sync_engine.pool.checkedout() == 0
+            assert sync_session.get_bind(Tag) is reader.sync_engine
+        await reader.dispose()
+        await writer.dispose()
+
+    asyncio.run(run())
+
+
+def test_pool_stats_records_timeouts(tmp_path):
+    """连接池耗尽时记录超时次数"""
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    from app.core.pool_stats import InstrumentedQueuePool, pool_status
+
+    test_engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        held = test_engine.connect()
+        with pytest.raises(PoolTimeoutError):
+            test_engine.connect()
+        held.close()
+        status = pool_status(test_engine.pool)
+        assert status["checkouts"] == 1
+        assert status["timeouts"] == 1
+        assert status["checked_out"] == 0
+        assert sum(status["histogram"].values()) == 2
+    finally:
+        test_engine.dispose()
+
+
+def test_lazy_session_releases_connection_after_read(engine):
+    """测试只读调用结束后立即归还连接，写事务持有连接直到提交"""
+    pool = async_engine.sync_engine.pool
+
+    async def run():
+        session = LazySession()
+        try:
+            assert not session.started
+            await session.exec(select(Tag))
+            assert session.started
+            assert pool.checkedout() == 0
+
+            session.add(Tag(name="lazy"))
+            await session.flush()
+            assert pool.checkedout() == 1
+            await session.exec(select(Tag))
+            assert pool.checkedout() == 1
+            await session.commit()
+            assert pool.checkedout() == 0
+        finally:
+            await session.close()
+            await async_engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.core.hashing import HashingQueueFull, PasswordHasher
+from app.core.security import get_password_hash, verify_password
+
+
+def test_process_pool_hashing():
+    """测试在子进程中生成和验证密码哈希"""
+    hasher = PasswordHasher(workers=1, max_pending=4)
+
+    async def run():
+        hashed = await hasher.run(get_password_hash, "secret")
+        assert await hasher.run(verify_password, "secret", hashed)
+        assert not await hasher.run(verify_password, "wrong", hashed)
+
+    try:
+        asyncio.run(run())
+    finally:
+        hasher.shutdown()
+
+
+def test_hashing_queue_bounded():
+    """测试排队任务达到上限时立即拒绝"""
+    hasher = PasswordHasher(workers=0, max_pending=1)
+
+    async def run():
+        first = asyncio.create_task(hasher.run(get_password_hash, "secret"))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingQueueFull):
+            await hasher.run(get_password_hash, "secret")
+        await first
+        assert hasher.pending == 0
+
+    try:
+        asyncio.run(run())
+    finally:
+        hasher.shutdown()
+
+
+def test_calibrate_suggests_cost_within_target():
+    """测试标定结果不超过目标耗时，且超过目标后停止测算"""
+    from app.commands.calibrate_hash import calibrate
+
+    suggested, results = calibrate(target_ms=20, samples=1, start_rounds=4)
+    assert suggested is not None
+    assert dict(results)[suggested] <= 20
+    suggested, results = calibrate(target_ms=0, samples=1, start_rounds=4)
+    assert suggested is None
+    assert len(results) == 1
+
+
+def test_test_profile_uses_cheap_cost():
+    """测试环境使用最低成本生成哈希"""
+    assert get_password_hash("secret").startswith("$2b$04$")
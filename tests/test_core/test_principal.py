@@ -0,0 +1,41 @@
+import time
+
+from app.core.principal import Principal, PrincipalCache
+
+
+def make_principal(user_id: int) -> Principal:
+    return Principal(id=user_id, username=f"user{user_id}", is_active=True, is_admin=False)
+
+
+def test_principal_cache_lru_eviction():
+    """测试超出容量时淘汰最久未使用的令牌"""
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    cache.put("a", make_principal(1))
+    cache.put("b", make_principal(2))
+    assert cache.get("a").id == 1
+    cache.put("c", make_principal(3))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_principal_cache_expiry():
+    """测试条目按 TTL 和令牌过期时间中较早者失效"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.put("expired", make_principal(1), token_exp=time.time() - 1)
+    assert cache.get("expired") is None
+    cache = PrincipalCache(maxsize=10, ttl=0)
+    cache.put("zero-ttl", make_principal(1))
+    assert cache.get("zero-ttl") is None
+
+
+def test_principal_cache_invalidate_user():
+    """测试按用户清除全部令牌"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.put("a1", make_principal(1))
+    cache.put("a2", make_principal(1))
+    cache.put("b", make_principal(2))
+    cache.invalidate_user(1)
+    assert cache.get("a1") is None
+    assert cache.get("a2") is None
+    assert cache.get("b").id == 2
@@ -0,0 +1,47 @@
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from app.core.profiler import (RequestProfile, current_profile,
+                               install_query_profiler, statement_shape)
+
+
+def test_statement_shape_collapses_param_lists():
+    """测试 IN 参数列表长度不同的语句归为同一形状"""
+    a = statement_shape("SELECT * FROM tag\n WHERE id IN (?, ?)")
+    b = statement_shape("SELECT * FROM tag WHERE id IN (?, ?, ?)")
+    assert a == b == "SELECT * FROM tag WHERE id IN (?)"
+
+
+def test_profiler_counts_and_flags_n_plus_one():
+    """测试统计语句数并识别重复执行的同形查询"""
+    test_engine = create_engine("sqlite://")
+    install_query_profiler(test_engine)
+    profile = RequestProfile()
+    token = current_profile.set(profile)
+    try:
+        with test_engine.connect() as conn:
+            for i in range(6):
+                conn.execute(text("SELECT :i"), {"i": i})
+            conn.execute(text("SELECT 1, 2"))
+    finally:
+        current_profile.reset(token)
+        test_engine.dispose()
+
+    assert profile.queries == 7
+    assert profile.db_ms >= 0
+    suspects = profile.n_plus_one(threshold=5)
+    assert suspects == [{"statement": "SELECT ?", "count": 6}]
+    assert profile.n_plus_one(threshold=7) == []
+
+
+def test_profiler_skips_without_active_profile():
+    """测试未采样时不记录"""
+    test_engine = create_engine("sqlite://")
+    install_query_profiler(test_engine)
+    profile = RequestProfile()
+    try:
+        with test_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        test_engine.dispose()
+    assert profile.queries == 0
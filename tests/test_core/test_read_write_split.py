@@ -0,0 +1,89 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import (RoutingSession, create_app_async_engine,
+                               current_user_id, read_your_writes_pins)
+from app.core.replication import LocalReplicator
+from app.models.tag import Tag
+
+
+def _setup(tmp_path):
+    """创建主库与副本两个 SQLite 文件，并用复制替身同步表结构"""
+    primary_path = str(tmp_path / "primary.db")
+    replica_path = str(tmp_path / "replica.db")
+    sync_engine = create_engine(f"sqlite:///{primary_path}")
+    SQLModel.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+    replicator = LocalReplicator(primary_path, [replica_path])
+    replicator.sync(force=True)
+    return primary_path, replica_path, replicator
+
+
+def test_reads_go_to_replica_until_replicated(tmp_path):
+    """测试只读会话读取副本，复制完成后才能看到主库的新数据"""
+    primary_path, replica_path, replicator = _setup(tmp_path)
+
+    async def run():
+        primary = create_app_async_engine(f"sqlite+aiosqlite:///{primary_path}")
+        replica = create_app_async_engine(f"sqlite+aiosqlite:///{replica_path}")
+        write_maker = async_sessionmaker(
+            primary, class_=AsyncSession, sync_session_class=RoutingSession
+        )
+        read_maker = async_sessionmaker(
+            primary, class_=AsyncSession, sync_session_class=RoutingSession,
+            reader_binds=[replica.sync_engine],
+        )
+        try:
+            async with write_maker() as session:
+                session.add(Tag(name="replicated"))
+                await session.commit()
+
+            query = select(Tag).where(Tag.name == "replicated")
+            async with read_maker() as session:
+                assert (await session.exec(query)).first() is None
+
+            assert replicator.sync() is True
+            assert replicator.sync() is False  # 主库无变化时跳过
+            async with read_maker() as session:
+                assert (await session.exec(query)).first() is not None
+        finally:
+            await primary.dispose()
+            await replica.dispose()
+
+    asyncio.run(run())
+    replicator.close()
+
+
+def test_read_your_writes_pin(tmp_path):
+    """测试用户写入后在固定期内读取走主库"""
+    primary_path, replica_path, replicator = _setup(tmp_path)
+
+    async def run():
+        primary = create_app_async_engine(f"sqlite+aiosqlite:///{primary_path}")
+        replica = create_app_async_engine(f"sqlite+aiosqlite:///{replica_path}")
+        read_maker = async_sessionmaker(
+            primary, class_=AsyncSession, sync_session_class=RoutingSession,
+            reader_binds=[replica.sync_engine],
+        )
+        current_user_id.set(4242)
+        assert not read_your_writes_pins.is_pinned(4242)
+        try:
+            # 只读会话中的写入同样落在主库，并为当前用户设置固定期
+            async with read_maker() as session:
+                session.add(Tag(name="mine"))
+                await session.commit()
+            assert read_your_writes_pins.is_pinned(4242)
+
+            async with read_maker() as session:
+                query = select(Tag).where(Tag.name == "mine")
+                assert (await session.exec(query)).first() is not None
+                assert session.sync_session.get_bind(Tag) is primary.sync_engine
+        finally:
+            await primary.dispose()
+            await replica.dispose()
+
+    asyncio.run(run())
+    replicator.close()
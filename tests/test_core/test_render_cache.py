@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+from app.core import renderer as renderer_module
+from app.core.render_cache import RenderCache
+from app.core.renderer import render_cache, render_markdown_async
+
+
+def test_lru_eviction_and_counters():
+    """测试按最近使用淘汰，并统计命中与未命中"""
+    cache = RenderCache(maxsize=2)
+    a, b, c = (cache.key(text) for text in ("a", "b", "c"))
+    assert cache.get(a) is None
+    cache.put(a, "<p>a</p>")
+    cache.put(b, "<p>b</p>")
+    assert cache.get(a) == "<p>a</p>"
+    cache.put(c, "<p>c</p>")
+    assert cache.get(b) is None
+    assert cache.get(a) == "<p>a</p>"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 2, 1, 2)
+
+
+def test_key_depends_on_extensions():
+    """测试扩展配置不同的缓存互不命中"""
+    assert RenderCache(10, extensions=("tables",)).key("x") != RenderCache(10).key("x")
+
+
+def test_disk_persistence(tmp_path):
+    """测试磁盘缓存在新实例（进程重启）中仍可命中"""
+    first = RenderCache(maxsize=10, directory=str(tmp_path))
+    key = first.key("# Title")
+    first.put(key, "<h1>Title</h1>")
+
+    second = RenderCache(maxsize=10, directory=str(tmp_path))
+    assert second.get(key) == "<h1>Title</h1>"
+    assert second.get(key) == "<h1>Title</h1>"
+    stats = second.stats()
+    assert (stats["disk_hits"], stats["hits"]) == (1, 1)
+
+
+def test_async_disk_io_off_event_loop(tmp_path, monkeypatch):
+    """测试异步接口在线程中读写磁盘缓存，不阻塞事件循环"""
+    cache = RenderCache(maxsize=10, directory=str(tmp_path))
+    key = cache.key("# Title")
+    threads = []
+    for name in ("_read", "_write"):
+        original = getattr(cache, name)
+
+        def record(*args, original=original):
+            threads.append(threading.get_ident())
+            return original(*args)
+
+        monkeypatch.setattr(cache, name, record)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        assert await cache.get_async(key) is None
+        await cache.put_async(key, "<h1>Title</h1>")
+        cache.clear()
+        assert await cache.get_async(key) == "<h1>Title</h1>"
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+    assert len(threads) == 3 and loop_thread not in threads
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_cache_hit_skips_rendering(monkeypatch):
+    """测试缓存命中时不再调用渲染器"""
+
+    async def run():
+        assert await render_markdown_async("# Cached") == "<h1>Cached</h1>"
+
+        async def fail(text):
+            raise AssertionError("缓存命中时不应渲染")
+
+        monkeypatch.setattr(renderer_module.renderer, "render", fail)
+        assert await render_markdown_async("# Cached") == "<h1>Cached</h1>"
+
+    render_cache.clear()
+    asyncio.run(run())
+    assert render_cache.stats()["hits"] == 1
+
+
+def test_memory_bounded_by_bytes():
+    """测试内存缓存按总字节数淘汰，超过上限的单条结果不进入内存"""
+    cache = RenderCache(maxsize=100, max_bytes=10)
+    a, b, c = (cache.key(text) for text in ("a", "b", "c"))
+    cache.put(a, "x" * 6)
+    cache.put(b, "y" * 4)
+    cache.put(c, "z" * 3)
+    assert cache.get(a) is None
+    assert cache.get(b) == "y" * 4
+    stats = cache.stats()
+    assert (stats["bytes"], stats["size"], stats["evictions"]) == (7, 2, 1)
+
+    cache.put(cache.key("big"), "w" * 11)
+    assert cache.get(cache.key("big")) is None
+    assert cache.stats()["bytes"] == 7
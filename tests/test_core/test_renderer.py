@@ -0,0 +1,156 @@
+import asyncio
+import threading
+
+import pytest
+from sqlmodel import select
+
+from app.core.renderer import (MarkdownRenderer, RenderTimeout, RenderTooLarge,
+                               _get_markdown, render_markdown)
+
+
+def test_markdown_instance_reused_and_reset():
+    """测试同一线程复用 Markdown 实例，且前一篇文档的引用定义不会带到下一篇"""
+    first = render_markdown("[link][ref]\n\n[ref]: https://example.com")
+    assert 'href="https://example.com"' in first
+    md = _get_markdown()
+    assert 'href=' not in render_markdown("[link][ref]")
+    assert _get_markdown() is md
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(_get_markdown()))
+    thread.start()
+    thread.join()
+    assert other[0] is not md
+
+
+def test_extensions_loaded():
+    """测试配置的扩展生效"""
+    html = render_markdown("```\ncode\n```\n\n| a | b |\n|---|---|\n| 1 | 2 |")
+    assert "<pre><code>" in html
+    assert "<table>" in html
+
+
+def test_large_document_rendered_in_process_pool():
+    """测试超过内联上限的文档在渲染进程中执行，超过大小上限的文档被拒绝"""
+    renderer = MarkdownRenderer(workers=1, inline_limit=16, max_size=1024, timeout=30)
+
+    async def run():
+        html = await renderer.render("# Title\n\n" + "word " * 50)
+        assert html.startswith("<h1>Title</h1>")
+        with pytest.raises(RenderTooLarge):
+            await renderer.render("x" * 2048)
+
+    try:
+        asyncio.run(run())
+    finally:
+        renderer.shutdown()
+
+
+def test_render_many_reports_errors_per_document():
+    """测试批量渲染在进程池中并行执行，单篇过大只影响该篇"""
+    renderer = MarkdownRenderer(workers=2, inline_limit=16, max_size=1024, timeout=30)
+
+    async def run():
+        return await renderer.render_many(["# 一", "x" * 2048, "*二*"])
+
+    try:
+        first, too_large, second = asyncio.run(run())
+    finally:
+        renderer.shutdown()
+    assert first == "<h1>一</h1>"
+    assert isinstance(too_large, RenderTooLarge)
+    assert second == "<p><em>二</em></p>"
+
+
+def test_render_timeout_replaces_pool():
+    """测试渲染超时后结束工作进程，之后的渲染使用新的进程池"""
+    renderer = MarkdownRenderer(workers=1, inline_limit=0, max_size=1024, timeout=0.001)
+
+    async def run():
+        # 子进程启动耗时远超超时时间
+        with pytest.raises(RenderTimeout):
+            await renderer.render("# Slow")
+        assert renderer._executor is None
+        renderer.timeout = 30
+        assert await renderer.render("# Fast") == "<h1>Fast</h1>"
+
+    try:
+        asyncio.run(run())
+    finally:
+        renderer.shutdown()
+
+
+def test_render_timeout_does_not_fail_concurrent_render():
+    """测试一篇渲染超时结束进程池时，同时在执行的渲染在新进程池上完成"""
+    renderer = MarkdownRenderer(workers=1, inline_limit=0, max_size=1024, timeout=30)
+
+    async def run():
+        healthy = asyncio.ensure_future(renderer.render("# Healthy"))
+        await asyncio.sleep(0)
+        # 之后提交的渲染使用很短的超时，子进程启动前就超时并结束进程池
+        renderer.timeout = 0.001
+        with pytest.raises(RenderTimeout):
+            await renderer.render("# Slow")
+        renderer.timeout = 30
+        assert await healthy == "<h1>Healthy</h1>"
+
+    try:
+        asyncio.run(run())
+    finally:
+        renderer.shutdown()
+
+
+def test_rerender_posts_resumable(engine, session, test_user, tmp_path, capsys):
+    """测试批量重新渲染只改写过期的 HTML，并能从检查点继续"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.commands.rerender_posts import load_checkpoint, rerender_posts, save_checkpoint
+    from app.models.post import Post
+
+    for i in range(7):
+        session.add(Post(title=f"Post {i}", content_markdown=f"# Post {i}",
+                         content_html=f"<h1>Post {i}</h1>" if i % 2 else "stale",
+                         author_id=test_user.id))
+    session.commit()
+
+    checkpoint = tmp_path / "checkpoint"
+    save_checkpoint(checkpoint, 2)
+    start_id = load_checkpoint(checkpoint)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        processed, changed = rerender_posts(
+            engine, executor, batch_size=2, chunk_size=1, start_id=start_id, checkpoint=checkpoint
+        )
+    # 只处理ID大于2的文章，其中ID为3、5、7（i 为偶数）的 HTML 已过期
+    assert (processed, changed) == (5, 3)
+    assert not checkpoint.exists()
+    assert "篇/秒" in capsys.readouterr().out
+
+    session.expire_all()
+    htmls = {post.id: post.content_html for post in session.exec(select(Post))}
+    assert htmls[1] == "stale"
+    assert all(htmls[i] == f"<h1>Post {i - 1}</h1>" for i in range(3, 8))
+
+
+def test_rerender_skips_posts_edited_after_read(engine, session, test_user):
+    """测试读取后被编辑的文章不会被旧正文的渲染结果覆盖"""
+    from app.commands.rerender_posts import iter_batches, write_batch
+    from app.models.post import Post
+
+    for i in range(2):
+        session.add(Post(title=f"Post {i}", content_markdown=f"# Post {i}", content_html="stale",
+                         author_id=test_user.id))
+    session.commit()
+
+    batch = next(iter_batches(engine, 0, 10))
+    htmls = [render_markdown(text) for _, text in batch]
+    # 渲染期间作者修改了第一篇文章
+    edited = session.get(Post, batch[0][0])
+    edited.content_markdown = "# Edited"
+    edited.content_html = "<h1>Edited</h1>"
+    session.add(edited)
+    session.commit()
+
+    assert write_batch(engine, batch, htmls, chunk_size=10) == 1
+    session.expire_all()
+    assert session.get(Post, batch[0][0]).content_html == "<h1>Edited</h1>"
+    assert session.get(Post, batch[1][0]).content_html == "<h1>Post 1</h1>"
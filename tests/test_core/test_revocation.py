@@ -0,0 +1,60 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import async_engine
+from app.core.revocation import BloomFilter, RevocationList, revoke_user_tokens
+from app.models.revoked_token import RevokedToken
+
+
+def test_bloom_filter_membership():
+    """测试布隆过滤器没有漏判，误判率接近配置值"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+class CountingSession(AsyncSession):
+    """记录执行语句次数的会话"""
+
+    executed = 0
+
+    async def exec(self, *args, **kwargs):
+        CountingSession.executed += 1
+        return await super().exec(*args, **kwargs)
+
+
+def test_revocation_list_queries_only_on_filter_hit(engine, test_user):
+    """测试过滤器未命中时不查询数据库，用户级吊销只影响吊销前签发的令牌"""
+    revocations = RevocationList(capacity=1000, error_rate=0.001)
+
+    async def run():
+        try:
+            async with CountingSession(async_engine, expire_on_commit=False) as session:
+                issued_before = time.time() - 1
+                key = await revoke_user_tokens(session, test_user.id)
+                expires_at = datetime.now(UTC).replace(tzinfo=None) + timedelta(hours=1)
+                session.add(
+                    RevokedToken(jti="logged-out", user_id=test_user.id, expires_at=expires_at)
+                )
+                await session.commit()
+                await revocations.refresh(session)
+                assert revocations.might_be_revoked(key)
+
+                CountingSession.executed = 0
+                assert not await revocations.is_revoked(session, test_user.id + 1, "fresh", None)
+                assert CountingSession.executed == 0
+
+                assert await revocations.is_revoked(session, test_user.id, "logged-out", time.time())
+                assert await revocations.is_revoked(session, test_user.id, "x", issued_before)
+                assert not await revocations.is_revoked(session, test_user.id, "y", time.time() + 1)
+                assert CountingSession.executed == 3
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,124 @@
+import asyncio
+import socket
+from datetime import UTC, datetime
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.email_outbox import EmailOutbox
+from app.services import email_service
+from app.services.email_service import SMTPConnectionPool, deliver_outbox, enqueue_email
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """记录收到的邮件的本地 SMTP 服务器"""
+
+    def __init__(self):
+        self.envelopes = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append(envelope)
+        return "250 OK"
+
+
+@pytest.fixture(name="smtp_server")
+def smtp_server_fixture(monkeypatch):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(settings, "SMTP_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_USER", "")
+    monkeypatch.setattr(settings, "EMAIL_FROM", "noreply@example.com")
+    yield handler
+    controller.stop()
+
+
+def deliver(pool, batch_size=50, emails=()):
+    """写入邮件后运行一轮发送，返回发件箱中的全部记录"""
+
+    async def run():
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                for to_email in emails:
+                    enqueue_email(session, to_email, "主题", "正文")
+                await session.commit()
+                await deliver_outbox(session, batch_size, pool)
+                return (await session.exec(select(EmailOutbox).order_by(EmailOutbox.id))).all()
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_password_reset_request_only_writes_outbox(client, test_user, monkeypatch):
+    """测试密码重置请求只写入发件箱，不在请求内连接 SMTP"""
+
+    def fail():
+        raise AssertionError("请求内不应连接 SMTP")
+
+    monkeypatch.setattr(email_service, "connect_smtp", fail)
+    response = client.post("/api/auth/password-reset-request", json={"email": test_user.email})
+    assert response.status_code == 200
+
+    emails = deliver(SMTPConnectionPool(1, 60), batch_size=0)
+    assert [(e.to_email, e.status) for e in emails] == [(test_user.email, "pending")]
+
+
+def test_deliver_outbox_reuses_connection(engine, smtp_server):
+    """测试一批邮件复用同一个连接发送，下一批继续复用"""
+    pool = SMTPConnectionPool(1, 60)
+    emails = deliver(pool, emails=[f"user{i}@example.com" for i in range(5)])
+    assert all(e.status == "sent" and e.attempts == 1 for e in emails)
+    assert len(smtp_server.envelopes) == 5
+    assert smtp_server.envelopes[0].rcpt_tos == ["user0@example.com"]
+
+    deliver(pool, emails=["late@example.com"])
+    assert len(smtp_server.envelopes) == 6
+    assert pool.connects == 1
+    pool.close()
+
+
+def test_deliver_outbox_retries_with_backoff(engine, monkeypatch):
+    """测试发送失败时推迟重试，超过最大次数后标记为 failed"""
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", free_port())
+    monkeypatch.setattr(settings, "SMTP_TLS", False)
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 2)
+    pool = SMTPConnectionPool(1, 60)
+
+    [email] = deliver(pool, emails=["user@example.com"])
+    assert email.status == "pending"
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.now(UTC).replace(tzinfo=None)
+
+    # 未到重试时间不会再次发送
+    [email] = deliver(pool)
+    assert email.attempts == 1
+
+    async def expire():
+        try:
+            async with AsyncSession(async_engine) as session:
+                row = await session.get(EmailOutbox, email.id)
+                row.next_attempt_at = datetime(2000, 1, 1)
+                session.add(row)
+                await session.commit()
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(expire())
+    [email] = deliver(pool)
+    assert email.status == "failed"
+    assert email.attempts == 2
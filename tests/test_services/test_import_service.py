@@ -0,0 +1,74 @@
+import asyncio
+import json
+import sqlite3
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import async_engine, named_engines
+from app.core.replication import sqlite_path
+from app.services.import_service import import_posts_service, iter_lines
+
+
+def collect_lines(chunks, max_line):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [line async for line in iter_lines(source(), max_line)]
+
+    return asyncio.run(run())
+
+
+def test_iter_lines_splits_across_chunks():
+    """测试跨字节块的行被正确拼接，结尾没有换行的最后一行也会返回"""
+    assert collect_lines([b"ab", b"c\nde", b"f\n\ng"], 10) == [
+        (1, b"abc"), (2, b"def"), (3, b""), (4, b"g")
+    ]
+
+
+def test_iter_lines_skips_overlong_lines():
+    """测试超长的行不被缓存，跳到下一个换行后继续"""
+    chunks = [b"ok\n", b"x" * 8, b"x" * 8, b"x\nnext\n", b"y" * 20]
+    assert collect_lines(chunks, 10) == [(1, b"ok"), (2, None), (3, b"next"), (4, None)]
+    # 单个块内的超长行同样跳过
+    assert collect_lines([b"x" * 11 + b"\nz"], 10) == [(1, None), (2, b"z")]
+
+
+def test_import_tolerates_concurrently_created_tag(engine, test_user):
+    """测试查询标签之后其他请求创建了同名标签时，本批仍能导入"""
+    path = sqlite_path(settings.DATABASE_URL)
+
+    def create_tag_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO tag"):
+            with sqlite3.connect(path) as other:
+                other.execute(
+                    "INSERT OR IGNORE INTO tag (name, created_at) VALUES ('并发标签', '2024-01-01')"
+                )
+
+    body = json.dumps({"title": "并发导入", "content_markdown": "正文", "tags": ["并发标签"]}).encode()
+
+    async def run():
+        async def chunks():
+            yield body
+
+        try:
+            return await import_posts_service(chunks(), test_user.id)
+        finally:
+            await async_engine.dispose()
+
+    engines = list(named_engines().values())
+    for bound in engines:
+        event.listen(bound, "before_cursor_execute", create_tag_first)
+    try:
+        result = asyncio.run(run())
+    finally:
+        for bound in engines:
+            event.remove(bound, "before_cursor_execute", create_tag_first)
+    assert (result.imported, result.failed) == (1, 0)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute(
+            "SELECT count(*) FROM post_tag_link JOIN tag ON tag.id = post_tag_link.tag_id "
+            "WHERE tag.name = '并发标签'"
+        ).fetchone() == (1,)